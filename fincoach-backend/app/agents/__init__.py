@@ -1,7 +1,17 @@
 """Multi-Agent System for FINCoach AI"""
-from app.agents.financial_advisor import FinancialAdvisor
-from app.agents.risk_assessor import RiskAssessor
-from app.agents.prediction_agent import PredictionAgent
-from app.agents.coaching_agent import CoachingAgent
+from importlib import import_module
+
+# Exports resolve on first access (PEP 562), so importing one agent does not load the rest
+_EXPORTS = {
+    "FinancialAdvisor": "app.agents.financial_advisor",
+    "RiskAssessor": "app.agents.risk_assessor",
+    "PredictionAgent": "app.agents.prediction_agent",
+    "CoachingAgent": "app.agents.coaching_agent"
+}
 
 __all__ = ["FinancialAdvisor", "RiskAssessor", "PredictionAgent", "CoachingAgent"]
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
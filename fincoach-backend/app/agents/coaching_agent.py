@@ -1,11 +1,14 @@
 """Coaching Agent - Provides personalized financial coaching"""
 from typing import Dict, List
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.goal import Goal
 from app.models.jar import Jar
+from app.core.money import from_minor
+from app.services.spend_counters import type_totals
 
 class CoachingAgent:
     """AI Agent for personalized financial coaching"""
@@ -22,13 +25,9 @@ class CoachingAgent:
         # Analyze user's financial situation
         tips = []
         
-        # Check budget adherence
+        # Check budget adherence over the last 30 days, one exact SQL sum
         one_month_ago = datetime.utcnow() - timedelta(days=30)
-        monthly_expenses = sum(t.amount for t in self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= one_month_ago
-        ).all())
+        monthly_expenses = from_minor(type_totals(self.db, user_id, one_month_ago).get("expense", (0, 0))[0])
         
         if user.monthly_budget > 0:
             budget_usage = (monthly_expenses / user.monthly_budget) * 100
@@ -94,34 +93,21 @@ class CoachingAgent:
         # Get last 7 days data
         seven_days_ago = datetime.utcnow() - timedelta(days=7)
         
-        weekly_income = sum(t.amount for t in self.db.query(Transaction).filter(
+        # Income and per-category expenses in one grouped query
+        totals = self.db.query(
+            Transaction.type, Transaction.category, func.sum(Transaction.amount)
+        ).filter(
             Transaction.user_id == user_id,
-            Transaction.type == "income",
             Transaction.transaction_date >= seven_days_ago
-        ).all())
+        ).group_by(Transaction.type, Transaction.category).all()
         
-        weekly_expenses = sum(t.amount for t in self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= seven_days_ago
-        ).all())
+        weekly_income = sum(amount for type_, _, amount in totals if type_ == "income")
+        category_spending = {category: amount for type_, category, amount in totals if type_ == "expense"}
+        weekly_expenses = sum(category_spending.values())
         
         weekly_savings = weekly_income - weekly_expenses
         
         # Get top spending categories
-        weekly_transactions = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= seven_days_ago
-        ).all()
-        
-        category_spending = {}
-        for transaction in weekly_transactions:
-            category = transaction.category
-            if category not in category_spending:
-                category_spending[category] = 0
-            category_spending[category] += transaction.amount
-        
         top_categories = sorted(category_spending.items(), key=lambda x: x[1], reverse=True)[:3]
         
         # Generate insights
@@ -163,11 +149,7 @@ class CoachingAgent:
         monthly_budget = user.monthly_budget
         
         one_month_ago = datetime.utcnow() - timedelta(days=30)
-        monthly_expenses = sum(t.amount for t in self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= one_month_ago
-        ).all())
+        monthly_expenses = from_minor(type_totals(self.db, user_id, one_month_ago).get("expense", (0, 0))[0])
         
         # Immediate actions
         if monthly_expenses > monthly_income:
@@ -1,11 +1,14 @@
 """Financial Advisor Agent - Provides personalized financial advice"""
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from app.core.money import from_minor, minor_units
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.goal import Goal
 from app.models.jar import Jar
+from app.services.transaction_archive import transaction_archive
 
 class FinancialAdvisor:
     """AI Agent for providing financial advice"""
@@ -14,30 +17,35 @@ class FinancialAdvisor:
         self.db = db
     
     def analyze_spending_patterns(self, user_id: int) -> Dict:
-        """Analyze user spending patterns"""
-        transactions = self.db.query(Transaction).filter(
+        """Analyze user spending patterns over all-time history, archived rows included"""
+        totals = self.db.query(
+            Transaction.category, func.sum(minor_units(Transaction.amount)), func.count(Transaction.id)
+        ).filter(
             Transaction.user_id == user_id,
             Transaction.type == "expense"
-        ).all()
-        
-        if not transactions:
+        ).group_by(Transaction.category).all()
+        
+        # Calculate spending by category, summed in paise so both sources add up exactly
+        minor_spending = {}
+        transaction_count = 0
+        for category, amount, count in totals:
+            minor_spending[category.value] = int(amount)
+            transaction_count += count
+        for category, archived in transaction_archive.spending_by_category(user_id).items():
+            minor_spending[category] = minor_spending.get(category, 0) + archived["minor_total"]
+            transaction_count += archived["count"]
+        category_spending = {category: from_minor(amount) for category, amount in minor_spending.items()}
+        
+        if not transaction_count:
             return {"status": "no_data", "message": "No expense data available"}
         
-        # Calculate spending by category
-        category_spending = {}
-        for transaction in transactions:
-            category = transaction.category
-            if category not in category_spending:
-                category_spending[category] = 0
-            category_spending[category] += transaction.amount
-        
         # Sort by highest spending
         sorted_categories = sorted(category_spending.items(), key=lambda x: x[1], reverse=True)
         
         return {
             "status": "success",
-            "total_expenses": sum(t.amount for t in transactions),
-            "transaction_count": len(transactions),
+            "total_expenses": from_minor(sum(minor_spending.values())),
+            "transaction_count": transaction_count,
             "category_breakdown": dict(sorted_categories),
             "top_spending_category": sorted_categories[0][0] if sorted_categories else None,
             "top_spending_amount": sorted_categories[0][1] if sorted_categories else 0
@@ -121,7 +129,21 @@ class FinancialAdvisor:
     
     def get_financial_health_score(self, user_id: int) -> Dict:
         """Calculate financial health score (0-100)"""
-        user = self.db.query(User).filter(User.id == user_id).first()
+        expenses = select(Transaction.amount).where(
+            Transaction.user_id == user_id,
+            Transaction.type == "expense"
+        ).subquery()
+        # Every factor in one round trip
+        user = self.db.execute(
+            select(
+                User.monthly_budget,
+                User.monthly_income,
+                select(Goal.id).where(Goal.user_id == user_id, Goal.status == "active").exists().label("has_goals"),
+                select(Jar.id).where(Jar.user_id == user_id, Jar.is_active == 1).exists().label("has_jars"),
+                select(func.count()).select_from(expenses).scalar_subquery().label("expense_count"),
+                select(func.coalesce(func.sum(expenses.c.amount), 0.0)).scalar_subquery().label("total_expenses")
+            ).where(User.id == user_id)
+        ).first()
         if not user:
             return {"status": "error", "message": "User not found"}
         
@@ -139,28 +161,18 @@ class FinancialAdvisor:
             factors["income_stability"] = 20
         
         # Factor 3: Active goals (20 points)
-        goals = self.db.query(Goal).filter(
-            Goal.user_id == user_id,
-            Goal.status == "active"
-        ).all()
-        if len(goals) > 0:
+        if user.has_goals:
             score += 20
             factors["active_goals"] = 20
         
         # Factor 4: Savings jars (20 points)
-        jars = self.db.query(Jar).filter(
-            Jar.user_id == user_id,
-            Jar.is_active == 1
-        ).all()
-        if len(jars) > 0:
+        if user.has_jars:
             score += 20
             factors["savings_jars"] = 20
         
         # Factor 5: Spending discipline (20 points)
-        spending_analysis = self.analyze_spending_patterns(user_id)
-        if spending_analysis["status"] == "success":
-            total_expenses = spending_analysis["total_expenses"]
-            if user.monthly_budget > 0 and total_expenses <= user.monthly_budget:
+        if user.expense_count:
+            if user.monthly_budget > 0 and user.total_expenses <= user.monthly_budget:
                 score += 20
                 factors["spending_discipline"] = 20
         
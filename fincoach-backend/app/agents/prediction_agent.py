@@ -1,9 +1,13 @@
 """Prediction Agent - Forecasts financial trends"""
 from typing import Dict, List
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.transaction import Transaction
 from app.models.user import User
+from app.core.money import from_minor, minor_units
+from app.ml_modules.prediction_engine import PredictionEngine
+from app.services.spend_counters import type_totals
 
 class PredictionAgent:
     """AI Agent for predicting financial trends"""
@@ -13,53 +17,27 @@ class PredictionAgent:
     
     def predict_monthly_expenses(self, user_id: int, months_ahead: int = 3) -> Dict:
         """Predict future monthly expenses"""
-        # Get last 6 months of data
-        six_months_ago = datetime.utcnow() - timedelta(days=180)
-        historical_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= six_months_ago
-        ).all()
+        forecast = PredictionEngine(self.db).forecast_monthly_expenses(user_id, months_ahead)
         
-        if len(historical_expenses) < 20:
+        if forecast["status"] != "success":
             return {
                 "status": "warning",
                 "message": "Insufficient historical data for accurate prediction",
                 "recommendation": "Track expenses for at least 6 months"
             }
         
-        # Calculate monthly totals
-        monthly_totals = {}
-        for expense in historical_expenses:
-            month_key = expense.transaction_date.strftime("%Y-%m")
-            if month_key not in monthly_totals:
-                monthly_totals[month_key] = 0
-            monthly_totals[month_key] += expense.amount
-        
-        # Simple moving average prediction
-        amounts = sorted(monthly_totals.values())
-        average = sum(amounts) / len(amounts)
-        
-        # Generate predictions
         predictions = []
-        current_date = datetime.utcnow()
-        
-        for i in range(1, months_ahead + 1):
-            future_date = current_date + timedelta(days=30*i)
-            # Add seasonal variation (simplified)
-            seasonal_factor = 1.0 + (0.05 * (i % 3))
-            predicted_amount = average * seasonal_factor
-            
+        for prediction in forecast["predictions"]:
             predictions.append({
-                "month": future_date.strftime("%B %Y"),
-                "predicted_expense": round(predicted_amount, 2),
-                "confidence": "medium"
+                **prediction,
+                "confidence": self._get_interval_confidence(prediction)
             })
         
         return {
             "status": "success",
-            "historical_average": round(average, 2),
+            "historical_average": forecast["historical_average"],
             "predictions": predictions,
+            "method": forecast["method"],
             "recommendation": "Use these predictions to plan your budget for upcoming months"
         }
     
@@ -73,21 +51,16 @@ class PredictionAgent:
         
         # Get last 3 months expenses
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        recent_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= three_months_ago
-        ).all()
+        total_expenses, expense_count = type_totals(self.db, user_id, three_months_ago).get("expense", (0, 0))
         
-        if not recent_expenses:
+        if not expense_count:
             return {
                 "status": "warning",
                 "message": "No expense data available",
                 "recommendation": "Track expenses to get savings predictions"
             }
         
-        total_expenses = sum(t.amount for t in recent_expenses)
-        average_monthly_expense = total_expenses / 3
+        average_monthly_expense = from_minor(total_expenses) / 3
         
         current_savings = monthly_income - average_monthly_expense
         
@@ -122,21 +95,10 @@ class PredictionAgent:
         
         # Get recent savings rate
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        recent_income = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "income",
-            Transaction.transaction_date >= three_months_ago
-        ).all()
-        
-        recent_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= three_months_ago
-        ).all()
-        
-        total_income = sum(t.amount for t in recent_income)
-        total_expenses = sum(t.amount for t in recent_expenses)
-        monthly_savings = (total_income - total_expenses) / 3 if total_income > 0 else 0
+        totals = type_totals(self.db, user_id, three_months_ago)
+        total_income = totals.get("income", (0, 0))[0]
+        total_expenses = totals.get("expense", (0, 0))[0]
+        monthly_savings = from_minor(total_income - total_expenses) / 3 if total_income > 0 else 0
         
         if monthly_savings <= 0:
             return {
@@ -173,31 +135,25 @@ class PredictionAgent:
         """Predict spending by category for next month"""
         # Get last 3 months by category
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        expenses = self.db.query(Transaction).filter(
+        category_totals = dict(self.db.query(
+            Transaction.category, func.sum(minor_units(Transaction.amount))
+        ).filter(
             Transaction.user_id == user_id,
             Transaction.type == "expense",
             Transaction.transaction_date >= three_months_ago
-        ).all()
+        ).group_by(Transaction.category).all())
         
-        if not expenses:
+        if not category_totals:
             return {
                 "status": "warning",
                 "message": "No expense data available",
                 "recommendation": "Track expenses to get category predictions"
             }
         
-        # Calculate category totals
-        category_totals = {}
-        for expense in expenses:
-            category = expense.category
-            if category not in category_totals:
-                category_totals[category] = 0
-            category_totals[category] += expense.amount
-        
         # Calculate monthly averages
         category_predictions = {}
         for category, total in category_totals.items():
-            monthly_avg = total / 3
+            monthly_avg = from_minor(total) / 3
             category_predictions[category] = round(monthly_avg, 2)
         
         # Sort by highest spending
@@ -217,3 +173,16 @@ class PredictionAgent:
             return f"On track! Goal will be completed in approximately {months_needed:.1f} months."
         else:
             return f"Behind schedule. Increase monthly savings to meet deadline."
+    
+    @staticmethod
+    def _get_interval_confidence(prediction: Dict) -> str:
+        """Rate a forecast by the width of its prediction interval"""
+        if prediction["predicted_expense"] <= 0:
+            return "low"
+        relative_width = (prediction["upper_bound"] - prediction["lower_bound"]) / prediction["predicted_expense"]
+        if relative_width < 0.3:
+            return "high"
+        elif relative_width < 0.6:
+            return "medium"
+        else:
+            return "low"
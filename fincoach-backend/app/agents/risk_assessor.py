@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.goal import Goal
+from app.core.money import from_minor, minor_units
+from app.services.spend_counters import type_totals
 
 class RiskAssessor:
     """AI Agent for assessing financial risks"""
@@ -20,21 +22,16 @@ class RiskAssessor:
         
         # Get last 3 months of expenses
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        recent_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= three_months_ago
-        ).all()
+        total_expenses, expense_count = type_totals(self.db, user_id, three_months_ago).get("expense", (0, 0))
         
-        if not recent_expenses:
+        if not expense_count:
             return {
                 "status": "warning",
                 "message": "Insufficient data to assess emergency fund",
                 "recommendation": "Track expenses for 3 months"
             }
         
-        total_expenses = sum(t.amount for t in recent_expenses)
-        monthly_average = total_expenses / 3
+        monthly_average = from_minor(total_expenses) / 3
         
         # Recommended emergency fund: 6 months of expenses
         recommended_fund = monthly_average * 6
@@ -71,15 +68,9 @@ class RiskAssessor:
         # Get monthly income and expenses
         monthly_income = user.monthly_income
         
-        # Get last month expenses
+        # Get last 30 days' expenses, one exact SQL sum
         one_month_ago = datetime.utcnow() - timedelta(days=30)
-        monthly_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= one_month_ago
-        ).all()
-        
-        total_expenses = sum(t.amount for t in monthly_expenses)
+        total_expenses = from_minor(type_totals(self.db, user_id, one_month_ago).get("expense", (0, 0))[0])
         
         if monthly_income <= 0:
             return {
@@ -137,11 +128,7 @@ class RiskAssessor:
         # Get available monthly savings
         monthly_income = user.monthly_income
         one_month_ago = datetime.utcnow() - timedelta(days=30)
-        monthly_expenses = sum(t.amount for t in self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= one_month_ago
-        ).all())
+        monthly_expenses = from_minor(type_totals(self.db, user_id, one_month_ago).get("expense", (0, 0))[0])
         
         available_monthly_savings = monthly_income - monthly_expenses
         
@@ -171,7 +158,7 @@ class RiskAssessor:
         """Assess spending volatility and consistency"""
         # Get last 3 months of expenses
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        expenses = self.db.query(Transaction).filter(
+        expenses = self.db.query(Transaction.transaction_date, minor_units(Transaction.amount)).filter(
             Transaction.user_id == user_id,
             Transaction.type == "expense",
             Transaction.transaction_date >= three_months_ago
@@ -184,13 +171,13 @@ class RiskAssessor:
                 "recommendation": "Track more transactions for accurate analysis"
             }
         
-        # Calculate monthly totals
+        # Calculate monthly totals, in paise
         monthly_totals = {}
-        for expense in expenses:
-            month_key = expense.transaction_date.strftime("%Y-%m")
+        for transaction_date, amount in expenses:
+            month_key = transaction_date.strftime("%Y-%m")
             if month_key not in monthly_totals:
                 monthly_totals[month_key] = 0
-            monthly_totals[month_key] += expense.amount
+            monthly_totals[month_key] += amount
         
         if len(monthly_totals) < 2:
             return {
@@ -200,7 +187,7 @@ class RiskAssessor:
             }
         
         # Calculate standard deviation
-        amounts = list(monthly_totals.values())
+        amounts = [from_minor(total) for total in monthly_totals.values()]
         average = sum(amounts) / len(amounts)
         variance = sum((x - average) ** 2 for x in amounts) / len(amounts)
         std_dev = variance ** 0.5
@@ -1,28 +1,61 @@
-"""API routes for FINCoach AI Backend"""
-from . import auth
-from . import users
-from . import transactions
-from . import jars
-from . import goals
-from . import alerts
-from . import agents
-from . import ml_modules
-from . import analytics
-from . import mobile
-from . import notifications
-from . import social
+"""API routes for FINCoach AI Backend
 
-__all__ = [
-    "auth",
-    "users",
-    "transactions",
-    "jars",
-    "goals",
-    "alerts",
-    "agents",
-    "ml_modules",
-    "analytics",
-    "mobile",
-    "notifications",
-    "social"
-]
+Routers are grouped so each deployment role imports and mounts only the
+routers it serves; a WebSocket gateway never loads the agent and ML stack.
+"""
+from importlib import import_module
+from typing import List, Optional
+from fastapi import FastAPI
+
+# group -> (module, prefix, tag); routers that declare their own prefix use None
+ROUTER_GROUPS = {
+    "core": [
+        ("auth", "/api/v1/auth", "Authentication"),
+        ("users", "/api/v1/users", "Users"),
+        ("transactions", "/api/v1/transactions", "Transactions"),
+        ("jars", "/api/v1/jars", "Jars"),
+        ("goals", "/api/v1/goals", "Goals"),
+        ("alerts", "/api/v1/alerts", "Alerts"),
+        ("jobs", "/api/v1/jobs", "Jobs")
+    ],
+    "ai": [
+        ("agents", None, "AI Agents"),
+        ("ml_modules", None, "ML Modules")
+    ],
+    "features": [
+        ("analytics", None, "Analytics"),
+        ("mobile", None, "Mobile Integration"),
+        ("social", None, "Social Features")
+    ],
+    "realtime": [
+        ("notifications", None, "Real-time Notifications")
+    ]
+}
+
+# Router groups served by each APP_ROLE
+DEPLOYMENT_ROLES = {
+    "all": ["core", "ai", "features", "realtime"],
+    "api": ["core", "ai", "features"],
+    "gateway": ["realtime"]
+}
+
+def resolve_router_groups(role: str, groups: Optional[List[str]] = None) -> List[str]:
+    """Router groups to mount: an explicit list wins over the role's defaults"""
+    if groups:
+        unknown = [group for group in groups if group not in ROUTER_GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown router groups {unknown}; expected some of {list(ROUTER_GROUPS)}")
+        return list(groups)
+    if role not in DEPLOYMENT_ROLES:
+        raise ValueError(f"Unknown APP_ROLE {role!r}; expected one of {list(DEPLOYMENT_ROLES)}")
+    return DEPLOYMENT_ROLES[role]
+
+def include_router_groups(app: FastAPI, groups: List[str]) -> None:
+    """Import each group's router modules and mount them on ``app``"""
+    for group in groups:
+        for module_name, prefix, tag in ROUTER_GROUPS[group]:
+            router = import_module(f"app.api.{module_name}").router
+            if prefix:
+                app.include_router(router, prefix=prefix, tags=[tag])
+            else:
+                app.include_router(router, tags=[tag])
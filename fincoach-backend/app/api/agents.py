@@ -1,19 +1,20 @@
 """API routes for AI Agents"""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.core.database import get_analytics_db, get_analytics_read_db
 from app.agents.financial_advisor import FinancialAdvisor
 from app.agents.risk_assessor import RiskAssessor
 from app.agents.prediction_agent import PredictionAgent
 from app.agents.coaching_agent import CoachingAgent
-from app.security import get_current_user
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
 
 router = APIRouter(prefix="/api/v1/agents", tags=["agents"])
 
 @router.get("/financial-advisor/spending-analysis")
 def get_spending_analysis(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get spending pattern analysis"""
     advisor = FinancialAdvisor(db)
@@ -21,8 +22,8 @@ def get_spending_analysis(
 
 @router.get("/financial-advisor/budget-recommendations")
 def get_budget_recommendations(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get personalized budget recommendations"""
     advisor = FinancialAdvisor(db)
@@ -30,8 +31,8 @@ def get_budget_recommendations(
 
 @router.get("/financial-advisor/savings-allocation")
 def get_savings_allocation(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get optimal savings allocation (50-30-20 rule)"""
     advisor = FinancialAdvisor(db)
@@ -39,8 +40,8 @@ def get_savings_allocation(
 
 @router.get("/financial-advisor/health-score")
 def get_financial_health_score(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get financial health score (0-100)"""
     advisor = FinancialAdvisor(db)
@@ -48,8 +49,8 @@ def get_financial_health_score(
 
 @router.get("/risk-assessor/emergency-fund")
 def assess_emergency_fund(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Assess emergency fund adequacy"""
     assessor = RiskAssessor(db)
@@ -57,8 +58,8 @@ def assess_emergency_fund(
 
 @router.get("/risk-assessor/debt-risk")
 def assess_debt_risk(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Assess debt and financial obligations risk"""
     assessor = RiskAssessor(db)
@@ -67,8 +68,8 @@ def assess_debt_risk(
 @router.get("/risk-assessor/goal-feasibility/{goal_id}")
 def assess_goal_feasibility(
     goal_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Assess if a financial goal is feasible"""
     assessor = RiskAssessor(db)
@@ -76,8 +77,8 @@ def assess_goal_feasibility(
 
 @router.get("/risk-assessor/spending-volatility")
 def assess_spending_volatility(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Assess spending volatility and consistency"""
     assessor = RiskAssessor(db)
@@ -86,8 +87,8 @@ def assess_spending_volatility(
 @router.get("/prediction/monthly-expenses")
 def predict_monthly_expenses(
     months_ahead: int = 3,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_db),  # Primary: rolls the stored forecast state forward
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict future monthly expenses"""
     predictor = PredictionAgent(db)
@@ -95,8 +96,8 @@ def predict_monthly_expenses(
 
 @router.get("/prediction/savings-potential")
 def predict_savings_potential(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict potential monthly savings"""
     predictor = PredictionAgent(db)
@@ -105,8 +106,8 @@ def predict_savings_potential(
 @router.get("/prediction/goal-completion/{goal_id}")
 def predict_goal_completion(
     goal_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict when a goal will be completed"""
     predictor = PredictionAgent(db)
@@ -114,8 +115,8 @@ def predict_goal_completion(
 
 @router.get("/prediction/spending-by-category")
 def predict_spending_by_category(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict spending by category for next month"""
     predictor = PredictionAgent(db)
@@ -123,8 +124,8 @@ def predict_spending_by_category(
 
 @router.get("/coaching/daily-tip")
 def get_daily_coaching_tip(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get personalized daily coaching tip"""
     coach = CoachingAgent(db)
@@ -132,8 +133,8 @@ def get_daily_coaching_tip(
 
 @router.get("/coaching/weekly-summary")
 def get_weekly_summary(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get weekly financial summary and coaching"""
     coach = CoachingAgent(db)
@@ -141,8 +142,8 @@ def get_weekly_summary(
 
 @router.get("/coaching/action-plan")
 def get_personalized_action_plan(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get personalized action plan for financial improvement"""
     coach = CoachingAgent(db)
@@ -150,8 +151,8 @@ def get_personalized_action_plan(
 
 @router.get("/coaching/motivation")
 def get_motivation_message(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get motivational message based on progress"""
     coach = CoachingAgent(db)
@@ -1,18 +1,24 @@
 """Alerts API routes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.alert import Alert
 from app.schemas.alert import AlertCreate, AlertResponse
-from app.api.users import get_current_user
-from app.models.user import User
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.projection import FIELDS_QUERY, FieldSet
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
+# AlertResponse fields, selectable with ?fields=
+ALERT_FIELDS = FieldSet.from_schema(AlertResponse, Alert)
+
 @router.post("", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
 async def create_alert(
     alert_data: AlertCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Create a new alert"""
@@ -35,24 +41,26 @@ async def list_alerts(
     limit: int = Query(10, ge=1, le=100),
     is_read: bool = Query(None),
     severity: str = Query(None),
-    current_user: User = Depends(get_current_user),
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """List user alerts"""
-    query = db.query(Alert).filter(Alert.user_id == current_user.id)
+    names = ALERT_FIELDS.parse(fields)
+    query = select(*ALERT_FIELDS.columns(names)).where(Alert.user_id == current_user.id)
     
     if is_read is not None:
-        query = query.filter(Alert.is_read == is_read)
+        query = query.where(Alert.is_read == is_read)
     if severity:
-        query = query.filter(Alert.severity == severity)
+        query = query.where(Alert.severity == severity)
     
-    alerts = query.order_by(Alert.created_at.desc()).offset(skip).limit(limit).all()
-    return alerts
+    query = query.order_by(Alert.created_at.desc()).offset(skip).limit(limit)
+    return FastJSONResponse(ALERT_FIELDS.project(db.execute(query), names))
 
 @router.get("/{alert_id}", response_model=AlertResponse)
 async def get_alert(
     alert_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get alert by ID"""
@@ -71,7 +79,7 @@ async def get_alert(
 @router.put("/{alert_id}/mark-as-read")
 async def mark_alert_as_read(
     alert_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Mark alert as read"""
@@ -95,7 +103,7 @@ async def mark_alert_as_read(
 @router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_alert(
     alert_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete alert"""
@@ -114,7 +122,7 @@ async def delete_alert(
 
 @router.get("/stats/summary", response_model=dict)
 async def get_alerts_summary(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get alerts summary"""
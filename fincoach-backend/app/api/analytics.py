@@ -3,34 +3,30 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.database import get_analytics_read_db
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.responses import FastJSONResponse
 from app.models.transaction import Transaction
 from app.models.goal import Goal
 from app.models.jar import Jar
-from app.schemas.user import UserResponse
 from sqlalchemy import func
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["Analytics"])
 
 @router.get("/dashboard", response_model=Dict[str, Any])
 async def get_dashboard_analytics(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_analytics_read_db)
 ):
     """Get comprehensive dashboard analytics for the user"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Get transactions for the current month
         today = datetime.now()
         month_start = today.replace(day=1)
         transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.date >= month_start
+            Transaction.user_id == current_user.id,
+            Transaction.transaction_date >= month_start
         ).all()
         
         # Calculate totals
@@ -48,13 +44,13 @@ async def get_dashboard_analytics(
                 category_breakdown[category] += transaction.amount
         
         # Get goals progress
-        goals = db.query(Goal).filter(Goal.user_id == user.id).all()
+        goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
         goals_progress = []
         for goal in goals:
             progress_percentage = (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
             goals_progress.append({
                 "id": goal.id,
-                "name": goal.name,
+                "name": goal.title,
                 "target": goal.target_amount,
                 "current": goal.current_amount,
                 "progress_percentage": round(progress_percentage, 2),
@@ -62,10 +58,10 @@ async def get_dashboard_analytics(
             })
         
         # Get jars summary
-        jars = db.query(Jar).filter(Jar.user_id == user.id).all()
+        jars = db.query(Jar).filter(Jar.user_id == current_user.id).all()
         total_saved = sum(jar.current_amount for jar in jars)
         
-        return {
+        return FastJSONResponse({
             "period": f"{month_start.strftime('%B %Y')}",
             "summary": {
                 "total_income": round(total_income, 2),
@@ -78,22 +74,18 @@ async def get_dashboard_analytics(
             "transaction_count": len(transactions),
             "goals_count": len(goals),
             "jars_count": len(jars)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/spending-trends", response_model=Dict[str, Any])
 async def get_spending_trends(
     months: int = 6,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_analytics_read_db)
 ):
     """Get spending trends for the last N months"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         trends = []
         for i in range(months):
             month_date = datetime.now() - timedelta(days=30*i)
@@ -101,9 +93,9 @@ async def get_spending_trends(
             month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
             
             month_transactions = db.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.date >= month_start,
-                Transaction.date <= month_end,
+                Transaction.user_id == current_user.id,
+                Transaction.transaction_date >= month_start,
+                Transaction.transaction_date <= month_end,
                 Transaction.type == "expense"
             ).all()
             
@@ -114,30 +106,26 @@ async def get_spending_trends(
                 "transaction_count": len(month_transactions)
             })
         
-        return {
+        return FastJSONResponse({
             "trends": list(reversed(trends)),
             "average_monthly_expense": round(sum(t["total_expense"] for t in trends) / len(trends), 2) if trends else 0
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/category-analysis", response_model=Dict[str, Any])
 async def get_category_analysis(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_analytics_read_db)
 ):
     """Get detailed category-wise spending analysis"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         today = datetime.now()
         month_start = today.replace(day=1)
         
         transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.date >= month_start,
+            Transaction.user_id == current_user.id,
+            Transaction.transaction_date >= month_start,
             Transaction.type == "expense"
         ).all()
         
@@ -168,43 +156,39 @@ async def get_category_analysis(
                 (category_analysis[category]["total"] / total_expense * 100) if total_expense > 0 else 0, 2
             )
         
-        return {
+        return FastJSONResponse({
             "period": f"{month_start.strftime('%B %Y')}",
             "total_expense": round(total_expense, 2),
             "categories": category_analysis
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/financial-health", response_model=Dict[str, Any])
 async def get_financial_health(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_analytics_read_db)
 ):
     """Get comprehensive financial health score and metrics"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         today = datetime.now()
         month_start = today.replace(day=1)
         
         # Get transactions
         transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.date >= month_start
+            Transaction.user_id == current_user.id,
+            Transaction.transaction_date >= month_start
         ).all()
         
         total_income = sum(t.amount for t in transactions if t.type == "income")
         total_expense = sum(t.amount for t in transactions if t.type == "expense")
         
         # Get savings
-        jars = db.query(Jar).filter(Jar.user_id == user.id).all()
+        jars = db.query(Jar).filter(Jar.user_id == current_user.id).all()
         total_saved = sum(jar.current_amount for jar in jars)
         
         # Get goals
-        goals = db.query(Goal).filter(Goal.user_id == user.id).all()
+        goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
         completed_goals = sum(1 for g in goals if g.current_amount >= g.target_amount)
         
         # Calculate health score (0-100)
@@ -234,7 +218,7 @@ async def get_financial_health(
         if jars:
             health_score += min(20, len(jars) * 5)
         
-        return {
+        return FastJSONResponse({
             "health_score": round(health_score, 2),
             "health_status": "Excellent" if health_score >= 80 else "Good" if health_score >= 60 else "Fair" if health_score >= 40 else "Poor",
             "metrics": {
@@ -247,6 +231,6 @@ async def get_financial_health(
                 "total_goals": len(goals),
                 "jars_count": len(jars)
             }
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
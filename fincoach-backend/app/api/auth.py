@@ -3,7 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.core.database import get_db
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
+from app.core.security import (
+    HashingPoolFull, hash_password_async, verify_and_update_password, create_access_token, create_refresh_token
+)
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
 from pydantic import BaseModel, EmailStr
@@ -14,6 +16,13 @@ class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
@@ -34,7 +43,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    try:
+        hashed_password = await hash_password_async(user_data.password)
+    except HashingPoolFull:
+        raise _hashing_busy()
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -56,7 +68,14 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
     """Login user and return tokens"""
     user = db.query(User).filter(User.email == credentials.email).first()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_password(credentials.password, user.hashed_password)
+        except HashingPoolFull:
+            raise _hashing_busy()
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -68,6 +87,11 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail="User account is inactive"
         )
     
+    # Stored hash uses an old BCRYPT_ROUNDS; swap it while we have the plain password
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
     # Create tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -1,19 +1,25 @@
 """Goals API routes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.core.database import get_db
 from app.models.goal import Goal
 from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
-from app.api.users import get_current_user
-from app.models.user import User
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.projection import FIELDS_QUERY, FieldSet
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
+# GoalResponse fields, selectable with ?fields=
+GOAL_FIELDS = FieldSet.from_schema(GoalResponse, Goal)
+
 @router.post("", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
 async def create_goal(
     goal_data: GoalCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Create a new financial goal"""
@@ -37,22 +43,24 @@ async def list_goals(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     status: str = Query(None),
-    current_user: User = Depends(get_current_user),
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """List user goals"""
-    query = db.query(Goal).filter(Goal.user_id == current_user.id)
+    names = GOAL_FIELDS.parse(fields)
+    query = select(*GOAL_FIELDS.columns(names)).where(Goal.user_id == current_user.id)
     
     if status:
-        query = query.filter(Goal.status == status)
+        query = query.where(Goal.status == status)
     
-    goals = query.order_by(Goal.deadline).offset(skip).limit(limit).all()
-    return goals
+    query = query.order_by(Goal.deadline).offset(skip).limit(limit)
+    return FastJSONResponse(GOAL_FIELDS.project(db.execute(query), names))
 
 @router.get("/{goal_id}", response_model=GoalResponse)
 async def get_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get goal by ID"""
@@ -72,7 +80,7 @@ async def get_goal(
 async def update_goal(
     goal_id: int,
     goal_update: GoalUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update goal"""
@@ -99,7 +107,7 @@ async def update_goal(
 @router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete goal"""
@@ -120,7 +128,7 @@ async def delete_goal(
 async def add_goal_progress(
     goal_id: int,
     amount: float,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add progress to goal"""
@@ -148,7 +156,7 @@ async def add_goal_progress(
 @router.get("/{goal_id}/progress", response_model=dict)
 async def get_goal_progress(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get goal progress"""
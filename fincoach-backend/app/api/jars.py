@@ -1,18 +1,24 @@
 """Jars API routes"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.jar import Jar
 from app.schemas.jar import JarCreate, JarUpdate, JarResponse
-from app.api.users import get_current_user
-from app.models.user import User
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.projection import FIELDS_QUERY, FieldSet
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
+# JarResponse fields, selectable with ?fields=
+JAR_FIELDS = FieldSet.from_schema(JarResponse, Jar)
+
 @router.post("", response_model=JarResponse, status_code=status.HTTP_201_CREATED)
 async def create_jar(
     jar_data: JarCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Create a new savings jar"""
@@ -36,22 +42,24 @@ async def list_jars(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     priority: str = Query(None),
-    current_user: User = Depends(get_current_user),
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """List user jars"""
-    query = db.query(Jar).filter(Jar.user_id == current_user.id)
+    names = JAR_FIELDS.parse(fields)
+    query = select(*JAR_FIELDS.columns(names)).where(Jar.user_id == current_user.id)
     
     if priority:
-        query = query.filter(Jar.priority == priority)
+        query = query.where(Jar.priority == priority)
     
-    jars = query.offset(skip).limit(limit).all()
-    return jars
+    query = query.offset(skip).limit(limit)
+    return FastJSONResponse(JAR_FIELDS.project(db.execute(query), names))
 
 @router.get("/{jar_id}", response_model=JarResponse)
 async def get_jar(
     jar_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get jar by ID"""
@@ -71,7 +79,7 @@ async def get_jar(
 async def update_jar(
     jar_id: int,
     jar_update: JarUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update jar"""
@@ -98,7 +106,7 @@ async def update_jar(
 @router.delete("/{jar_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_jar(
     jar_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete jar"""
@@ -119,7 +127,7 @@ async def delete_jar(
 async def add_funds_to_jar(
     jar_id: int,
     amount: float,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add funds to jar"""
@@ -143,7 +151,7 @@ async def add_funds_to_jar(
 @router.get("/{jar_id}/progress", response_model=dict)
 async def get_jar_progress(
     jar_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get jar progress"""
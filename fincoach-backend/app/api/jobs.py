@@ -0,0 +1,88 @@
+"""Background jobs API routes"""
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.models.job import Job, JobStatus
+from app.schemas.job import CLIENT_JOB_PARAMS, JobCreate
+from app.services.jobs import job_runner, job_to_dict, submit_job
+
+router = APIRouter()
+
+def _get_user_job(db: Session, job_id: str, user_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Queue a heavy report or backfill; poll the returned job for its result"""
+    params_model = CLIENT_JOB_PARAMS.get(job_data.type)
+    if params_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job type {job_data.type!r}; expected one of {sorted(CLIENT_JOB_PARAMS)}"
+        )
+    try:
+        # Defaults filled in, so equal requests dedupe to the same active job
+        params = params_model.model_validate(job_data.params).model_dump()
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+    try:
+        job = submit_job(db, current_user.id, job_data.type, params)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    job_runner.wake()
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job_to_dict(job)
+
+@router.get("")
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """The user's most recent jobs"""
+    jobs = db.query(Job).filter(Job.user_id == current_user.id).order_by(Job.created_at.desc()).limit(limit).all()
+    return [job_to_dict(job) for job in jobs]
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Status of a job, with its result once it succeeded"""
+    return job_to_dict(_get_user_job(db, job_id, current_user.id))
+
+@router.get("/{job_id}/download")
+async def download_job_file(
+    job_id: str,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """File written by a finished job, e.g. a transaction export"""
+    job = _get_user_job(db, job_id, current_user.id)
+    name = (job.result or {}).get("file") if job.status == JobStatus.SUCCEEDED else None
+    path = os.path.join(settings.JOB_OUTPUT_DIR, os.path.basename(name)) if name else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job has no file to download"
+        )
+    return FileResponse(path, media_type="text/csv", filename=f"{job.type}.csv")
@@ -2,11 +2,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.core.database import get_analytics_db, get_analytics_read_db
 from app.ml_modules.prediction_engine import PredictionEngine
 from app.ml_modules.categorizer import TransactionCategorizer
 from app.ml_modules.anomaly_detector import AnomalyDetector
-from app.security import get_current_user
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
 
 router = APIRouter(prefix="/api/v1/ml", tags=["ml_modules"])
 
@@ -18,19 +19,24 @@ class AnomalyCheckInput(BaseModel):
     transaction_amount: float
     category: str
 
+class CategoryRuleInput(BaseModel):
+    keyword: str
+    category: str
+
 @router.post("/categorize")
 def categorize_transaction(
     transaction: TransactionInput,
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Automatically categorize a transaction"""
-    categorizer = TransactionCategorizer()
+    categorizer = TransactionCategorizer(db, current_user.id)
     return categorizer.categorize_transaction(transaction.description, transaction.amount)
 
 @router.post("/categorize-suggestions")
 def get_category_suggestions(
     transaction: TransactionInput,
-    current_user = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get multiple category suggestions for a transaction"""
     categorizer = TransactionCategorizer()
@@ -39,10 +45,45 @@ def get_category_suggestions(
         "suggestions": categorizer.get_category_suggestions(transaction.description)
     }
 
+@router.get("/category-rules")
+def list_category_rules(
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """List the user's custom categorization rules"""
+    categorizer = TransactionCategorizer(db, current_user.id)
+    return {
+        "status": "success",
+        "rules": categorizer.list_custom_category_rules()
+    }
+
+@router.post("/category-rules")
+def add_category_rule(
+    rule: CategoryRuleInput,
+    db: Session = Depends(get_analytics_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Add or replace a custom categorization rule"""
+    categorizer = TransactionCategorizer(db, current_user.id)
+    return categorizer.add_custom_category_rule(rule.keyword, rule.category)
+
+@router.delete("/category-rules/{keyword}")
+def remove_category_rule(
+    keyword: str,
+    db: Session = Depends(get_analytics_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Remove a custom categorization rule"""
+    categorizer = TransactionCategorizer(db, current_user.id)
+    result = categorizer.remove_custom_category_rule(keyword)
+    if result["status"] != "success":
+        raise HTTPException(status_code=404, detail=result["message"])
+    return result
+
 @router.get("/prediction/next-month-spending")
 def predict_next_month_spending(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_db),  # Primary: rolls the stored forecast state forward
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict next month's spending using ML"""
     engine = PredictionEngine(db)
@@ -51,8 +92,8 @@ def predict_next_month_spending(
 @router.get("/prediction/category-spending/{category}")
 def predict_category_spending(
     category: str,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict spending for a specific category"""
     engine = PredictionEngine(db)
@@ -60,8 +101,8 @@ def predict_category_spending(
 
 @router.get("/prediction/income-trend")
 def predict_income_trend(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Predict income trend"""
     engine = PredictionEngine(db)
@@ -70,8 +111,8 @@ def predict_income_trend(
 @router.post("/anomaly/detect-unusual-spending")
 def detect_unusual_spending(
     anomaly_check: AnomalyCheckInput,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Detect if a transaction is unusual"""
     detector = AnomalyDetector(db)
@@ -83,8 +124,8 @@ def detect_unusual_spending(
 
 @router.get("/anomaly/spending-spike")
 def detect_spending_spike(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Detect if there's a spending spike this month"""
     detector = AnomalyDetector(db)
@@ -92,8 +133,8 @@ def detect_spending_spike(
 
 @router.get("/anomaly/unusual-patterns")
 def detect_unusual_patterns(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Detect unusual spending patterns"""
     detector = AnomalyDetector(db)
@@ -103,8 +144,8 @@ def detect_unusual_patterns(
 def detect_duplicate_transaction(
     anomaly_check: AnomalyCheckInput,
     description: str = "",
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: Session = Depends(get_analytics_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Detect potential duplicate transactions"""
     detector = AnomalyDetector(db)
@@ -1,21 +1,63 @@
 """Mobile App Integration API endpoints for FINCoach AI Backend"""
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.database import get_db, get_read_db
+from app.api.notifications import notify_alerts
+from app.api.transactions import record_new_expenses
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.projection import FIELDS_QUERY, Derived, FieldSet, parse_fields, round2
+from app.core.responses import FastJSONResponse
 from app.models.transaction import Transaction
 from app.models.goal import Goal
-from app.models.jar import Jar
+from app.models.jar import Jar, JarPriority
 from app.models.alert import Alert
-from app.schemas.user import UserResponse
 from app.schemas.transaction import TransactionCreate, TransactionResponse
+from app.services.delta_sync import changes_since, parse_sync_token, snapshot
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/mobile", tags=["Mobile Integration"])
 
+def _goal_progress(row: Dict[str, Any]) -> float:
+    return row["current"] / row["target"] * 100 if row["target"] > 0 else 0
+
+# Fields of the mobile list screens, selectable with ?fields=
+MOBILE_GOAL_FIELDS = FieldSet({
+    "id": Goal.id,
+    "name": Goal.title,
+    "target": Goal.target_amount,
+    "current": Goal.current_amount,
+    "progress": Derived(("current", "target"), lambda row: round(_goal_progress(row), 2)),
+    "deadline": Goal.deadline,
+    "status": Derived(("current", "target"), lambda row: "completed" if _goal_progress(row) >= 100 else "in_progress")
+}, formatters={"target": round2, "current": round2})
+
+MOBILE_JAR_FIELDS = FieldSet({
+    "id": Jar.id,
+    "name": Jar.name,
+    "current_amount": Jar.current_amount,
+    "target_amount": Jar.target_amount,
+    "priority": Jar.priority,
+    "color": Jar.color
+}, formatters={"current_amount": round2, "target_amount": round2})
+
+MOBILE_TRANSACTION_FIELDS = FieldSet({
+    "id": Transaction.id,
+    "amount": Transaction.amount,
+    "category": Transaction.category,
+    "description": Transaction.description,
+    "type": Transaction.type,
+    "date": Transaction.transaction_date
+}, formatters={"amount": round2})
+
+QUICK_SUMMARY_SECTIONS = ("today", "month", "savings", "alerts")
+
+# High-priority jars first
+JAR_PRIORITY_ORDER = case((Jar.priority == JarPriority.HIGH, 0), (Jar.priority == JarPriority.MEDIUM, 1), else_=2)
+
 class MobileDeviceRegister(BaseModel):
     device_id: str
     device_type: str  # ios, android
@@ -31,15 +73,10 @@ class MobileNotificationPreference(BaseModel):
 @router.post("/register-device")
 async def register_mobile_device(
     device_data: MobileDeviceRegister,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Register a mobile device for push notifications"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Store device information (in production, use a Device model)
         return {
             "status": "success",
@@ -54,15 +91,10 @@ async def register_mobile_device(
 @router.post("/notification-preferences")
 async def update_notification_preferences(
     preferences: MobileNotificationPreference,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update mobile notification preferences"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         return {
             "status": "success",
             "message": "Notification preferences updated",
@@ -74,64 +106,68 @@ async def update_notification_preferences(
 
 @router.get("/quick-summary", response_model=Dict[str, Any])
 async def get_mobile_quick_summary(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
-    """Get quick summary for mobile home screen"""
+    """Get quick summary for mobile home screen; ``fields`` picks sections"""
+    sections = parse_fields(fields, QUICK_SUMMARY_SECTIONS)
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         today = datetime.now()
         month_start = today.replace(day=1)
+        summary = {}
         
-        # Get today's transactions
-        today_transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.date >= today.replace(hour=0, minute=0, second=0, microsecond=0)
-        ).all()
-        
-        today_expense = sum(t.amount for t in today_transactions if t.type == "expense")
-        today_income = sum(t.amount for t in today_transactions if t.type == "income")
-        
-        # Get month summary
-        month_transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.date >= month_start
-        ).all()
-        
-        month_expense = sum(t.amount for t in month_transactions if t.type == "expense")
-        month_income = sum(t.amount for t in month_transactions if t.type == "income")
+        # Today and month totals in one pass over the month's transactions
+        if "today" in sections or "month" in sections:
+            day_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
+            is_today = Transaction.transaction_date >= day_start
+            is_income = Transaction.type == "income"
+            is_expense = Transaction.type == "expense"
+            totals = db.query(
+                func.coalesce(func.sum(case((is_income, Transaction.amount), else_=0.0)), 0.0),
+                func.coalesce(func.sum(case((is_expense, Transaction.amount), else_=0.0)), 0.0),
+                func.count(Transaction.id),
+                func.coalesce(func.sum(case((is_today & is_income, Transaction.amount), else_=0.0)), 0.0),
+                func.coalesce(func.sum(case((is_today & is_expense, Transaction.amount), else_=0.0)), 0.0),
+                func.coalesce(func.sum(case((is_today, 1), else_=0)), 0)
+            ).filter(
+                Transaction.user_id == current_user.id,
+                Transaction.transaction_date >= min(month_start, day_start)
+            ).one()
+            month_income, month_expense, month_count, today_income, today_expense, today_count = totals
+            
+            if "today" in sections:
+                summary["today"] = {
+                    "income": round(today_income, 2),
+                    "expense": round(today_expense, 2),
+                    "net": round(today_income - today_expense, 2),
+                    "transaction_count": today_count
+                }
+            if "month" in sections:
+                summary["month"] = {
+                    "income": round(month_income, 2),
+                    "expense": round(month_expense, 2),
+                    "net": round(month_income - month_expense, 2),
+                    "transaction_count": month_count
+                }
         
         # Get jars
-        jars = db.query(Jar).filter(Jar.user_id == user.id).all()
-        total_saved = sum(jar.current_amount for jar in jars)
+        if "savings" in sections:
+            total_saved, jars_count = db.query(
+                func.coalesce(func.sum(Jar.current_amount), 0.0), func.count(Jar.id)
+            ).filter(Jar.user_id == current_user.id).one()
+            summary["savings"] = {
+                "total_saved": round(total_saved, 2),
+                "jars_count": jars_count
+            }
         
         # Get pending alerts
-        alerts = db.query(Alert).filter(
-            Alert.user_id == user.id,
-            Alert.is_read == False
-        ).all()
-        
-        return {
-            "today": {
-                "income": round(today_income, 2),
-                "expense": round(today_expense, 2),
-                "net": round(today_income - today_expense, 2),
-                "transaction_count": len(today_transactions)
-            },
-            "month": {
-                "income": round(month_income, 2),
-                "expense": round(month_expense, 2),
-                "net": round(month_income - month_expense, 2),
-                "transaction_count": len(month_transactions)
-            },
-            "savings": {
-                "total_saved": round(total_saved, 2),
-                "jars_count": len(jars)
-            },
-            "alerts": {
+        if "alerts" in sections:
+            alerts = db.query(Alert).filter(
+                Alert.user_id == current_user.id,
+                Alert.is_read == False
+            ).all()
+            summary["alerts"] = {
                 "unread_count": len(alerts),
                 "recent_alerts": [
                     {
@@ -139,45 +175,44 @@ async def get_mobile_quick_summary(
                         "title": alert.title,
                         "message": alert.message,
                         "severity": alert.severity,
-                        "created_at": alert.created_at.isoformat()
+                        "created_at": alert.created_at
                     }
                     for alert in alerts[:3]
                 ]
             }
-        }
+        
+        return FastJSONResponse(summary)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.post("/quick-transaction")
 async def add_quick_transaction(
     transaction: TransactionCreate,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Quick transaction add from mobile app"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         new_transaction = Transaction(
-            user_id=user.id,
+            user_id=current_user.id,
             amount=transaction.amount,
             category=transaction.category,
             description=transaction.description,
             type=transaction.type,
-            date=transaction.date or datetime.now()
+            transaction_date=transaction.transaction_date
         )
         
         db.add(new_transaction)
+        alerts = record_new_expenses(db, current_user.id, [new_transaction])
         db.commit()
         db.refresh(new_transaction)
+        await notify_alerts(current_user.id, alerts)
         
         return {
             "status": "success",
             "message": "Transaction added successfully",
             "transaction_id": new_transaction.id,
-            "created_at": new_transaction.date.isoformat()
+            "created_at": new_transaction.transaction_date.isoformat()
         }
     except Exception as e:
         db.rollback()
@@ -185,120 +220,104 @@ async def add_quick_transaction(
 
 @router.get("/goals-mobile", response_model=List[Dict[str, Any]])
 async def get_mobile_goals(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Get goals optimized for mobile display"""
+    names = MOBILE_GOAL_FIELDS.parse(fields)
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        goals = db.query(Goal).filter(Goal.user_id == user.id).all()
-        
-        mobile_goals = []
-        for goal in goals:
-            progress = (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
-            mobile_goals.append({
-                "id": goal.id,
-                "name": goal.name,
-                "target": round(goal.target_amount, 2),
-                "current": round(goal.current_amount, 2),
-                "progress": round(progress, 2),
-                "deadline": goal.deadline.isoformat() if goal.deadline else None,
-                "status": "completed" if progress >= 100 else "in_progress"
-            })
+        progress = case((Goal.target_amount > 0, Goal.current_amount / Goal.target_amount), else_=0)
+        rows = db.execute(
+            select(*MOBILE_GOAL_FIELDS.columns(names)).where(
+                Goal.user_id == current_user.id
+            ).order_by(progress.desc())
+        )
         
-        return sorted(mobile_goals, key=lambda x: x["progress"], reverse=True)
+        return FastJSONResponse(MOBILE_GOAL_FIELDS.project(rows, names))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/jars-mobile", response_model=List[Dict[str, Any]])
 async def get_mobile_jars(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Get jars optimized for mobile display"""
+    names = MOBILE_JAR_FIELDS.parse(fields)
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        jars = db.query(Jar).filter(Jar.user_id == user.id).all()
-        
-        mobile_jars = []
-        for jar in jars:
-            mobile_jars.append({
-                "id": jar.id,
-                "name": jar.name,
-                "current_amount": round(jar.current_amount, 2),
-                "target_amount": round(jar.target_amount, 2) if jar.target_amount else None,
-                "priority": jar.priority,
-                "color": jar.color if hasattr(jar, 'color') else "#3498db"
-            })
+        rows = db.execute(
+            select(*MOBILE_JAR_FIELDS.columns(names)).where(
+                Jar.user_id == current_user.id
+            ).order_by(JAR_PRIORITY_ORDER)
+        )
         
-        return sorted(mobile_jars, key=lambda x: x["priority"])
+        return FastJSONResponse(MOBILE_JAR_FIELDS.project(rows, names))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/recent-transactions", response_model=List[Dict[str, Any]])
 async def get_recent_transactions(
     limit: int = 10,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Get recent transactions for mobile app"""
+    names = MOBILE_TRANSACTION_FIELDS.parse(fields)
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        transactions = db.query(Transaction).filter(
-            Transaction.user_id == user.id
-        ).order_by(Transaction.date.desc()).limit(limit).all()
+        rows = db.execute(
+            select(*MOBILE_TRANSACTION_FIELDS.columns(names)).where(
+                Transaction.user_id == current_user.id
+            ).order_by(Transaction.transaction_date.desc()).limit(limit)
+        )
         
-        return [
-            {
-                "id": t.id,
-                "amount": round(t.amount, 2),
-                "category": t.category,
-                "description": t.description,
-                "type": t.type,
-                "date": t.date.isoformat()
-            }
-            for t in transactions
-        ]
+        return FastJSONResponse(MOBILE_TRANSACTION_FIELDS.project(rows, names))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.get("/changes", response_model=Dict[str, Any])
+async def get_changes(
+    since: Optional[str] = Query(None, description="next_token of the previous sync; omit for a full snapshot"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
+):
+    """Transactions, jars, goals and alerts created, updated or deleted since a sync token"""
+    if since is None:
+        return FastJSONResponse(snapshot(db, current_user.id))
+    try:
+        since_seq = parse_sync_token(since)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+    return FastJSONResponse(changes_since(db, current_user.id, since_seq, limit))
+
 @router.post("/sync-offline-data")
 async def sync_offline_data(
     data: Dict[str, Any],
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Sync offline data from mobile app"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Process transactions from offline sync
-        synced_count = 0
-        if "transactions" in data:
-            for trans_data in data["transactions"]:
-                new_transaction = Transaction(
-                    user_id=user.id,
-                    amount=trans_data.get("amount"),
-                    category=trans_data.get("category"),
-                    description=trans_data.get("description"),
-                    type=trans_data.get("type"),
-                    date=datetime.fromisoformat(trans_data.get("date", datetime.now().isoformat()))
-                )
-                db.add(new_transaction)
-                synced_count += 1
-        
+        new_transactions = [
+            Transaction(
+                user_id=current_user.id,
+                amount=trans_data.get("amount"),
+                category=trans_data.get("category"),
+                description=trans_data.get("description"),
+                type=trans_data.get("type"),
+                transaction_date=datetime.fromisoformat(trans_data.get("date", datetime.now().isoformat()))
+            )
+            for trans_data in data.get("transactions", [])
+        ]
+        db.add_all(new_transactions)
+        alerts = record_new_expenses(db, current_user.id, new_transactions)
         db.commit()
+        await notify_alerts(current_user.id, alerts)
+        synced_count = len(new_transactions)
         
         return {
             "status": "success",
@@ -1,13 +1,16 @@
 """Real-time Notifications API endpoints for FINCoach AI Backend"""
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.projection import FIELDS_QUERY, Derived, FieldSet
+from app.core.responses import FastJSONResponse
 from app.models.user import User
 from app.models.alert import Alert
-from app.schemas.user import UserResponse
 from app.schemas.alert import AlertResponse
 import json
 
@@ -40,6 +43,33 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+async def notify_job_finished(job: Dict[str, Any]):
+    """Tell the user's open connections that a background job finished"""
+    await manager.broadcast_to_user(job["user_id"], {"type": "job", **job})
+
+async def notify_alerts(user_id: int, alerts: List[Dict[str, Any]]):
+    """Push alerts created by a request to the user's open connections"""
+    for alert in alerts:
+        await manager.broadcast_to_user(user_id, {
+            "type": "alert",
+            "id": alert["id"],
+            "title": alert["title"],
+            "message": alert["message"],
+            "severity": alert["severity"].value,
+            "created_at": alert["created_at"].isoformat()
+        })
+
+# Notification list fields, selectable with ?fields=
+NOTIFICATION_FIELDS = FieldSet({
+    "id": Alert.id,
+    "title": Alert.title,
+    "message": Alert.message,
+    "severity": Alert.severity,
+    "is_read": Alert.is_read,
+    "created_at": Alert.created_at,
+    "action_url": Derived((), lambda row: None)
+})
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int, db: Session = Depends(get_db)):
     """WebSocket endpoint for real-time notifications"""
@@ -76,17 +106,13 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int, db: Session = D
 
 @router.get("/unread-count", response_model=Dict[str, Any])
 async def get_unread_notification_count(
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get count of unread notifications"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         unread_alerts = db.query(Alert).filter(
-            Alert.user_id == user.id,
+            Alert.user_id == current_user.id,
             Alert.is_read == False
         ).count()
         
@@ -102,41 +128,27 @@ async def get_notifications(
     limit: int = 20,
     offset: int = 0,
     unread_only: bool = False,
-    current_user: UserResponse = Depends(get_current_user),
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get notifications with pagination"""
+    names = NOTIFICATION_FIELDS.parse(fields)
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
-        query = db.query(Alert).filter(Alert.user_id == user.id)
+        query = select(*NOTIFICATION_FIELDS.columns(names)).where(Alert.user_id == current_user.id)
         
         if unread_only:
-            query = query.filter(Alert.is_read == False)
-        
-        alerts = query.order_by(Alert.created_at.desc()).offset(offset).limit(limit).all()
+            query = query.where(Alert.is_read == False)
         
-        return [
-            {
-                "id": alert.id,
-                "title": alert.title,
-                "message": alert.message,
-                "severity": alert.severity,
-                "is_read": alert.is_read,
-                "created_at": alert.created_at.isoformat(),
-                "action_url": alert.action_url if hasattr(alert, 'action_url') else None
-            }
-            for alert in alerts
-        ]
+        query = query.order_by(Alert.created_at.desc()).offset(offset).limit(limit)
+        return FastJSONResponse(NOTIFICATION_FIELDS.project(db.execute(query), names))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.put("/{notification_id}/mark-as-read")
 async def mark_notification_as_read(
     notification_id: int,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Mark a notification as read"""
@@ -163,7 +175,7 @@ async def mark_notification_as_read(
 
 @router.put("/mark-all-as-read")
 async def mark_all_notifications_as_read(
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Mark all notifications as read"""
@@ -190,7 +202,7 @@ async def mark_all_notifications_as_read(
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: int,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete a notification"""
@@ -219,17 +231,13 @@ async def delete_notification(
 async def get_notifications_by_severity(
     severity: str,
     limit: int = 20,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get notifications filtered by severity"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         alerts = db.query(Alert).filter(
-            Alert.user_id == user.id,
+            Alert.user_id == current_user.id,
             Alert.severity == severity
         ).order_by(Alert.created_at.desc()).limit(limit).all()
         
@@ -249,17 +257,13 @@ async def get_notifications_by_severity(
 
 @router.post("/send-test-notification")
 async def send_test_notification(
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Send a test notification to the user"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         test_alert = Alert(
-            user_id=user.id,
+            user_id=current_user.id,
             title="Test Notification",
             message="This is a test notification from FINCoach AI",
             severity="info",
@@ -271,7 +275,7 @@ async def send_test_notification(
         db.refresh(test_alert)
         
         # Broadcast to WebSocket if connected
-        await manager.broadcast_to_user(user.id, {
+        await manager.broadcast_to_user(current_user.id, {
             "type": "notification",
             "id": test_alert.id,
             "title": test_alert.title,
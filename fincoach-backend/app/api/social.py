@@ -4,9 +4,9 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Dict, Any
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
 from app.models.user import User
-from app.schemas.user import UserResponse
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/social", tags=["Social Features"])
@@ -28,7 +28,7 @@ class ChallengeParticipation(BaseModel):
 @router.get("/profile/{user_id}", response_model=Dict[str, Any])
 async def get_user_profile(
     user_id: int,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get public user profile"""
@@ -54,15 +54,10 @@ async def get_user_profile(
 @router.put("/profile/update")
 async def update_user_profile(
     profile: UserProfile,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update user profile"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Store profile data (in production, use a Profile model)
         return {
             "status": "success",
@@ -76,17 +71,12 @@ async def update_user_profile(
 @router.post("/challenges/create")
 async def create_financial_challenge(
     challenge: FinancialChallenge,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new financial challenge"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Create challenge (in production, use a Challenge model)
-        challenge_id = hash(f"{user.id}{challenge.title}{datetime.now()}") % 1000000
+        challenge_id = hash(f"{current_user.id}{challenge.title}{datetime.now()}") % 1000000
         
         return {
             "status": "success",
@@ -98,7 +88,7 @@ async def create_financial_challenge(
                 "description": challenge.description,
                 "target_amount": challenge.target_amount,
                 "duration_days": challenge.duration_days,
-                "created_by": user.id,
+                "created_by": current_user.id,
                 "created_at": datetime.now().isoformat(),
                 "participants": 1
             }
@@ -108,15 +98,10 @@ async def create_financial_challenge(
 
 @router.get("/challenges/list", response_model=List[Dict[str, Any]])
 async def list_financial_challenges(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List available financial challenges"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Return sample challenges
         challenges = [
             {
@@ -158,20 +143,15 @@ async def list_financial_challenges(
 @router.post("/challenges/{challenge_id}/join")
 async def join_challenge(
     challenge_id: int,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Join a financial challenge"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         return {
             "status": "success",
             "message": "Successfully joined the challenge",
             "challenge_id": challenge_id,
-            "user_id": user.id,
+            "user_id": current_user.id,
             "joined_at": datetime.now().isoformat()
         }
     except Exception as e:
@@ -181,15 +161,10 @@ async def join_challenge(
 async def get_leaderboard(
     challenge_id: int = None,
     limit: int = 10,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get leaderboard for challenges"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Return sample leaderboard
         leaderboard = [
             {
@@ -232,15 +207,10 @@ async def get_leaderboard(
 
 @router.get("/friends/list", response_model=List[Dict[str, Any]])
 async def get_friends_list(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get user's friends list"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         # Return sample friends
         friends = [
             {
@@ -266,15 +236,11 @@ async def get_friends_list(
 @router.post("/friends/{friend_id}/add")
 async def add_friend(
     friend_id: int,
-    current_user: UserResponse = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add a friend"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         friend = db.query(User).filter(User.id == friend_id).first()
         if not friend:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Friend not found")
@@ -290,15 +256,10 @@ async def add_friend(
 
 @router.get("/achievements", response_model=List[Dict[str, Any]])
 async def get_achievements(
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get user achievements and badges"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         achievements = [
             {
                 "id": 1,
@@ -341,20 +302,15 @@ async def get_achievements(
 @router.post("/share-achievement/{achievement_id}")
 async def share_achievement(
     achievement_id: int,
-    current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Share an achievement on social media"""
     try:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        
         return {
             "status": "success",
             "message": "Achievement shared successfully",
             "achievement_id": achievement_id,
-            "share_url": f"https://fincoach.app/achievements/{achievement_id}?user={user.id}",
+            "share_url": f"https://fincoach.app/achievements/{achievement_id}?user={current_user.id}",
             "shared_at": datetime.now().isoformat()
         }
     except Exception as e:
@@ -1,19 +1,49 @@
 """Transactions API routes"""
+import csv
+import io
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from app.core.database import get_db
+from typing import Dict, List
+from app.core.database import get_analytics_db, get_db
+from app.models.job import Job
 from app.models.transaction import Transaction
-from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
-from app.api.users import get_current_user
-from app.models.user import User
+from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse, SMSImportRequest
+from app.api.users import get_current_principal
+from app.core.auth_cache import Principal
+from app.core.money import from_minor
+from app.core.projection import FIELDS_QUERY, FieldSet
+from app.core.responses import FastJSONResponse
+from app.api.notifications import notify_alerts
+from app.ml_modules.prediction_engine import PredictionEngine
+from app.services.jobs import job_runner, submit_job
+from app.services.sms_ingestion import import_to_dict
+from app.services.spend_counters import record_spend, type_totals
+from app.services.transaction_archive import EXPORT_COLUMNS, iter_history
 
 router = APIRouter()
 
+# TransactionResponse fields, selectable with ?fields=
+TRANSACTION_FIELDS = FieldSet.from_schema(TransactionResponse, Transaction)
+
+def record_new_expenses(db: Session, user_id: int, transactions: List[Transaction]) -> List[Dict]:
+    """Add new expenses to the forecast state and spend counters; returns the budget alerts to push"""
+    expenses = [transaction for transaction in transactions if transaction.type == "expense"]
+    if not expenses:
+        return []
+    engine = PredictionEngine(db)
+    for transaction in expenses:
+        engine.record_expense(user_id, transaction.amount, transaction.transaction_date)
+    return record_spend(db, user_id, [
+        (transaction.transaction_date, transaction.category, transaction.amount) for transaction in expenses
+    ])
+
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     transaction_data: TransactionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Create a new transaction"""
@@ -27,8 +57,10 @@ async def create_transaction(
     )
     
     db.add(db_transaction)
+    alerts = record_new_expenses(db, current_user.id, [db_transaction])
     db.commit()
     db.refresh(db_transaction)
+    await notify_alerts(current_user.id, alerts)
     
     return db_transaction
 
@@ -40,28 +72,88 @@ async def list_transactions(
     type: str = Query(None),
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    current_user: User = Depends(get_current_user),
+    fields: str = FIELDS_QUERY,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """List user transactions with filtering"""
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    names = TRANSACTION_FIELDS.parse(fields)
+    query = select(*TRANSACTION_FIELDS.columns(names)).where(Transaction.user_id == current_user.id)
     
     if category:
-        query = query.filter(Transaction.category == category)
+        query = query.where(Transaction.category == category)
     if type:
-        query = query.filter(Transaction.type == type)
+        query = query.where(Transaction.type == type)
     if start_date:
-        query = query.filter(Transaction.transaction_date >= start_date)
+        query = query.where(Transaction.transaction_date >= start_date)
     if end_date:
-        query = query.filter(Transaction.transaction_date <= end_date)
+        query = query.where(Transaction.transaction_date <= end_date)
+    
+    query = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit)
+    return FastJSONResponse(TRANSACTION_FIELDS.project(db.execute(query), names))
+
+@router.post("/sms-import", status_code=status.HTTP_202_ACCEPTED)
+async def import_sms(
+    import_data: SMSImportRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Queue a bulk upload of bank SMS for parsing, categorization, dedupe and insert"""
+    messages = [
+        {"body": message.body, "received_at": message.received_at.isoformat() if message.received_at else None}
+        for message in import_data.messages
+    ]
+    job = submit_job(db, current_user.id, "sms_import", {"messages": messages})
+    job_runner.wake()
+    return import_to_dict(job)
+
+@router.get("/sms-import/{job_id}", response_model=dict)
+async def get_sms_import(
+    job_id: str,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get progress and per-stage throughput of an SMS import"""
+    job = db.query(Job).filter(
+        Job.id == job_id,
+        Job.user_id == current_user.id,
+        Job.type == "sms_import"
+    ).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
     
-    transactions = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
-    return transactions
+    return import_to_dict(job)
+
+@router.get("/export")
+def export_transactions(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_analytics_db)
+):
+    """Full transaction history as CSV, archived rows first"""
+    user_id = current_user.id
+
+    def rows():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in iter_history(db, user_id):
+            writer.writerow(row)
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(rows(), media_type="text/csv",
+                             headers={"Content-Disposition": 'attachment; filename="transactions.csv"'})
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get transaction by ID"""
@@ -81,7 +173,7 @@ async def get_transaction(
 async def update_transaction(
     transaction_id: int,
     transaction_update: TransactionUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update transaction"""
@@ -96,19 +188,29 @@ async def update_transaction(
         )
     
     update_data = transaction_update.dict(exclude_unset=True)
+    was_expense = transaction.type == "expense"
+    before = (transaction.transaction_date, transaction.category, -transaction.amount)
     for field, value in update_data.items():
         setattr(transaction, field, value)
     
+    changes = [before] if was_expense else []
+    if transaction.type == "expense":
+        changes.append((transaction.transaction_date, transaction.category, transaction.amount))
+    alerts = []
+    if changes:
+        PredictionEngine(db).invalidate_forecast_state(current_user.id)
+        alerts = record_spend(db, current_user.id, changes)
     db.add(transaction)
     db.commit()
     db.refresh(transaction)
+    await notify_alerts(current_user.id, alerts)
     
     return transaction
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction(
     transaction_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete transaction"""
@@ -122,23 +224,25 @@ async def delete_transaction(
             detail="Transaction not found"
         )
     
+    if transaction.type == "expense":
+        PredictionEngine(db).invalidate_forecast_state(current_user.id)
+        record_spend(db, current_user.id, [(transaction.transaction_date, transaction.category, -transaction.amount)])
     db.delete(transaction)
     db.commit()
 
 @router.get("/stats/summary", response_model=dict)
 async def get_transaction_summary(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get transaction summary"""
-    transactions = db.query(Transaction).filter(Transaction.user_id == current_user.id).all()
-    
-    total_income = sum(t.amount for t in transactions if t.type == "income")
-    total_expense = sum(t.amount for t in transactions if t.type == "expense")
+    totals = type_totals(db, current_user.id)
+    income, income_count = totals.get("income", (0, 0))
+    expense, expense_count = totals.get("expense", (0, 0))
     
     return {
-        "total_income": total_income,
-        "total_expense": total_expense,
-        "net_balance": total_income - total_expense,
-        "transaction_count": len(transactions)
+        "total_income": from_minor(income),
+        "total_expense": from_minor(expense),
+        "net_balance": from_minor(income - expense),
+        "transaction_count": income_count + expense_count
     }
@@ -3,28 +3,53 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.security import decode_token
+from app.core.auth_cache import Principal, principal_cache
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter()
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
-    """Get current authenticated user"""
+def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> Principal:
+    """Get the authenticated principal; the token is verified and the user loaded only on a cache miss"""
     token = credentials.credentials
-    payload = decode_token(token)
+    principal = principal_cache.get(token)
     
-    if not payload:
+    if principal is None:
+        payload = decode_token(token)
+        user_id = str(payload.get("sub", "")) if payload else ""
+        if not user_id.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials"
+            )
+        
+        # Loaded into the request's session, so get_current_user reuses it from the identity map
+        user = db.get(User, int(user_id))
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        principal = Principal.from_user(user)
+        principal_cache.put(token, principal, payload.get("exp"))
+    
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
         )
     
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return principal
+
+def get_current_user(principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)) -> User:
+    """Get current authenticated user row, loaded once per request"""
+    user = db.get(User, principal.id)
     
     if not user:
+        principal_cache.invalidate_user(principal.id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -0,0 +1,98 @@
+"""Verified-token cache: bearer token -> principal snapshot
+
+Verifying the JWT signature and loading the user costs every authenticated
+request a crypto check and a SELECT. Principals are cached per token for at
+most AUTH_CACHE_TTL_SECONDS (never past the token's own expiry) and dropped
+as soon as this worker flushes a change to the user row; other workers pick
+up the change when their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import event
+from app.core.config import settings
+from app.models.user import User
+
+class Principal(NamedTuple):
+    """What most handlers need to know about the authenticated user, without loading the row"""
+    id: int
+    is_active: bool
+    monthly_income: float
+    monthly_budget: float
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, bool(user.is_active), user.monthly_income or 0.0, user.monthly_budget or 0.0)
+
+class PrincipalCache:
+    """Thread-safe LRU of token -> principal with a TTL, invalidated per user"""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for ``token`` unless it expired"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(token)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, principal: Principal, token_expires_at: Optional[float] = None) -> None:
+        """Cache ``principal``; ``token_expires_at`` is the JWT ``exp`` (epoch seconds)"""
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of ``user_id``"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict:
+        """Cache size and hit counts"""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, token: str) -> None:
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+# Shared by all requests in this worker
+principal_cache = PrincipalCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principals(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
@@ -1,27 +1,270 @@
-"""Database configuration and session management"""
-from sqlalchemy import create_engine
+"""Database configuration and session management
+
+Each workload class gets its own connection pool, so a burst in one cannot
+take the connections another needs: ``oltp`` serves auth and CRUD,
+``analytics`` the agent, ML and analytics routers and exports, and
+``background`` CLIs, SMS ingestion and other batch work.
+"""
+import logging
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
 
-# Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+logger = logging.getLogger(__name__)
+
+class PoolConfig(NamedTuple):
+    """Sizing and limits of one workload class's pool"""
+    size: int
+    max_overflow: int
+    timeout: float
+    statement_timeout_ms: int  # 0: no limit (Postgres only)
+
+POOLS = {
+    "oltp": PoolConfig(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT,
+                       settings.DB_STATEMENT_TIMEOUT_MS),
+    "analytics": PoolConfig(settings.ANALYTICS_DB_POOL_SIZE, settings.ANALYTICS_DB_MAX_OVERFLOW,
+                            settings.ANALYTICS_DB_POOL_TIMEOUT, settings.ANALYTICS_DB_STATEMENT_TIMEOUT_MS),
+    "background": PoolConfig(settings.BACKGROUND_DB_POOL_SIZE, settings.BACKGROUND_DB_MAX_OVERFLOW,
+                             settings.BACKGROUND_DB_POOL_TIMEOUT, settings.BACKGROUND_DB_STATEMENT_TIMEOUT_MS)
+}
+
+class PoolMetrics:
+    """Checkout counters of one pool; outlive the pool objects an engine re-creates"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.exhausted = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, exhausted: bool, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.exhausted += exhausted
+            self.timeouts += timed_out
+            self.wait_seconds += seconds
+
+# Pool name -> checkout counters, shared by all requests in this worker
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time and checkouts that found every connection in use"""
+
+    def _do_get(self):
+        metrics = pool_metrics.setdefault(self._orig_logging_name, PoolMetrics())
+        exhausted = self.checkedout() >= self.size() + self._max_overflow
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics.record(time.perf_counter() - started, exhausted, timed_out)
+
+def create_pool_engine(url: str, name: str, config: PoolConfig, connect_args: Optional[Dict] = None) -> Engine:
+    """Engine with its own instrumented pool; ``statement_timeout`` is set per connection on Postgres"""
+    url = make_url(url)
+    connect_args = dict(connect_args or {})
+    if url.get_backend_name() == "postgresql" and config.statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={config.statement_timeout_ms}"
+    return create_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=config.size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.timeout,
+        connect_args=connect_args
+    )
+
+engines = {name: create_pool_engine(settings.DATABASE_URL, name, config) for name, config in POOLS.items()}
+engine = engines["oltp"]
+background_engine = engines["background"]
+
+# Monthly range partitions of transactions only exist on Postgres
+TRANSACTIONS_PARTITIONED = settings.TRANSACTIONS_PARTITIONED and engine.dialect.name == "postgresql"
+
+# Create session factories
+session_factories = {
+    name: sessionmaker(autocommit=False, autoflush=False, bind=pool_engine) for name, pool_engine in engines.items()
+}
+SessionLocal = session_factories["oltp"]
+AnalyticsSessionLocal = session_factories["analytics"]
+BackgroundSessionLocal = session_factories["background"]
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed all it received
+# (an idle primary has nothing to replay either way). NULL off a standby.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
 )
+# A replica that does not answer quickly is skipped rather than waited for
+REPLICA_CONNECT_TIMEOUT = 2
+
+class ReplicaRouter:
+    """Decides per read whether the replica may serve it
+
+    The replica is used while it answers and trails the primary by at most
+    ``max_lag`` seconds. Lag is measured by one request at most every
+    ``check_interval`` seconds per worker; concurrent requests reuse the last
+    verdict instead of waiting for the check.
+    """
+
+    def __init__(self, replica: Engine, max_lag: float, check_interval: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._usable = False
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def measure_lag(self) -> float:
+        with self.replica.connect() as connection:
+            if self.replica.dialect.name != "postgresql":
+                return 0.0
+            return float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0.0)
+
+    def use_replica(self) -> bool:
+        if time.monotonic() - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                try:
+                    self.lag = self.measure_lag()
+                    self._usable = self.lag <= self.max_lag
+                    if not self._usable:
+                        logger.warning("Replica lag %.1fs exceeds %.1fs; reading from the primary",
+                                       self.lag, self.max_lag)
+                except DBAPIError as exc:
+                    self.lag = None
+                    self._usable = False
+                    logger.warning("Replica unavailable, reading from the primary: %s", exc)
+                self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._usable
+
+    def mark_unavailable(self) -> None:
+        """Send reads to the primary until the next check"""
+        self.lag = None
+        self._usable = False
+        self._checked_at = time.monotonic()
+        self.fallbacks += 1
+
+    def stats(self) -> Dict:
+        return {
+            "usable": int(self._usable),
+            "lag_seconds": self.lag if self.lag is not None else -1.0,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks
+        }
+
+# Optional read replica for read-only GET handlers (see get_read_db), with a pool per workload class
+replica_engines: Dict[str, Engine] = {}
+replica_session_factories = {}
+replica_router = None
+if settings.DATABASE_REPLICA_URL:
+    replica_connect_args = (
+        {"connect_timeout": REPLICA_CONNECT_TIMEOUT}
+        if make_url(settings.DATABASE_REPLICA_URL).get_backend_name() == "postgresql" else {}
+    )
+    for name, config in POOLS.items():
+        replica_engines[name] = create_pool_engine(settings.DATABASE_REPLICA_URL, f"{name}-replica", config,
+                                                   replica_connect_args)
+        replica_session_factories[name] = sessionmaker(autocommit=False, autoflush=False, bind=replica_engines[name])
+    # Shared by all requests in this worker
+    replica_router = ReplicaRouter(replica_engines["oltp"], settings.REPLICA_MAX_LAG_SECONDS,
+                                   settings.REPLICA_LAG_CHECK_INTERVAL)
+
+def pool_stats() -> Dict[str, Dict]:
+    """Occupancy and checkout counters of every pool, by pool name"""
+    stats = {}
+    for pool_engine in [*engines.values(), *replica_engines.values()]:
+        pool = pool_engine.pool
+        capacity = pool.size() + pool._max_overflow
+        metrics = pool_metrics.get(pool._orig_logging_name) or PoolMetrics()
+        stats[pool._orig_logging_name] = {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+            "checkouts": metrics.checkouts,
+            "exhausted": metrics.exhausted,
+            "timeouts": metrics.timeouts,
+            "wait_seconds": round(metrics.wait_seconds, 6)
+        }
+    return stats
 
 # Create base class for models
 Base = declarative_base()
 
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
+def create_tables():
+    """Create missing tables for all models; run by ``python -m app.core.init_db``, not by API workers"""
+    import app.models  # noqa: F401 - registers every model on Base.metadata
+    Base.metadata.create_all(bind=background_engine)
+    if TRANSACTIONS_PARTITIONED:
+        from app.core.partitioning import ensure_transaction_partitions, is_partitioned
+        with background_engine.begin() as connection:
+            # An existing unpartitioned table is moved over with ``python -m app.core.partitioning --convert``
+            if is_partitioned(connection):
+                ensure_transaction_partitions(connection)
+
+def _session(pool: str):
+    db = session_factories[pool]()
     try:
         yield db
     finally:
         db.close()
+
+def _read_session(pool: str):
+    db = None
+    if replica_router is not None and replica_router.use_replica():
+        db = replica_session_factories[pool]()
+        try:
+            # Check out now so a dead replica falls back before the handler runs
+            db.connection()
+            replica_router.replica_reads += 1
+        except DBAPIError as exc:
+            db.close()
+            db = None
+            replica_router.mark_unavailable()
+            logger.warning("Replica checkout failed, reading from the primary: %s", exc)
+    if db is None:
+        db = session_factories[pool]()
+        if replica_router is not None:
+            replica_router.primary_reads += 1
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_db():
+    """Get database session (oltp pool)"""
+    yield from _session("oltp")
+
+def get_analytics_db():
+    """Get database session from the analytics pool"""
+    yield from _session("analytics")
+
+def get_read_db():
+    """Get a session for handlers that only read: the replica when it is up and
+    within REPLICA_MAX_LAG_SECONDS, else the primary (oltp pools)"""
+    yield from _read_session("oltp")
+
+def get_analytics_read_db():
+    """Like get_read_db, from the analytics pools"""
+    yield from _read_session("analytics")
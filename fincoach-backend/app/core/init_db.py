@@ -0,0 +1,81 @@
+"""Create and upgrade database tables outside the API workers
+
+``create_all`` only creates missing tables. ``upgrade_schema`` then adds the
+columns, indexes and unique constraints the models gained after a table was
+created (``transactions.fingerprint``, ``users.category_rules_version``,
+``users.change_seq``, ``alerts.dedupe_key``, ...), so the same command brings
+an existing database up to date. Float amount columns are converted
+separately, during a maintenance window, with ``python -m app.core.money``.
+
+Usage:
+    python -m app.core.init_db
+"""
+from typing import List, Optional
+from sqlalchemy import Column, Index, UniqueConstraint, inspect, literal
+from sqlalchemy.engine import Connection
+from app.core.database import Base, background_engine, create_tables
+
+def _default_sql(column: Column, connection: Connection) -> Optional[str]:
+    """SQL default for backfilling existing rows of an added column, if the model has one"""
+    if column.server_default is not None:
+        return str(column.server_default.arg)
+    if column.default is not None and column.default.is_scalar:
+        return str(literal(column.default.arg, column.type).compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        ))
+    return None
+
+def add_column_sql(column: Column, connection: Connection) -> str:
+    """``ALTER TABLE ... ADD COLUMN`` for a model column; NOT NULL only when existing rows get a default"""
+    quote = connection.dialect.identifier_preparer.quote
+    sql = f"ALTER TABLE {quote(column.table.name)} ADD COLUMN {quote(column.name)} " \
+          f"{column.type.compile(dialect=connection.dialect)}"
+    default = _default_sql(column, connection)
+    if default is not None:
+        sql += f" DEFAULT {default}"
+        if not column.nullable:
+            sql += " NOT NULL"
+    return sql
+
+def upgrade_schema(connection: Connection) -> List[str]:
+    """Add the model columns and indexes missing from existing tables; returns what was added"""
+    import app.models  # noqa: F401 - registers every model on Base.metadata
+
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                connection.exec_driver_sql(add_column_sql(column, connection))
+                added.append(f"column {table.name}.{column.name}")
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        indexes |= {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(connection)
+                added.append(f"index {index.name}")
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in indexes:
+                # Existing tables cannot gain a constraint on SQLite; a unique index enforces the same
+                # and serves ON CONFLICT on both databases
+                Index(constraint.name, *constraint.columns, unique=True).create(connection)
+                added.append(f"unique index {constraint.name}")
+    return added
+
+def main():
+    create_tables()
+    print("✅ Database tables created")
+    with background_engine.begin() as connection:
+        added = upgrade_schema(connection)
+    for change in added:
+        print(f"✅ Added {change}")
+    if not added:
+        print("✅ Existing tables match the models")
+
+if __name__ == "__main__":
+    main()
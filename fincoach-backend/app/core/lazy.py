@@ -0,0 +1,24 @@
+"""Deferred imports for heavy dependencies"""
+import importlib.util
+import sys
+from types import ModuleType
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module ``name``, deferring its real import until an attribute is first used.
+
+    ``np = lazy_import("numpy")`` costs microseconds at import time, so workers
+    whose routes never touch the ML modules do not pay for numpy at startup.
+    Annotations must not dereference the module at definition time (quote them).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,247 @@
+"""In-process metrics exposed at /metrics in the Prometheus text format
+
+Per route template: request counts by status, a latency histogram, and the
+SQL statements, SQL time and rows each request caused. Metrics are kept per
+worker process; Prometheus scrapes every worker and sums them.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Route label of SQL run outside any HTTP request (workers, warm-up threads)
+BACKGROUND_ROUTE = "background"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            # One count per bucket, then sum and count
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+class Gauge:
+    """Values read from a callback at scrape time; ``kind="counter"`` for monotonic ones"""
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Dict[Tuple[str, ...], float]],
+                 labelnames: Sequence[str] = (), kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+                     for labels, value in sorted(self.collect().items()))
+        return lines
+
+class MetricsRegistry:
+    """Metrics rendered together at /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Shared by all requests in this worker
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "fincoach_http_requests_total", "HTTP requests by route template and status code",
+    ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "fincoach_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")))
+request_statements = registry.register(Histogram(
+    "fincoach_http_request_db_statements", "SQL statements executed per HTTP request",
+    ("method", "route"), buckets=STATEMENT_BUCKETS))
+db_statements = registry.register(Counter(
+    "fincoach_db_statements_total", "SQL statements executed, by route template", ("route",)))
+db_seconds = registry.register(Counter(
+    "fincoach_db_seconds_total", "Time spent executing SQL, by route template", ("route",)))
+db_rows = registry.register(Counter(
+    "fincoach_db_rows_total", "Rows returned or affected by SQL (driver rowcount), by route template", ("route",)))
+
+class QueryStats:
+    """SQL executed while handling one request"""
+    __slots__ = ("statements", "seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+# Set by MetricsMiddleware for the duration of each HTTP request
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    rows = max(cursor.rowcount, 0)
+    stats = current_query_stats.get()
+    if stats is None:
+        db_statements.inc((BACKGROUND_ROUTE,))
+        db_seconds.inc((BACKGROUND_ROUTE,), elapsed)
+        db_rows.inc((BACKGROUND_ROUTE,), rows)
+        return
+    stats.statements += 1
+    stats.seconds += elapsed
+    stats.rows += rows
+
+@event.listens_for(Engine, "handle_error")
+def _abandon_statement(context):
+    started = context.connection.info.get("statement_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+# Set on the scope of the requests sent by the startup warm-up, which are not traffic
+WARMUP_SCOPE_KEY = "fincoach.warmup"
+
+def is_warmup(scope: Scope) -> bool:
+    """Whether a request was sent by the startup warm-up"""
+    return scope.get(WARMUP_SCOPE_KEY, False)
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request, e.g. /api/v1/goals/{goal_id}"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        response = {"status": 500}
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_query_stats.reset(token)
+            record_request(scope["method"], route_template(scope), response["status"], elapsed, stats)
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: QueryStats) -> None:
+    http_requests.inc((method, route, str(status)))
+    http_latency.observe((method, route), seconds)
+    request_statements.observe((method, route), stats.statements)
+    db_statements.inc((route,), stats.statements)
+    db_seconds.inc((route,), stats.seconds)
+    db_rows.inc((route,), stats.rows)
+
+def expose_stats(prefix: str, documentation: str, stats: Callable[[], Dict],
+                 gauges: Iterable[str] = (), counters: Iterable[str] = (), label: Optional[str] = None) -> None:
+    """Expose numeric entries of a component's ``stats()`` dict, read at scrape time
+
+    With ``label``, ``stats()`` maps each value of that label to such a dict.
+    """
+    def collect(key: str) -> Dict[Tuple[str, ...], float]:
+        if label is None:
+            return {(): stats()[key]}
+        return {(value,): entry[key] for value, entry in stats().items()}
+
+    labelnames = (label,) if label else ()
+    for key in gauges:
+        registry.register(Gauge(f"{prefix}_{key}", f"{documentation}: {key.replace('_', ' ')}",
+                                lambda key=key: collect(key), labelnames))
+    for key in counters:
+        registry.register(Gauge(f"{prefix}_{key}_total", f"{documentation}: {key.replace('_', ' ')}",
+                                lambda key=key: collect(key), labelnames, kind="counter"))
@@ -0,0 +1,146 @@
+"""Money columns - amounts stored as integer minor units (paise)
+
+``Money`` columns are BIGINT counts of paise in the database and plain
+rupee floats in Python, so models, schemas and API payloads keep their
+float amounts while the database compares and sums exact integers:
+``func.sum(Transaction.amount)`` runs on BIGINT and comes back in rupees.
+Values compared with or added to a Money column are converted to paise;
+factors it is multiplied or divided by stay plain numbers.
+
+NumPy code selects ``minor_units(column)`` to get the raw paise and
+aggregates them as int64.
+
+Convert a database created with float amount columns (once, during a
+maintenance window):
+    python -m app.core.money
+"""
+from decimal import Decimal
+from typing import Dict, List, Optional, Union
+from sqlalchemy import BigInteger, Integer, inspect, literal, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.expression import type_coerce
+from sqlalchemy.types import TypeDecorator
+
+# Paise per rupee
+MINOR_UNITS = 100
+
+# Operators whose other operand is a plain factor, not an amount
+_SCALING = {operators.mul, operators.truediv, operators.floordiv, operators.mod}
+
+def to_minor(amount: Union[float, int, Decimal]) -> int:
+    """Rupees to the nearest paisa"""
+    return int(round(amount * MINOR_UNITS))
+
+def from_minor(minor: Union[int, float, Decimal]) -> float:
+    """Paise to rupees"""
+    return float(minor) / MINOR_UNITS
+
+def format_minor(minor: int) -> str:
+    """Paise as a two-decimal rupee string, e.g. 12345 -> "123.45", without going through a float"""
+    sign = "-" if minor < 0 else ""
+    whole, fraction = divmod(abs(minor), MINOR_UNITS)
+    return f"{sign}{whole}.{fraction:02d}"
+
+class Money(TypeDecorator):
+    """Rupee amount in Python, BIGINT paise in the database"""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_minor(value)
+
+    def coerce_compared_value(self, op, value):
+        if op in _SCALING:
+            return literal(value).type
+        return self
+
+def minor_units(column) -> ColumnElement:
+    """``column`` as its raw paise, for code that aggregates integers itself"""
+    return type_coerce(column, BigInteger)
+
+def money_columns() -> Dict[str, List[str]]:
+    """Money columns of every model, by table"""
+    from app.core.database import Base
+    # The models' Money, which is not this module's class when run as ``python -m app.core.money``
+    from app.core.money import Money
+    import app.models  # noqa: F401 - registers every table
+
+    columns = {}
+    for table in Base.metadata.sorted_tables:
+        names = [column.name for column in table.columns if isinstance(column.type, Money)]
+        if names:
+            columns[table.name] = names
+    return columns
+
+def float_money_columns(connection: Connection) -> Dict[str, List[str]]:
+    """Money columns the database still stores as floats, by table"""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    pending = {}
+    for table, names in money_columns().items():
+        if table not in existing:
+            continue
+        types = {column["name"]: column["type"] for column in inspector.get_columns(table)}
+        floats = [name for name in names if name in types and not isinstance(types[name], Integer)]
+        if floats:
+            pending[table] = floats
+    return pending
+
+def convert_to_minor_units(connection: Connection, pending: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+    """Rewrite float money columns as BIGINT paise; returns the columns converted"""
+    from app.core.database import Base
+
+    pending = float_money_columns(connection) if pending is None else pending
+    for table, names in pending.items():
+        if connection.dialect.name == "postgresql":
+            # One ALTER per table, so each table is rewritten once
+            connection.execute(text(f"ALTER TABLE {table} " + ", ".join(
+                f"ALTER COLUMN {name} TYPE BIGINT USING round({name} * {MINOR_UNITS})::bigint" for name in names
+            )))
+        elif connection.dialect.name == "sqlite":
+            _rebuild_sqlite_table(connection, Base.metadata.tables[table], names)
+        else:
+            raise NotImplementedError(f"No money migration for {connection.dialect.name}")
+    return pending
+
+def _rebuild_sqlite_table(connection: Connection, table, names: List[str]) -> None:
+    """SQLite cannot change a column type in place: copy the rows into a new table of the model"""
+    old = f"{table.name}_float"
+    # Keep other tables' foreign keys pointing at the name, not the renamed table
+    connection.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{old}"')
+    connection.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+    for (index,) in connection.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": old}).all():
+        connection.exec_driver_sql(f'DROP INDEX "{index}"')
+    table.create(connection)
+    stored = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{old}")').all()}
+    columns = [column.name for column in table.columns if column.name in stored]
+    values = [
+        f'CAST(ROUND("{name}" * {MINOR_UNITS}) AS INTEGER)' if name in names else f'"{name}"' for name in columns
+    ]
+    connection.exec_driver_sql(
+        f'INSERT INTO "{table.name}" ({", ".join(columns)}) SELECT {", ".join(values)} FROM "{old}"'
+    )
+    connection.exec_driver_sql(f'DROP TABLE "{old}"')
+
+def main():
+    from app.core.database import background_engine
+
+    with background_engine.begin() as connection:
+        pending = float_money_columns(connection)
+        if not pending:
+            print("✅ Money columns already store paise")
+            return
+        convert_to_minor_units(connection, pending)
+    for table, names in pending.items():
+        print(f"✅ {table}: {', '.join(names)} now BIGINT paise")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Monthly range partitions of the transactions table (Postgres)
+
+With ``TRANSACTIONS_PARTITIONED`` the transactions table is declared
+``PARTITION BY RANGE (transaction_date)`` with one partition per month, named
+like ``transactions_y2024m01``, plus a default partition for dates no month
+partition covers. Queries that compare ``transaction_date`` with a value,
+rather than wrapping the column in a function, let the planner skip every
+other month.
+
+Run monthly (cron) so partitions always exist ahead of the data:
+    python -m app.core.partitioning
+    python -m app.core.partitioning --months-ahead 6
+Move an existing unpartitioned table into partitions (once, during a maintenance window):
+    python -m app.core.partitioning --convert
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARENT = "transactions"
+DEFAULT_PARTITION = f"{PARENT}_default"
+UNPARTITIONED = f"{PARENT}_unpartitioned"
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+def existing_partitions(connection: Connection) -> Set[str]:
+    return set(connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT}).scalars())
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid "
+        "WHERE relname = :parent)"
+    ), {"parent": PARENT}).scalar()
+
+def create_month_partition(connection: Connection, month: datetime) -> None:
+    """Create the partition of ``month``, moving in rows the default partition holds for it"""
+    name = partition_name(month)
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    waiting = connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE transaction_date >= :start AND transaction_date < :end)"
+    ), {"start": month, "end": add_months(month, 1)}).scalar()
+    if not waiting:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES {bounds}"))
+        return
+    # A new partition may not overlap rows in the default one: move them over, then attach
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE transaction_date >= :start AND transaction_date < :end "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ), {"start": month, "end": add_months(month, 1)})
+    connection.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+def ensure_transaction_partitions(connection: Connection, months_ahead: Optional[int] = None,
+                                  since: Optional[datetime] = None) -> List[str]:
+    """Create the default partition and every missing month from ``since`` (default: the current
+    month, or the oldest row waiting in the default partition) through ``months_ahead``; returns
+    the partitions created"""
+    from app.core.config import settings
+
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITIONS_AHEAD
+    existing = existing_partitions(connection)
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    current = month_start(datetime.utcnow())
+    first = month_start(since) if since else current
+    waiting = connection.execute(text(f"SELECT MIN(transaction_date) FROM {DEFAULT_PARTITION}")).scalar()
+    if waiting is not None:
+        first = min(first, month_start(waiting))
+
+    month = first
+    last = add_months(current, months_ahead)
+    while month <= last:
+        if partition_name(month) not in existing:
+            create_month_partition(connection, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+def convert_transactions_table(connection: Connection) -> int:
+    """Replace an unpartitioned transactions table with a partitioned one holding the same rows.
+
+    The old table is kept as ``transactions_unpartitioned`` (indexes and id
+    sequence renamed alongside) until an operator drops it. Returns the rows copied.
+    """
+    from app.models.transaction import Transaction
+
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": PARENT}).scalar()
+    connection.execute(text(f"ALTER TABLE {PARENT} RENAME TO {UNPARTITIONED}"))
+    for index in connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table"
+    ), {"table": UNPARTITIONED}).scalars().all():
+        connection.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_unpartitioned"'))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {UNPARTITIONED}_id_seq"))
+
+    Transaction.__table__.create(connection, checkfirst=True)
+    oldest = connection.execute(text(f"SELECT MIN(transaction_date) FROM {UNPARTITIONED}")).scalar()
+    ensure_transaction_partitions(connection, since=oldest)
+    columns = ", ".join(column.name for column in Transaction.__table__.columns)
+    copied = connection.execute(text(
+        f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {UNPARTITIONED}"
+    )).rowcount
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{PARENT}', 'id'), COALESCE((SELECT MAX(id) FROM {PARENT}), 1))"
+    ))
+    return copied
+
+def main():
+    from app.core.config import settings
+    from app.core.database import TRANSACTIONS_PARTITIONED, background_engine
+
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of the transactions table")
+    parser.add_argument("--months-ahead", type=int, default=settings.TRANSACTION_PARTITIONS_AHEAD,
+                        help="Months after the current one to create partitions for")
+    parser.add_argument("--convert", action="store_true", help="Partition an existing unpartitioned table")
+    args = parser.parse_args()
+
+    if not TRANSACTIONS_PARTITIONED:
+        print("❌ Partitioning needs TRANSACTIONS_PARTITIONED=True and a Postgres DATABASE_URL")
+        sys.exit(1)
+    with background_engine.begin() as connection:
+        if not is_partitioned(connection):
+            if not args.convert:
+                print(f"❌ {PARENT} is not partitioned yet; run with --convert")
+                sys.exit(1)
+            copied = convert_transactions_table(connection)
+            print(f"✅ Copied {copied} rows into partitions; drop {UNPARTITIONED} once verified")
+        created = ensure_transaction_partitions(connection, args.months_ahead)
+    print(f"✅ Created {len(created)} partition(s)" + (f": {', '.join(created)}" if created else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Sparse fieldsets: ``?fields=id,amount`` pushed down into the SELECT column list
+
+A ``FieldSet`` maps the public field names of a list endpoint to the columns
+behind them. Only the columns the requested fields need are selected; fields
+computed in Python declare the columns they read with ``Derived``.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.engine import Result
+from app.core.responses import rows_as_dicts
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. id,amount,category; all when omitted")
+
+class Derived(NamedTuple):
+    """A field computed from other fields' raw column values"""
+    needs: Tuple[str, ...]
+    compute: Callable[[Dict[str, Any]], Any]
+
+def round2(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+def parse_fields(fields: Optional[str], available: Sequence[str]) -> List[str]:
+    """Requested names from a comma-separated ``fields`` value, in ``available`` order; 400 for unknown names"""
+    if not fields:
+        return list(available)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}"
+        )
+    return [name for name in available if name in requested]
+
+class FieldSet:
+    """Public fields of a list endpoint, in response order"""
+
+    def __init__(self, fields: Dict[str, Any], formatters: Optional[Dict[str, Callable[[Any], Any]]] = None):
+        self.fields = fields
+        self.formatters = formatters or {}
+
+    @classmethod
+    def from_schema(cls, schema: Type[BaseModel], model: Any, **kwargs) -> "FieldSet":
+        """Every field of a response schema, read from the model column of the same name"""
+        return cls({name: getattr(model, name) for name in schema.model_fields}, **kwargs)
+
+    def parse(self, fields: Optional[str]) -> List[str]:
+        """Requested field names, in response order"""
+        return parse_fields(fields, tuple(self.fields))
+
+    def columns(self, names: Sequence[str]) -> List[Any]:
+        """Labelled columns to SELECT for ``names``, including those read by derived fields"""
+        needed = {}
+        for name in names:
+            field = self.fields[name]
+            for source in field.needs if isinstance(field, Derived) else (name,):
+                needed[source] = self.fields[source]
+        if not needed:
+            # Only constant fields requested; select the key column to keep one row per item
+            key = next(iter(self.fields))
+            needed[key] = self.fields[key]
+        return [column.label(name) for name, column in needed.items()]
+
+    def project(self, result: Result, names: Sequence[str]) -> List[Dict[str, Any]]:
+        """Rows of a ``columns(names)`` select as response dicts"""
+        if not any(isinstance(self.fields[name], Derived) or name in self.formatters for name in names):
+            return rows_as_dicts(result)
+        keys = tuple(result.keys())
+        items = []
+        for row in result:
+            raw = dict(zip(keys, row))
+            item = {}
+            for name in names:
+                field = self.fields[name]
+                if isinstance(field, Derived):
+                    item[name] = field.compute(raw)
+                elif name in self.formatters:
+                    item[name] = self.formatters[name](raw[name])
+                else:
+                    item[name] = raw[name]
+            items.append(item)
+        return items
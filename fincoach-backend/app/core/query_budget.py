@@ -0,0 +1,119 @@
+"""Per-endpoint SQL query budgets
+
+``QUERY_BUDGETS`` caps the SQL statements one request to a route may run,
+counted with a cold verified-token cache (so the auth lookup is included).
+``python -m benchmarks.query_budgets`` checks every budgeted route against a
+seeded database; with ``QUERY_BUDGET_MODE=warn`` or ``raise`` the
+``QueryBudgetMiddleware`` also checks live requests in development and CI.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import QueryStats, current_query_stats, is_warmup, route_template
+
+logger = logging.getLogger(__name__)
+
+# (method, route template) -> maximum SQL statements per request
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("GET", "/api/v1/users/me"): 2,
+    ("GET", "/api/v1/transactions"): 2,
+    ("GET", "/api/v1/transactions/{transaction_id}"): 2,
+    ("GET", "/api/v1/transactions/stats/summary"): 2,
+    ("GET", "/api/v1/jars"): 2,
+    ("GET", "/api/v1/goals"): 2,
+    ("GET", "/api/v1/alerts"): 2,
+    ("GET", "/api/v1/jobs"): 2,
+    ("GET", "/api/v1/notifications/list"): 2,
+    ("GET", "/api/v1/notifications/unread-count"): 2,
+    ("GET", "/api/v1/mobile/quick-summary"): 4,
+    ("GET", "/api/v1/mobile/goals-mobile"): 2,
+    ("GET", "/api/v1/mobile/jars-mobile"): 2,
+    ("GET", "/api/v1/mobile/recent-transactions"): 2,
+    ("GET", "/api/v1/mobile/changes"): 6,
+    ("GET", "/api/v1/analytics/dashboard"): 4,
+    ("GET", "/api/v1/analytics/financial-health"): 4,
+    ("GET", "/api/v1/agents/financial-advisor/health-score"): 2,
+    ("GET", "/api/v1/agents/coaching/weekly-summary"): 3,
+}
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more SQL statements than its route's budget"""
+
+    def __init__(self, method: str, route: str, statements: int, budget: int):
+        super().__init__(f"{method} {route} ran {statements} SQL statements, budget is {budget}")
+        self.method = method
+        self.route = route
+        self.statements = statements
+        self.budget = budget
+
+def check_budget(method: str, route: str, statements: int) -> Optional[QueryBudgetExceeded]:
+    """The violation for ``statements`` run by one request to ``route``, if it is over budget"""
+    budget = QUERY_BUDGETS.get((method, route))
+    if budget is not None and statements > budget:
+        return QueryBudgetExceeded(method, route, statements, budget)
+    return None
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the SQL run inside the block, including by handlers it awaits or runs in the threadpool"""
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+class QueryBudgetMiddleware:
+    """Check each request's statement count against its budget when the response completes
+
+    ``warn`` logs violations; ``raise`` holds the response back and replaces
+    it with a 500 naming the violation, so over-budget routes fail CI runs.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = "warn"):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+        stats = current_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats()
+            token = current_query_stats.set(stats)
+        held = []
+
+        async def send_checked(message: Message) -> None:
+            if self.mode == "raise":
+                held.append(message)
+            else:
+                await send(message)
+            if message["type"] != "http.response.body" or message.get("more_body", False):
+                return
+            # Response complete; background tasks that run after it are not counted
+            violation = check_budget(scope["method"], route_template(scope), stats.statements)
+            if violation is not None:
+                logger.warning("Query budget exceeded: %s", violation)
+                if self.mode == "raise":
+                    await _send_violation(send, violation)
+                    return
+            for held_message in held:
+                await send(held_message)
+
+        try:
+            await self.app(scope, receive, send_checked)
+        finally:
+            if token is not None:
+                current_query_stats.reset(token)
+
+async def _send_violation(send: Send, violation: QueryBudgetExceeded) -> None:
+    body = f'{{"detail": "Query budget exceeded: {violation}"}}'.encode()
+    await send({
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
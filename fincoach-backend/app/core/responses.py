@@ -0,0 +1,39 @@
+"""Fast JSON responses for payloads our own handlers build
+
+Returning a ``FastJSONResponse`` from a route skips FastAPI's jsonable_encoder
+walk and the ``response_model`` re-validation; the model still documents the
+route. Only use it for dicts and row tuples assembled here, never for
+client-supplied data.
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, List
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import Result
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library, at roughly the old speed
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Serialize the few non-JSON types handlers return when orjson is unavailable"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (datetimes, enums and non-str keys handled natively)"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def rows_as_dicts(result: Result) -> List[Dict[str, Any]]:
+    """Turn a Core result into dicts keyed by the selected column labels, without building ORM objects"""
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
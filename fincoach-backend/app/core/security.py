@@ -1,12 +1,94 @@
 """Security utilities for authentication and authorization"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; min/max pin the work factor so hashes made with any other
+# BCRYPT_ROUNDS are flagged for a rehash on the user's next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+class HashingPoolFull(Exception):
+    """Raised when the password hashing queue is at its limit"""
+
+class PasswordHashingPool:
+    """Bounded thread pool for bcrypt, which releases the GIL while it hashes
+
+    At most ``workers`` hashes run at once and ``queue_limit`` more may wait;
+    anything beyond that is rejected instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 64):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    async def run(self, func: Callable, *args):
+        """Run ``func(*args)`` on the pool without blocking the event loop"""
+        with self._lock:
+            if self.queued + self.running >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HashingPoolFull(f"{self.queued} password hashes already queued")
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, submitted, func, args)
+
+    def _call(self, submitted: float, func: Callable, args: tuple):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds += started - submitted
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_seconds += time.perf_counter() - started
+
+    def stats(self) -> Dict:
+        """Queue length, throughput and average wait/run times"""
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds / completed * 1000, 1),
+                "avg_hash_ms": round(self.run_seconds / completed * 1000, 1)
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Shared by all requests in this worker
+password_pool = PasswordHashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
 
 def hash_password(password: str) -> str:
     """Hash a password"""
@@ -16,6 +98,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await password_pool.run(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool; also returns a new hash when the stored one uses an outdated work factor"""
+    return await password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
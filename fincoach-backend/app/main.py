@@ -1,23 +1,57 @@
 """Main FastAPI Application for FINCoach AI Backend"""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
-from app.api import auth, users, transactions, jars, goals, alerts, agents, ml_modules, analytics, mobile, notifications, social
+from app.api import include_router_groups, resolve_router_groups
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import create_tables, pool_stats, replica_router
+from app.core.security import password_pool
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Router groups mounted by this worker, from APP_ROLE or an explicit ROUTER_GROUPS list
+router_groups = resolve_router_groups(settings.APP_ROLE, settings.ROUTER_GROUPS)
+
+# Groups whose routes categorize transactions (SMS import, /ml/categorize)
+CATEGORIZER_GROUPS = {"core", "ai"}
+
+# Workers that accept jobs (POST /api/v1/jobs) also run them unless JOB_WORKER_ENABLED=False
+RUNS_JOBS = settings.JOB_WORKER_ENABLED and "core" in router_groups
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 FINCoach AI Backend Starting...")
+    print(f"🚀 FINCoach AI Backend Starting ({settings.APP_ROLE}: {', '.join(router_groups)})...")
+    if settings.AUTO_CREATE_TABLES:
+        create_tables()
+    if CATEGORIZER_GROUPS.intersection(router_groups):
+        from app.ml_modules.text_classifier import load_active_model
+        model = load_active_model(settings.CATEGORIZER_MODEL_PATH)
+        if model:
+            print(f"🧠 Categorizer model {model.version} loaded")
+        else:
+            print("🧠 No categorizer model found, using keyword matching")
+    if settings.WARMUP_ENABLED:
+        from app.services.warmup import warm_up
+        report = await warm_up(app, router_groups)
+        if report.get("error"):
+            print(f"⚠️  Warm-up incomplete: {report['error']}")
+        print(f"🔥 Warm-up: {report.get('pool_connections', 0)} connections, "
+              f"{report.get('matchers', 0)} matchers, {len(report.get('routes', {}))} routes "
+              f"({', '.join(f'{step} {ms:.0f}ms' for step, ms in report['steps'].items())})")
+    if RUNS_JOBS:
+        from app.services.jobs import job_runner
+        if "realtime" in router_groups:
+            from app.api.notifications import notify_job_finished
+            job_runner.add_listener(notify_job_finished)
+        await job_runner.start()
     yield
     # Shutdown
     print("🛑 FINCoach AI Backend Shutting Down...")
+    if RUNS_JOBS:
+        await job_runner.stop()
+    password_pool.shutdown()
 
 app = FastAPI(
     title="FINCoach AI Backend",
@@ -35,23 +69,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers - Core Features
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
-app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
-app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["Transactions"])
-app.include_router(jars.router, prefix="/api/v1/jars", tags=["Jars"])
-app.include_router(goals.router, prefix="/api/v1/goals", tags=["Goals"])
-app.include_router(alerts.router, prefix="/api/v1/alerts", tags=["Alerts"])
+# Compress large JSON bodies for clients that accept it
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
+# Per-route SQL statement budgets; added first so it sits inside the metrics middleware
+if settings.QUERY_BUDGET_MODE != "off":
+    from app.core.query_budget import QueryBudgetMiddleware
+    
+    app.add_middleware(QueryBudgetMiddleware, mode=settings.QUERY_BUDGET_MODE)
 
-# Include routers - AI & ML
-app.include_router(agents.router, tags=["AI Agents"])
-app.include_router(ml_modules.router, tags=["ML Modules"])
+# Per-route latency, status and SQL usage, served at /metrics; outermost so it times everything
+if settings.METRICS_ENABLED:
+    from app.core.auth_cache import principal_cache
+    from app.core.metrics import MetricsMiddleware, expose_stats, registry
+    
+    app.add_middleware(MetricsMiddleware)
+    expose_stats("fincoach_password_hash", "Password hashing pool", password_pool.stats,
+                 gauges=("queued", "running"), counters=("completed", "rejected"))
+    expose_stats("fincoach_auth_cache", "Verified-token cache", principal_cache.stats,
+                 gauges=("size",), counters=("hits", "misses"))
+    expose_stats("fincoach_db_pool", "Connection pool", pool_stats, label="pool",
+                 gauges=("size", "max_overflow", "checked_out", "saturation"),
+                 counters=("checkouts", "exhausted", "timeouts", "wait_seconds"))
+    if RUNS_JOBS:
+        from app.services.jobs import job_runner
+        expose_stats("fincoach_jobs", "Background jobs of this worker", job_runner.stats,
+                     gauges=("running",), counters=("completed", "failed", "retried", "recovered"))
+    if replica_router is not None:
+        expose_stats("fincoach_replica", "Read replica routing", replica_router.stats,
+                     gauges=("usable", "lag_seconds"), counters=("replica_reads", "primary_reads", "fallbacks"))
+    
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus text exposition of this worker's metrics"""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
-# Include routers - New Features (Phase 2)
-app.include_router(analytics.router, tags=["Analytics"])
-app.include_router(mobile.router, tags=["Mobile Integration"])
-app.include_router(notifications.router, tags=["Real-time Notifications"])
-app.include_router(social.router, tags=["Social Features"])
+# Include routers for this deployment role
+include_router_groups(app, router_groups)
 
 @app.get("/health")
 async def health_check():
@@ -59,7 +118,12 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "FINCoach AI Backend",
-        "version": "1.1.0"
+        "version": "1.1.0",
+        "role": settings.APP_ROLE,
+        "router_groups": router_groups,
+        "password_hashing": password_pool.stats(),
+        "db_pools": pool_stats(),
+        "read_replica": replica_router.stats() if replica_router is not None else None
     }
 
 @app.get("/")
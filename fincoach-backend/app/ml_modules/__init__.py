@@ -1,6 +1,16 @@
 """Machine Learning Modules for FINCoach AI"""
-from app.ml_modules.prediction_engine import PredictionEngine
-from app.ml_modules.categorizer import TransactionCategorizer
-from app.ml_modules.anomaly_detector import AnomalyDetector
+from importlib import import_module
+
+# Exports resolve on first access (PEP 562), so importing one ML module does not load the rest
+_EXPORTS = {
+    "PredictionEngine": "app.ml_modules.prediction_engine",
+    "TransactionCategorizer": "app.ml_modules.categorizer",
+    "AnomalyDetector": "app.ml_modules.anomaly_detector"
+}
 
 __all__ = ["PredictionEngine", "TransactionCategorizer", "AnomalyDetector"]
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
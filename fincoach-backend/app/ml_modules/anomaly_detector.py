@@ -1,6 +1,7 @@
 """Anomaly Detector - ML module for detecting unusual transactions"""
 from typing import Dict, List
 from datetime import datetime, timedelta
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from app.models.transaction import Transaction
 
@@ -54,47 +55,54 @@ class AnomalyDetector:
     
     def detect_spending_spike(self, user_id: int) -> Dict:
         """Detect if there's a spending spike this month"""
-        # Get current month spending
+        return self.detect_spending_spikes([user_id])[user_id]
+    
+    def detect_spending_spikes(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """detect_spending_spike for many users at once, from one grouped query"""
+        # Current month spending against the average of the last 3 months
         current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        current_month_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= current_month_start
-        ).all()
-        
-        current_month_total = sum(t.amount for t in current_month_expenses)
-        
-        # Get last 3 months average
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        historical_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
+        current = Transaction.transaction_date >= current_month_start
+        historical = (Transaction.transaction_date >= three_months_ago) & (Transaction.transaction_date < current_month_start)
+        rows = self.db.query(
+            Transaction.user_id,
+            func.sum(case((current, Transaction.amount), else_=0.0)),
+            func.sum(case((historical, Transaction.amount), else_=0.0)),
+            func.count(case((historical, 1)))
+        ).filter(
+            Transaction.user_id.in_(user_ids),
             Transaction.type == "expense",
-            Transaction.transaction_date >= three_months_ago,
-            Transaction.transaction_date < current_month_start
-        ).all()
-        
-        if not historical_expenses:
-            return {
-                "status": "insufficient_data",
-                "is_spike": False,
-                "message": "Need historical data"
+            Transaction.transaction_date >= min(three_months_ago, current_month_start)
+        ).group_by(Transaction.user_id).all()
+        totals = {user_id: (current_total, historical_total, count) for user_id, current_total, historical_total, count in rows}
+        
+        results = {}
+        for user_id in user_ids:
+            current_month_total, historical_total, historical_count = totals.get(user_id, (0.0, 0.0, 0))
+            if not historical_count:
+                results[user_id] = {
+                    "status": "insufficient_data",
+                    "is_spike": False,
+                    "message": "Need historical data"
+                }
+                continue
+            
+            historical_average = historical_total / 3
+            
+            # Calculate percentage increase
+            percentage_increase = ((current_month_total - historical_average) / historical_average * 100) if historical_average > 0 else 0
+            
+            is_spike = percentage_increase > 20  # More than 20% increase
+            
+            results[user_id] = {
+                "status": "success",
+                "is_spike": is_spike,
+                "current_month_spending": round(current_month_total, 2),
+                "historical_average": round(historical_average, 2),
+                "percentage_increase": round(percentage_increase, 2),
+                "recommendation": self._get_spike_recommendation(is_spike, percentage_increase)
             }
-        
-        historical_average = sum(t.amount for t in historical_expenses) / 3
-        
-        # Calculate percentage increase
-        percentage_increase = ((current_month_total - historical_average) / historical_average * 100) if historical_average > 0 else 0
-        
-        is_spike = percentage_increase > 20  # More than 20% increase
-        
-        return {
-            "status": "success",
-            "is_spike": is_spike,
-            "current_month_spending": round(current_month_total, 2),
-            "historical_average": round(historical_average, 2),
-            "percentage_increase": round(percentage_increase, 2),
-            "recommendation": self._get_spike_recommendation(is_spike, percentage_increase)
-        }
+        return results
     
     def detect_unusual_pattern(self, user_id: int) -> Dict:
         """Detect unusual spending patterns"""
@@ -1,8 +1,18 @@
 """Transaction Categorizer - ML module for automatic categorization"""
-from typing import Dict, List
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.category_rule import CategoryRule
+from app.ml_modules.text_classifier import TextCategoryModel, get_active_model
+from app.ml_modules.rule_matcher import CompiledRuleMatcher, matcher_cache
 
 class TransactionCategorizer:
-    """Machine Learning module for automatic transaction categorization"""
+    """Machine Learning module for automatic transaction categorization.
+
+    A user's own keyword rules always win. Otherwise the trained text model
+    loaded at startup is used when available, falling back to the global
+    keyword rules.
+    """
     
     # Keywords mapping for categories
     CATEGORY_KEYWORDS = {
@@ -20,31 +30,104 @@ class TransactionCategorizer:
         "investment": ["investment", "stock", "mutual fund", "crypto", "bitcoin", "ethereum"]
     }
     
+    def __init__(self, db: Optional[Session] = None, user_id: Optional[int] = None, model: Optional[TextCategoryModel] = None):
+        self.db = db
+        self.user_id = user_id
+        self.model = model if model is not None else get_active_model()
+        self._matcher = None
+    
     def categorize_transaction(self, description: str, amount: float = None) -> Dict:
         """Categorize a transaction based on description"""
-        description_lower = description.lower()
+        match = self.get_matcher().match(description)
+        if match is not None and match[2] == "user":
+            return self._keyword_result(match)
         
-        # Find matching category
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in description_lower:
-                    return {
-                        "status": "success",
-                        "category": category,
-                        "confidence": 0.85,
-                        "matched_keyword": keyword
-                    }
+        if self.model is not None:
+            categories, confidences = self.model.predict([description])
+            return self._model_result(categories[0], confidences[0])
+        
+        return self._keyword_result(match)
+    
+    def get_matcher(self) -> CompiledRuleMatcher:
+        """Compiled matcher over the user's rules followed by the global keywords.
+
+        Matchers are shared across requests through an LRU keyed by user and
+        rebuilt whenever the user's rule version changes.
+        """
+        if self._matcher is None:
+            if self.db is not None and self.user_id is not None:
+                version = self.db.query(User.category_rules_version).filter(User.id == self.user_id).scalar() or 0
+                self._matcher = matcher_cache.get(self.user_id, version, self._build_user_matcher)
+            else:
+                self._matcher = matcher_cache.get("global", 0, self._build_global_matcher)
+        return self._matcher
+    
+    def _global_rules(self) -> List:
+        return [
+            (keyword, category, "global")
+            for category, keywords in self.CATEGORY_KEYWORDS.items()
+            for keyword in keywords
+        ]
+    
+    def _build_global_matcher(self) -> CompiledRuleMatcher:
+        return CompiledRuleMatcher(self._global_rules())
+    
+    def _build_user_matcher(self) -> CompiledRuleMatcher:
+        user_rules = self.db.query(CategoryRule.keyword, CategoryRule.category).filter(
+            CategoryRule.user_id == self.user_id
+        ).order_by(CategoryRule.updated_at.desc()).all()
+        return CompiledRuleMatcher([(keyword, category, "user") for keyword, category in user_rules] + self._global_rules())
+    
+    def _keyword_result(self, match) -> Dict:
+        """Format a keyword rule match"""
+        if match is not None:
+            keyword, category, source = match
+            return {
+                "status": "success",
+                "category": category,
+                "confidence": 0.95 if source == "user" else 0.85,
+                "matched_keyword": keyword,
+                "method": "user_rule" if source == "user" else "keywords"
+            }
         
         # Default category if no match
         return {
             "status": "success",
             "category": "other",
             "confidence": 0.0,
-            "matched_keyword": None
+            "matched_keyword": None,
+            "method": "keywords"
+        }
+    
+    def _model_result(self, category: str, confidence: float) -> Dict:
+        """Format a trained model prediction like a keyword match"""
+        return {
+            "status": "success",
+            "category": str(category),
+            "confidence": round(float(confidence), 4),
+            "matched_keyword": None,
+            "method": "model",
+            "model_version": self.model.version
         }
     
     def batch_categorize(self, transactions: List[Dict]) -> List[Dict]:
         """Categorize multiple transactions"""
+        if self.model is not None:
+            matcher = self.get_matcher()
+            descriptions = [t.get("description") or "" for t in transactions]
+            # One sparse matrix prediction for the whole batch; user rules still take precedence
+            categories, confidences = self.model.predict(descriptions)
+            results = []
+            for transaction, description, category, confidence in zip(transactions, descriptions, categories, confidences):
+                match = matcher.match(description)
+                if match is not None and match[2] == "user":
+                    categorization = self._keyword_result(match)
+                else:
+                    categorization = self._model_result(category, confidence)
+                categorization["transaction_id"] = transaction.get("id")
+                results.append(categorization)
+            return results
+        
         results = []
         for transaction in transactions:
             description = transaction.get("description", "")
@@ -58,6 +141,12 @@ class TransactionCategorizer:
     
     def get_category_suggestions(self, description: str) -> List[Dict]:
         """Get multiple category suggestions for a transaction"""
+        if self.model is not None:
+            return [
+                {"category": category, "confidence": round(confidence, 4), "matched_keywords": []}
+                for category, confidence in self.model.predict_top(description, k=3)
+            ]
+        
         description_lower = description.lower()
         suggestions = []
         
@@ -83,14 +172,62 @@ class TransactionCategorizer:
         return suggestions[:3]  # Return top 3 suggestions
     
     def add_custom_category_rule(self, keyword: str, category: str) -> Dict:
-        """Add custom categorization rule"""
-        if category not in self.CATEGORY_KEYWORDS:
-            self.CATEGORY_KEYWORDS[category] = []
+        """Add or replace a custom categorization rule for the user"""
+        if self.db is None or self.user_id is None:
+            return {"status": "error", "message": "Custom rules require a user"}
+        
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return {"status": "error", "message": "Keyword cannot be empty"}
         
-        if keyword not in self.CATEGORY_KEYWORDS[category]:
-            self.CATEGORY_KEYWORDS[category].append(keyword.lower())
+        rule = self.db.query(CategoryRule).filter(
+            CategoryRule.user_id == self.user_id,
+            CategoryRule.keyword == keyword
+        ).first()
+        if rule:
+            rule.category = category
+        else:
+            self.db.add(CategoryRule(user_id=self.user_id, keyword=keyword, category=category))
+        self._bump_rules_version()
         
         return {
             "status": "success",
             "message": f"Added '{keyword}' to '{category}' category"
         }
+    
+    def remove_custom_category_rule(self, keyword: str) -> Dict:
+        """Delete a custom categorization rule of the user"""
+        if self.db is None or self.user_id is None:
+            return {"status": "error", "message": "Custom rules require a user"}
+        
+        deleted = self.db.query(CategoryRule).filter(
+            CategoryRule.user_id == self.user_id,
+            CategoryRule.keyword == keyword.strip().lower()
+        ).delete(synchronize_session=False)
+        if not deleted:
+            return {"status": "error", "message": f"No rule for '{keyword}'"}
+        self._bump_rules_version()
+        
+        return {
+            "status": "success",
+            "message": f"Removed rule for '{keyword}'"
+        }
+    
+    def list_custom_category_rules(self) -> List[Dict]:
+        """List the user's custom rules, newest first"""
+        if self.db is None or self.user_id is None:
+            return []
+        rules = self.db.query(CategoryRule).filter(
+            CategoryRule.user_id == self.user_id
+        ).order_by(CategoryRule.updated_at.desc()).all()
+        return [{"keyword": rule.keyword, "category": rule.category} for rule in rules]
+    
+    def _bump_rules_version(self) -> None:
+        """Commit the rule change and invalidate every worker's compiled matcher for the user"""
+        self.db.query(User).filter(User.id == self.user_id).update(
+            {User.category_rules_version: User.category_rules_version + 1},
+            synchronize_session=False
+        )
+        self.db.commit()
+        matcher_cache.invalidate(self.user_id)
+        self._matcher = None
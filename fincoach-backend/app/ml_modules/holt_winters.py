@@ -0,0 +1,192 @@
+"""Holt-Winters Forecaster - vectorized exponential smoothing for monthly series"""
+from typing import Dict
+from itertools import product
+from statistics import NormalDist
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+class HoltWintersForecaster:
+    """Additive-trend Holt-Winters with additive or multiplicative seasonality.
+
+    Every method works on a 2-D array of shape (n_series, n_periods), so one call
+    fits all users of a batch job at once; a single user's series is just a
+    batch of one. Series must be aligned on the same calendar periods and in
+    time order (oldest first).
+    """
+
+    SEASONAL_MODES = ("additive", "multiplicative")
+
+    # Smoothing parameter grid searched per series
+    ALPHA_GRID = (0.1, 0.3, 0.5, 0.7, 0.9)
+    BETA_GRID = (0.01, 0.1, 0.2)
+    GAMMA_GRID = (0.05, 0.2, 0.4)
+
+    def __init__(self, season_length: int = 12, seasonal: str = "additive"):
+        if seasonal not in self.SEASONAL_MODES:
+            raise ValueError(f"seasonal must be one of {self.SEASONAL_MODES}")
+        self.season_length = season_length
+        self.seasonal = seasonal
+
+    def fit(self, series) -> Dict:
+        """Fit a single series and return its state"""
+        state = self.fit_batch(np.asarray(series, dtype=np.float64)[np.newaxis, :])
+        return {key: value[0] if isinstance(value, np.ndarray) else value for key, value in state.items()}
+
+    def fit_batch(self, series) -> Dict:
+        """Fit many series at once, choosing smoothing parameters per series by in-sample SSE.
+
+        Returns a state dict of arrays indexed by series. ``seasonal`` holds the next
+        ``season_length`` seasonal indices, ``seasonal[:, 0]`` being the one applied
+        to the first forecast period.
+        """
+        y = np.asarray(series, dtype=np.float64)
+        if y.ndim != 2:
+            raise ValueError("series must be a 2-D array of shape (n_series, n_periods)")
+        n_series, n_periods = y.shape
+        if n_periods < 3:
+            raise ValueError("Need at least 3 periods to fit")
+        if self.seasonal == "multiplicative" and np.any(y <= 0):
+            raise ValueError("Multiplicative seasonality requires strictly positive values")
+
+        is_seasonal = n_periods >= 2 * self.season_length
+        gammas = self.GAMMA_GRID if is_seasonal else (0.0,)
+        grid = np.array(list(product(self.ALPHA_GRID, self.BETA_GRID, gammas)))
+        n_grid = len(grid)
+
+        # Evaluate every parameter combination for every series in one pass:
+        # row r of the stacked batch is series r // n_grid with combination r % n_grid.
+        stacked = np.repeat(y, n_grid, axis=0)
+        params = np.tile(grid, (n_series, 1))
+        level, trend, seasonal = self._initial_state(stacked, is_seasonal)
+        level, trend, seasonal, errors = self._smooth(
+            stacked, level, trend, seasonal, params[:, 0], params[:, 1], params[:, 2],
+            multiplicative=self.seasonal == "multiplicative"
+        )
+
+        warmup = self.season_length if is_seasonal else 1
+        sse = np.sum(errors[:, warmup:] ** 2, axis=1).reshape(n_series, n_grid)
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n_series) * n_grid + best
+
+        n_errors = n_periods - warmup
+        return {
+            "level": level[rows],
+            "trend": trend[rows],
+            "seasonal": seasonal[rows],
+            "alpha": params[rows, 0],
+            "beta": params[rows, 1],
+            "gamma": params[rows, 2],
+            "sigma": np.sqrt(sse[np.arange(n_series), best] / max(n_errors, 1)),
+            "n_periods": n_periods,
+            "season_length": self.season_length,
+            "seasonal_mode": self.seasonal,
+            "is_seasonal": is_seasonal,
+        }
+
+    def forecast(self, state: Dict, horizon: int = 1, confidence: float = 0.95) -> Dict:
+        """Forecast ``horizon`` periods ahead with prediction intervals.
+
+        Works on both single-series and batch states; arrays gain a trailing
+        horizon axis. Lower bounds are clipped at zero since spending cannot
+        be negative.
+        """
+        level = np.asarray(state["level"], dtype=np.float64)
+        trend = np.asarray(state["trend"], dtype=np.float64)
+        seasonal = np.asarray(state["seasonal"], dtype=np.float64)
+        alpha = np.asarray(state["alpha"], dtype=np.float64)
+        beta = np.asarray(state["beta"], dtype=np.float64)
+        gamma = np.asarray(state["gamma"], dtype=np.float64)
+        sigma = np.asarray(state["sigma"], dtype=np.float64)
+        season_length = seasonal.shape[-1]
+
+        steps = np.arange(1, horizon + 1)
+        season_idx = (steps - 1) % season_length
+        base = level[..., np.newaxis] + trend[..., np.newaxis] * steps
+        season = seasonal[..., season_idx]
+        if state["seasonal_mode"] == "multiplicative":
+            point = base * season
+        else:
+            point = base + season
+
+        # Variance multiplier for the additive error model (Hyndman et al., class 1):
+        # 1 + sum_{j=1}^{h-1} (alpha * (1 + j*beta) + gamma * [j % m == 0])^2
+        j = np.arange(1, horizon)
+        c = alpha[..., np.newaxis] * (1 + j * beta[..., np.newaxis]) + gamma[..., np.newaxis] * (j % season_length == 0)
+        multiplier = np.concatenate([np.ones(c.shape[:-1] + (1,)), 1 + np.cumsum(c ** 2, axis=-1)], axis=-1)
+        half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * sigma[..., np.newaxis] * np.sqrt(multiplier)
+        if state["seasonal_mode"] == "multiplicative":
+            half_width = half_width * season
+
+        return {
+            "forecast": point,
+            "lower": np.maximum(point - half_width, 0.0),
+            "upper": point + half_width,
+            "confidence": confidence,
+        }
+
+    def update(self, state: Dict, value: float) -> Dict:
+        """Fold one new observation into a fitted single-series state in O(1).
+
+        Smoothing parameters stay fixed; sigma is updated as a running RMSE of
+        the one-step errors.
+        """
+        y = np.array([[value]], dtype=np.float64)
+        level, trend, seasonal, errors = self._smooth(
+            y,
+            np.array([state["level"]], dtype=np.float64),
+            np.array([state["trend"]], dtype=np.float64),
+            np.asarray(state["seasonal"], dtype=np.float64)[np.newaxis, :],
+            state["alpha"], state["beta"], state["gamma"],
+            multiplicative=state["seasonal_mode"] == "multiplicative"
+        )
+        warmup = state["season_length"] if state["is_seasonal"] else 1
+        n_errors = max(state["n_periods"] - warmup, 0)
+        sse = state["sigma"] ** 2 * n_errors + errors[0, 0] ** 2
+        return {
+            **state,
+            "level": level[0],
+            "trend": trend[0],
+            "seasonal": seasonal[0],
+            "sigma": np.sqrt(sse / (n_errors + 1)),
+            "n_periods": state["n_periods"] + 1,
+        }
+
+    def _initial_state(self, y: "np.ndarray", is_seasonal: bool):
+        """Classical decomposition start values from the first two seasons"""
+        m = self.season_length
+        multiplicative = self.seasonal == "multiplicative"
+        if is_seasonal:
+            first = y[:, :m].mean(axis=1)
+            second = y[:, m:2 * m].mean(axis=1)
+            trend = (second - first) / m
+            # Back the level up so that level + trend lands on period 0, not the season midpoint
+            level = first - trend * (m + 1) / 2
+            seasonal = y[:, :m] / first[:, np.newaxis] if multiplicative else y[:, :m] - first[:, np.newaxis]
+        else:
+            trend = y[:, 1] - y[:, 0]
+            level = y[:, 0] - trend
+            seasonal = np.full((y.shape[0], m), 1.0 if multiplicative else 0.0)
+        return level, trend, seasonal
+
+    @staticmethod
+    def _smooth(y, level, trend, seasonal, alpha, beta, gamma, multiplicative: bool):
+        """Run the smoothing recursions across all rows; returns final state and one-step errors"""
+        errors = np.empty_like(y)
+        seasonal = seasonal.copy()
+        for t in range(y.shape[1]):
+            obs = y[:, t]
+            s = seasonal[:, 0]
+            if multiplicative:
+                errors[:, t] = obs - (level + trend) * s
+                new_level = alpha * (obs / s) + (1 - alpha) * (level + trend)
+                new_season = gamma * (obs / new_level) + (1 - gamma) * s
+            else:
+                errors[:, t] = obs - (level + trend + s)
+                new_level = alpha * (obs - s) + (1 - alpha) * (level + trend)
+                new_season = gamma * (obs - new_level) + (1 - gamma) * s
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            level = new_level
+            seasonal[:, :-1] = seasonal[:, 1:]
+            seasonal[:, -1] = new_season
+        return level, trend, seasonal, errors
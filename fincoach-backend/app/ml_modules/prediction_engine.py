@@ -1,82 +1,272 @@
-"""Prediction Engine - ML module for financial predictions"""
-from typing import Dict, List
+"""Prediction Engine - ML module for financial predictions
+
+Forecast states are refitted lazily when a read finds them stale. Refresh
+every user's state in bulk (nightly from cron, or after bulk loads):
+    python -m app.ml_modules.prediction_engine
+    python -m app.ml_modules.prediction_engine --batch-size 5000
+"""
+import argparse
+import time
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func, select, union
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models.transaction import Transaction
+from app.models.forecast_state import ForecastState
+from app.ml_modules.holt_winters import HoltWintersForecaster
+from app.core.lazy import lazy_import
+from app.core.money import MINOR_UNITS, from_minor, minor_units
+from app.services.spend_counters import type_totals
+
+np = lazy_import("numpy")
 
 class PredictionEngine:
     """Machine Learning engine for financial predictions"""
     
+    # Monthly history used for expense forecasts (two seasons enable seasonality)
+    HISTORY_MONTHS = 24
+    SEASON_LENGTH = 12
+    # Months a stored state may be rolled forward before it is refitted instead
+    MAX_ROLL_MONTHS = 2
+    
     def __init__(self, db: Session):
         self.db = db
     
     def predict_next_month_spending(self, user_id: int) -> Dict:
-        """Predict next month's spending using historical data"""
-        # Get last 6 months of data
-        six_months_ago = datetime.utcnow() - timedelta(days=180)
-        historical_data = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.transaction_date >= six_months_ago
-        ).all()
+        """Predict next month's spending with a Holt-Winters forecast"""
+        forecast = self.forecast_monthly_expenses(user_id, months_ahead=1)
+        if forecast["status"] != "success":
+            return forecast
+
+        next_month = forecast["predictions"][0]
+        return {
+            "status": "success",
+            "predicted_spending": next_month["predicted_expense"],
+            "prediction_interval": {
+                "lower": next_month["lower_bound"],
+                "upper": next_month["upper_bound"]
+            },
+            "confidence": forecast["confidence"],
+            "method": forecast["method"],
+            "months_analyzed": forecast["months_analyzed"]
+        }
+    
+    def forecast_monthly_expenses(self, user_id: int, months_ahead: int = 3, confidence: float = 0.95) -> Dict:
+        """Forecast total expenses for the next ``months_ahead`` calendar months.
+
+        Reads the user's stored forecast state and only refits from raw
+        transactions when the state is missing or stale. The model covers closed
+        months; the current month is forecast too but not reported, so
+        predictions start next month.
+        """
+        state = self.get_forecast_state(user_id)
+        if state is None:
+            return {"status": "insufficient_data", "message": "Need at least 20 expense transactions over 3 months"}
         
-        if len(historical_data) < 20:
-            return {"status": "insufficient_data", "message": "Need at least 6 months of data"}
+        forecaster = HoltWintersForecaster(season_length=self.SEASON_LENGTH, seasonal=state.seasonal_mode)
+        result = forecaster.forecast(self._state_to_dict(state), horizon=months_ahead + 1, confidence=confidence)
         
-        # Calculate monthly totals
-        monthly_data = {}
-        for transaction in historical_data:
-            month_key = transaction.transaction_date.strftime("%Y-%m")
-            if month_key not in monthly_data:
-                monthly_data[month_key] = 0
-            monthly_data[month_key] += transaction.amount
+        predictions = []
+        for step in range(1, months_ahead + 1):
+            predictions.append({
+                "month": self._month_start(state.open_month + step).strftime("%B %Y"),
+                "predicted_expense": round(float(result["forecast"][step]), 2),
+                "lower_bound": round(float(result["lower"][step]), 2),
+                "upper_bound": round(float(result["upper"][step]), 2)
+            })
         
-        # Simple exponential smoothing
-        values = sorted(monthly_data.values())
-        alpha = 0.3  # Smoothing factor
+        return {
+            "status": "success",
+            "historical_average": round(state.history_total / state.n_periods, 2),
+            "predictions": predictions,
+            "confidence": confidence,
+            "method": self._method_name(state.is_seasonal, state.seasonal_mode),
+            "months_analyzed": state.n_periods
+        }
+    
+    def batch_forecast_next_month(self, user_ids: List[int], confidence: float = 0.95) -> Dict[int, Dict]:
+        """Refit and forecast next month's spending for many users at once.
+
+        Used by ``refresh_forecasts``: rebuilds every user's stored state from
+        one query and fits users with the same history length and seasonal
+        mode together as one NumPy batch.
+        """
+        states = self.rebuild_forecast_states(user_ids)
         
-        if len(values) < 2:
-            return {"status": "insufficient_data"}
+        results = {}
+        for user_id in user_ids:
+            state = states.get(user_id)
+            if state is None:
+                results[user_id] = {"status": "insufficient_data"}
+                continue
+            forecaster = HoltWintersForecaster(season_length=self.SEASON_LENGTH, seasonal=state.seasonal_mode)
+            result = forecaster.forecast(self._state_to_dict(state), horizon=2, confidence=confidence)
+            results[user_id] = {
+                "status": "success",
+                "predicted_spending": round(float(result["forecast"][1]), 2),
+                "prediction_interval": {
+                    "lower": round(float(result["lower"][1]), 2),
+                    "upper": round(float(result["upper"][1]), 2)
+                },
+                "confidence": confidence,
+                "method": self._method_name(state.is_seasonal, state.seasonal_mode),
+                "months_analyzed": state.n_periods
+            }
         
-        # Calculate forecast
-        forecast = values[-1]
-        for i in range(len(values) - 2, -1, -1):
-            forecast = alpha * values[i] + (1 - alpha) * forecast
+        return results
+    
+    def get_forecast_state(self, user_id: int) -> Optional[ForecastState]:
+        """Return the user's forecast state rolled forward to the current month.
+
+        Closed months are folded in one O(1) step each. A full refit happens
+        only when no usable state exists.
+        """
+        current_month = self._month_index(datetime.utcnow())
+        state = self.db.query(ForecastState).filter(ForecastState.user_id == user_id).first()
+        if state is not None:
+            self._roll_forward(state, current_month)
+            if self._is_usable(state):
+                self.db.commit()
+                return state
         
-        return {
-            "status": "success",
-            "predicted_spending": round(forecast, 2),
-            "confidence": 0.75,
-            "method": "exponential_smoothing"
+        return self.rebuild_forecast_states([user_id]).get(user_id)
+    
+    def record_expense(self, user_id: int, amount: float, transaction_date: datetime) -> None:
+        """Account for a new expense in the stored forecast state.
+
+        Expenses in the open month are a single UPDATE. A later month up to
+        the current one rolls the state forward. Backdated and future-dated
+        expenses mark it stale for the next read; a refit leaves future months
+        out, and they are counted once their month opens. Call before the
+        expense is flushed. Does not commit, so the change lands with the
+        caller's transaction.
+        """
+        month = self._month_index(transaction_date)
+        if month > self._month_index(datetime.utcnow()):
+            # Rolling forward would close the partial current month as a full one
+            self.invalidate_forecast_state(user_id)
+            return
+        updated = self.db.query(ForecastState).filter(
+            ForecastState.user_id == user_id,
+            ForecastState.open_month == month
+        ).update(
+            {ForecastState.open_month_total: ForecastState.open_month_total + amount},
+            synchronize_session=False
+        )
+        if updated:
+            return
+        
+        state = self.db.query(ForecastState).filter(ForecastState.user_id == user_id).first()
+        if state is None:
+            return
+        if month < state.open_month:
+            state.is_stale = True
+            return
+        self._roll_forward(state, month)
+        state.open_month_total += amount
+    
+    def invalidate_forecast_state(self, user_id: int) -> None:
+        """Force a refit on the next read, e.g. after an expense is edited or deleted"""
+        self.db.query(ForecastState).filter(ForecastState.user_id == user_id).update(
+            {ForecastState.is_stale: True},
+            synchronize_session=False
+        )
+    
+    def rebuild_forecast_states(self, user_ids: List[int]) -> Dict[int, ForecastState]:
+        """Fully refit and store the forecast state of each user with enough history"""
+        if not user_ids:
+            return {}
+        
+        current_month = self._month_index(datetime.utcnow())
+        first_month = current_month - self.HISTORY_MONTHS
+        rows = self.db.query(Transaction.user_id, Transaction.transaction_date, minor_units(Transaction.amount)).filter(
+            Transaction.user_id.in_(user_ids),
+            Transaction.type == "expense",
+            Transaction.transaction_date >= self._month_start(first_month),
+            Transaction.transaction_date < self._month_start(current_month + 1)
+        ).all()
+        
+        # Column HISTORY_MONTHS holds the open (current) month; totals are summed exactly in paise
+        position = {user_id: i for i, user_id in enumerate(user_ids)}
+        minor = np.zeros((len(user_ids), self.HISTORY_MONTHS + 1), dtype=np.int64)
+        counts = np.zeros(len(user_ids), dtype=np.int64)
+        if rows:
+            user_pos = np.array([position[user_id] for user_id, _, _ in rows])
+            months = np.array([self._month_index(date) for _, date, _ in rows]) - first_month
+            np.add.at(minor, (user_pos, months), np.array([amount for _, _, amount in rows], dtype=np.int64))
+            np.add.at(counts, user_pos, (months < self.HISTORY_MONTHS).astype(np.int64))
+        matrix = minor / MINOR_UNITS
+        closed, open_totals = matrix[:, :-1], matrix[:, -1]
+        
+        # Series length per user once leading empty months are dropped
+        active = closed > 0
+        lengths = np.where(active.any(axis=1), self.HISTORY_MONTHS - active.argmax(axis=1), 0)
+        
+        existing = {
+            state.user_id: state
+            for state in self.db.query(ForecastState).filter(ForecastState.user_id.in_(user_ids)).all()
         }
+        states = {}
+        eligible = (counts >= 20) & (lengths >= 3)
+        for length in np.unique(lengths[eligible]):
+            group = np.flatnonzero(eligible & (lengths == length))
+            series = closed[group, self.HISTORY_MONTHS - length:]
+            positive = np.all(series > 0, axis=1)
+            for mode, mask in (("multiplicative", positive), ("additive", ~positive)):
+                if not mask.any():
+                    continue
+                forecaster = HoltWintersForecaster(season_length=self.SEASON_LENGTH, seasonal=mode)
+                fitted = forecaster.fit_batch(series[mask])
+                for k, row in enumerate(group[mask]):
+                    user_id = user_ids[row]
+                    state = existing.pop(user_id, None) or ForecastState(user_id=user_id)
+                    state.level = float(fitted["level"][k])
+                    state.trend = float(fitted["trend"][k])
+                    state.seasonal = fitted["seasonal"][k].tolist()
+                    state.alpha = float(fitted["alpha"][k])
+                    state.beta = float(fitted["beta"][k])
+                    state.gamma = float(fitted["gamma"][k])
+                    state.sigma = float(fitted["sigma"][k])
+                    state.seasonal_mode = mode
+                    state.is_seasonal = bool(fitted["is_seasonal"])
+                    state.n_periods = int(length)
+                    state.history_total = float(series[mask][k].sum())
+                    state.last_closed_month = current_month - 1
+                    state.open_month = current_month
+                    state.open_month_total = float(open_totals[row])
+                    state.is_stale = False
+                    self.db.add(state)
+                    states[user_id] = state
+        
+        # Users that no longer qualify keep no state
+        for state in existing.values():
+            self.db.delete(state)
+        
+        self.db.commit()
+        return states
     
     def predict_category_spending(self, user_id: int, category: str) -> Dict:
         """Predict spending for a specific category"""
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        category_expenses = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.category == category,
-            Transaction.transaction_date >= three_months_ago
-        ).all()
+        total, count = type_totals(self.db, user_id, three_months_ago, category).get("expense", (0, 0))
         
-        if not category_expenses:
+        if not count:
             return {"status": "no_data", "category": category}
         
-        total = sum(t.amount for t in category_expenses)
-        average = total / 3
+        average = from_minor(total) / 3
         
         return {
             "status": "success",
             "category": category,
             "predicted_monthly_spending": round(average, 2),
-            "transaction_count": len(category_expenses)
+            "transaction_count": count
         }
     
     def predict_income_trend(self, user_id: int) -> Dict:
         """Predict income trend"""
         three_months_ago = datetime.utcnow() - timedelta(days=90)
-        income_transactions = self.db.query(Transaction).filter(
+        income_transactions = self.db.query(Transaction.transaction_date, minor_units(Transaction.amount)).filter(
             Transaction.user_id == user_id,
             Transaction.type == "income",
             Transaction.transaction_date >= three_months_ago
@@ -85,16 +275,16 @@ class PredictionEngine:
         if not income_transactions:
             return {"status": "no_data"}
         
-        # Calculate monthly income
+        # Calculate monthly income, in paise
         monthly_income = {}
-        for transaction in income_transactions:
-            month_key = transaction.transaction_date.strftime("%Y-%m")
+        for transaction_date, amount in income_transactions:
+            month_key = transaction_date.strftime("%Y-%m")
             if month_key not in monthly_income:
                 monthly_income[month_key] = 0
-            monthly_income[month_key] += transaction.amount
+            monthly_income[month_key] += amount
         
         values = sorted(monthly_income.values())
-        average = sum(values) / len(values)
+        average = from_minor(sum(values)) / len(values)
         
         # Detect trend
         if len(values) >= 2:
@@ -108,3 +298,123 @@ class PredictionEngine:
             "trend": trend,
             "months_analyzed": len(values)
         }
+    
+    def _roll_forward(self, state: ForecastState, month: int) -> None:
+        """Close months up to ``month`` by folding each closed total into the model.
+
+        The newly opened month starts from its stored expenses, which include
+        any recorded while it was still in the future.
+        """
+        if state.is_stale or month <= state.open_month:
+            return
+        if month - state.open_month > self.MAX_ROLL_MONTHS:
+            state.is_stale = True
+            return
+        
+        forecaster = HoltWintersForecaster(season_length=self.SEASON_LENGTH, seasonal=state.seasonal_mode)
+        while state.open_month < month:
+            total = state.open_month_total
+            if state.seasonal_mode == "multiplicative" and total <= 0:
+                # An empty month breaks multiplicative seasonality; refit picks additive
+                state.is_stale = True
+                return
+            updated = forecaster.update(self._state_to_dict(state), total)
+            state.level = float(updated["level"])
+            state.trend = float(updated["trend"])
+            state.seasonal = updated["seasonal"].tolist()
+            state.sigma = float(updated["sigma"])
+            state.n_periods = updated["n_periods"]
+            state.history_total += total
+            state.last_closed_month = state.open_month
+            state.open_month += 1
+            state.open_month_total = 0.0
+        state.open_month_total = self._month_total(state.user_id, month)
+    
+    def _month_total(self, user_id: int, month: int) -> float:
+        """Expenses stored for one month, summed exactly in paise"""
+        total = self.db.query(func.sum(minor_units(Transaction.amount))).filter(
+            Transaction.user_id == user_id,
+            Transaction.type == "expense",
+            Transaction.transaction_date >= self._month_start(month),
+            Transaction.transaction_date < self._month_start(month + 1)
+        ).scalar()
+        return from_minor(total or 0)
+    
+    def _is_usable(self, state: ForecastState) -> bool:
+        """A state is refitted once stale or once it has enough months to become seasonal"""
+        if state.is_stale:
+            return False
+        return state.is_seasonal or state.n_periods < 2 * self.SEASON_LENGTH
+    
+    def _state_to_dict(self, state: ForecastState) -> Dict:
+        """Convert a stored state into the forecaster's state dict"""
+        return {
+            "level": state.level,
+            "trend": state.trend,
+            "seasonal": np.array(state.seasonal, dtype=np.float64),
+            "alpha": state.alpha,
+            "beta": state.beta,
+            "gamma": state.gamma,
+            "sigma": state.sigma,
+            "n_periods": state.n_periods,
+            "season_length": self.SEASON_LENGTH,
+            "seasonal_mode": state.seasonal_mode,
+            "is_seasonal": state.is_seasonal,
+        }
+    
+    @staticmethod
+    def _method_name(is_seasonal: bool, seasonal_mode: str) -> str:
+        """Describe the fitted model"""
+        if not is_seasonal:
+            return "holt_linear"
+        return f"holt_winters_{seasonal_mode}"
+    
+    @staticmethod
+    def _month_index(date: datetime) -> int:
+        """Months since year 0, so consecutive months differ by one"""
+        return date.year * 12 + date.month - 1
+    
+    @staticmethod
+    def _month_start(month_index: int) -> datetime:
+        """First instant of a month index"""
+        return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+def forecast_user_ids(db: Session) -> List[int]:
+    """Users with a stored forecast state or expenses in the forecast history window"""
+    first_month = PredictionEngine._month_index(datetime.utcnow()) - PredictionEngine.HISTORY_MONTHS
+    with_expenses = select(Transaction.user_id).where(
+        Transaction.type == "expense",
+        Transaction.transaction_date >= PredictionEngine._month_start(first_month)
+    )
+    return sorted(db.execute(union(select(ForecastState.user_id), with_expenses)).scalars())
+
+def refresh_forecasts(db: Session, batch_size: Optional[int] = None) -> Dict:
+    """Refit and forecast every user's next month, ``batch_size`` users per batch"""
+    batch_size = batch_size or settings.FORECAST_BATCH_SIZE
+    engine = PredictionEngine(db)
+    user_ids = forecast_user_ids(db)
+    forecasted = 0
+    for start in range(0, len(user_ids), batch_size):
+        results = engine.batch_forecast_next_month(user_ids[start:start + batch_size])
+        forecasted += sum(result["status"] == "success" for result in results.values())
+    return {"users": len(user_ids), "forecasted": forecasted}
+
+def main():
+    from app.core.database import BackgroundSessionLocal
+
+    parser = argparse.ArgumentParser(description="Refit every user's expense forecast state")
+    parser.add_argument("--batch-size", type=int, default=settings.FORECAST_BATCH_SIZE,
+                        help="Users fitted per batch")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = BackgroundSessionLocal()
+    try:
+        result = refresh_forecasts(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"📈 Refitted forecasts of {result['forecasted']:,} of {result['users']:,} users "
+          f"in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Rule Matcher - compiled keyword matchers with a bounded per-user cache"""
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from collections import OrderedDict
+import re
+import threading
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Regex matching the longest of ``keywords`` at a position, with shared prefixes factored out.
+
+    A flat ``a|b|c`` alternation retries every keyword at every position; the
+    trie form rejects a position after one character for most of them.
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional suffix: prefer the longer keyword, fall back to this one
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+class CompiledRuleMatcher:
+    """Match a description against many keyword rules in one regex scan.
+
+    Rules are given in priority order. The pattern is a lookahead over a
+    prefix trie of all keywords, so every start position reports its longest
+    keyword; the keywords starting there are exactly that match's prefixes,
+    whose best priority is precomputed. The best rule therefore wins no
+    matter where it appears in the text.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, str]]):
+        # rules: (keyword, category, source) in priority order
+        self.rules = []
+        self.priority = {}
+        for keyword, category, source in rules:
+            keyword = keyword.lower()
+            if keyword and keyword not in self.priority:
+                self.priority[keyword] = len(self.rules)
+                self.rules.append((keyword, category, source))
+        # Best rule among each keyword and the keywords that are its prefixes
+        self.best_rank = {}
+        for keyword, rank in self.priority.items():
+            self.best_rank[keyword] = min(
+                self.priority.get(keyword[:length], rank) for length in range(1, len(keyword) + 1)
+            )
+        if self.rules:
+            self.pattern = re.compile(f"(?=({_trie_pattern(list(self.priority))}))")
+        else:
+            self.pattern = None
+
+    def match(self, description: str) -> Optional[Tuple[str, str, str]]:
+        """Return the highest-priority (keyword, category, source) found in the description"""
+        if self.pattern is None or not description:
+            return None
+        best = None
+        for found in self.pattern.finditer(description.lower()):
+            rank = self.best_rank[found.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.rules[best] if best is not None else None
+
+class MatcherCache:
+    """Thread-safe LRU of compiled matchers keyed by user, invalidated by rule version"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[int, CompiledRuleMatcher]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int, build: Callable[[], CompiledRuleMatcher]) -> CompiledRuleMatcher:
+        """Return the cached matcher for ``key`` if it was built for ``version``, else build it"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Compile outside the lock; a concurrent build for the same key is harmless
+        matcher = build()
+        with self._lock:
+            self._entries[key] = (version, matcher)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry, e.g. right after this worker changed the user's rules"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        """Cache size and hit counts"""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+# Shared by all requests in this worker
+matcher_cache = MatcherCache()
@@ -0,0 +1,179 @@
+"""Text Classifier - trained character n-gram model for transaction categorization"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import os
+import re
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Bump when the artifact layout changes so old files are rejected instead of misread
+ARTIFACT_FORMAT_VERSION = 1
+
+class CharNgramHasher:
+    """Hash character n-grams of each word (like ``analyzer="char_wb"``) into a sparse count matrix.
+
+    Transaction descriptions reuse a small vocabulary of merchants, VPAs and
+    bank boilerplate, so the hashed n-gram indices are cached per word and a
+    description costs one tokenization plus a few dictionary lookups. Digit
+    runs (reference numbers, dates) are collapsed so they do not flood the
+    feature space.
+    """
+
+    TOKEN_PATTERN = re.compile(r"[^\s/@*:|-]+")
+    DIGITS_PATTERN = re.compile(r"\d+")
+    MAX_CACHED_WORDS = 500000
+
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 4), n_features: int = 2 ** 18):
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self._cache = {}
+
+    def fit(self, descriptions, labels=None):
+        """Stateless; present for the scikit-learn pipeline API"""
+        return self
+
+    def transform(self, descriptions):
+        """Return a CSR matrix of n-gram counts, one row per description"""
+        import scipy.sparse as sp
+
+        parts = []
+        indptr = [0]
+        total = 0
+        for description in descriptions:
+            for word in self.TOKEN_PATTERN.findall(self.DIGITS_PATTERN.sub("0", (description or "").lower())):
+                indices = self._cache.get(word)
+                if indices is None:
+                    indices = self._hash_word(word)
+                indices_count = len(indices)
+                if indices_count:
+                    parts.append(indices)
+                    total += indices_count
+            indptr.append(total)
+
+        indices = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+        matrix = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, self.n_features)
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def fit_transform(self, descriptions, labels=None):
+        return self.transform(descriptions)
+
+    def _hash_word(self, word: str) -> "np.ndarray":
+        """Hash the n-grams of one space-padded word and cache the result"""
+        from sklearn.utils import murmurhash3_32
+
+        padded = f" {word} "
+        low, high = self.ngram_range
+        grams = [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+        indices = np.array([murmurhash3_32(gram, positive=True) % self.n_features for gram in grams], dtype=np.int32)
+        if len(self._cache) >= self.MAX_CACHED_WORDS:
+            self._cache.clear()
+        self._cache[word] = indices
+        return indices
+
+    def __getstate__(self):
+        # The cache is rebuilt on first use rather than stored in the artifact
+        return {"ngram_range": self.ngram_range, "n_features": self.n_features}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = {}
+
+class TextCategoryModel:
+    """TF-IDF over hashed character n-grams followed by a calibrated linear SVM.
+
+    Sigmoid calibration turns SVM margins into probabilities that are reported
+    as confidences.
+    """
+
+    def __init__(self, pipeline=None, classes: Optional[List[str]] = None, version: Optional[str] = None):
+        self.pipeline = pipeline
+        self.classes = np.array(classes) if classes is not None else None
+        self.version = version
+
+    @classmethod
+    def train(cls, descriptions: List[str], labels: List[str]) -> "TextCategoryModel":
+        """Fit a new model on labeled descriptions"""
+        from sklearn.pipeline import make_pipeline
+        from sklearn.feature_extraction.text import TfidfTransformer
+        from sklearn.svm import LinearSVC
+        from sklearn.calibration import CalibratedClassifierCV
+
+        pipeline = make_pipeline(
+            CharNgramHasher(),
+            TfidfTransformer(sublinear_tf=True),
+            CalibratedClassifierCV(LinearSVC(C=0.5, dual=True), method="sigmoid", cv=3, ensemble=False)
+        )
+        pipeline.fit(descriptions, np.asarray(labels))
+        version = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        return cls(pipeline, list(pipeline.classes_), version)
+
+    def predict(self, descriptions: List[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Predict categories and confidences for a batch of descriptions in one sparse pass"""
+        probabilities = self.pipeline.predict_proba(descriptions)
+        best = probabilities.argmax(axis=1)
+        return self.classes[best], probabilities[np.arange(len(best)), best]
+
+    def predict_top(self, description: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Return the ``k`` most likely categories for one description"""
+        probabilities = self.pipeline.predict_proba([description])[0]
+        order = np.argsort(probabilities)[::-1][:k]
+        return [(str(self.classes[i]), float(probabilities[i])) for i in order]
+
+    def save(self, path: str) -> str:
+        """Write the artifact to ``path`` and a versioned copy next to it; returns the versioned path"""
+        import joblib
+
+        artifact = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "model_version": self.version,
+            "classes": self.classes.tolist(),
+            "pipeline": self.pipeline
+        }
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        root, ext = os.path.splitext(os.path.basename(path))
+        versioned_path = os.path.join(directory, f"{root}-{self.version}{ext}")
+        joblib.dump(artifact, versioned_path)
+
+        # Replace the active artifact atomically so a running loader never sees a partial file
+        tmp_path = f"{path}.tmp"
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+        return versioned_path
+
+    @classmethod
+    def load(cls, path: str) -> "TextCategoryModel":
+        """Read an artifact written by ``save``"""
+        import joblib
+
+        artifact = joblib.load(path)
+        if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported categorizer artifact format: {artifact.get('format_version')}")
+        return cls(artifact["pipeline"], artifact["classes"], artifact["model_version"])
+
+# Model shared by all requests, loaded once at startup
+_active_model: Optional[TextCategoryModel] = None
+
+def load_active_model(path: str) -> Optional[TextCategoryModel]:
+    """Load the artifact at ``path`` as the active model; keeps keyword matching if it is missing"""
+    global _active_model
+    if not os.path.exists(path):
+        _active_model = None
+        return None
+    _active_model = TextCategoryModel.load(path)
+    return _active_model
+
+def get_active_model() -> Optional[TextCategoryModel]:
+    """Return the model loaded at startup, if any"""
+    return _active_model
+
+def get_active_model_info() -> Dict:
+    """Describe the active model for status endpoints"""
+    if _active_model is None:
+        return {"backend": "keywords", "model_version": None}
+    return {"backend": "model", "model_version": _active_model.version, "classes": _active_model.classes.tolist()}
@@ -4,5 +4,11 @@ from app.models.transaction import Transaction
 from app.models.jar import Jar
 from app.models.goal import Goal
 from app.models.alert import Alert
+from app.models.forecast_state import ForecastState
+from app.models.category_rule import CategoryRule
+from app.models.change_log import ChangeLogEntry
+from app.models.job import Job
+from app.models.watermark import Watermark
+from app.models.spend_counter import SpendCounter
 
-__all__ = ["User", "Transaction", "Jar", "Goal", "Alert"]
+__all__ = ["User", "Transaction", "Jar", "Goal", "Alert", "ForecastState", "CategoryRule", "ChangeLogEntry", "Job", "Watermark", "SpendCounter"]
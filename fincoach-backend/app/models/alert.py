@@ -1,5 +1,5 @@
 """Alert database model"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
@@ -22,11 +22,17 @@ class Alert(Base):
     message = Column(String(500), nullable=False)
     severity = Column(Enum(AlertSeverity), default=AlertSeverity.INFO)
     is_read = Column(Boolean, default=False)
+    # Set on generated alerts so each condition alerts once (e.g. "budget:2024-05:80"); NULL for manual ones
+    dedupe_key = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="alerts")
     
+    __table_args__ = (
+        UniqueConstraint("user_id", "dedupe_key", name="uq_alerts_user_dedupe_key"),
+    )
+    
     def __repr__(self):
         return f"<Alert(id={self.id}, user_id={self.user_id}, severity={self.severity}, is_read={self.is_read})>"
@@ -0,0 +1,25 @@
+"""Category rule database model"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+
+class CategoryRule(Base):
+    """User-defined keyword to category rule for the transaction categorizer"""
+    __tablename__ = "category_rules"
+    __table_args__ = (
+        UniqueConstraint("user_id", "keyword", name="uq_category_rules_user_keyword"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    keyword = Column(String(100), nullable=False)
+    category = Column(String(50), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="category_rules")
+    
+    def __repr__(self):
+        return f"<CategoryRule(id={self.id}, user_id={self.user_id}, keyword={self.keyword}, category={self.category})>"
@@ -0,0 +1,95 @@
+"""Per-user change log backing mobile delta sync"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, event, insert, inspect, update
+from sqlalchemy.engine import Connection
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Iterable
+from app.core.database import Base
+from app.models.user import User
+from app.models.transaction import Transaction
+from app.models.jar import Jar
+from app.models.goal import Goal
+from app.models.alert import Alert
+
+class ChangeOperation(str, PyEnum):
+    """What happened to the row"""
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+class ChangeLogEntry(Base):
+    """One create, update or delete of a synced row, numbered by the user's change sequence
+
+    Delete entries are the tombstones clients use to drop rows they hold.
+    """
+    __tablename__ = "change_log"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Scans for users with recent activity (the alert engine's watermark)
+    __table_args__ = (
+        Index("ix_change_log_created_at", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<ChangeLogEntry(user_id={self.user_id}, seq={self.seq}, {self.operation} {self.entity}/{self.entity_id})>"
+
+# Synced models by the entity name clients see
+SYNCED_MODELS = {
+    "transactions": Transaction,
+    "jars": Jar,
+    "goals": Goal,
+    "alerts": Alert
+}
+
+def record_changes(connection: Connection, user_id: int, entity: str, entity_ids: Iterable[int],
+                   operation: ChangeOperation) -> None:
+    """Append change log entries in the caller's transaction.
+
+    Bumping ``users.change_seq`` row-locks the user until commit, so one user's
+    entries become visible in sequence order and a client never skips a change.
+    """
+    entity_ids = list(entity_ids)
+    if not entity_ids:
+        return
+    users = User.__table__
+    last_seq = connection.execute(
+        update(users).where(users.c.id == user_id).values(
+            change_seq=users.c.change_seq + len(entity_ids)
+        ).returning(users.c.change_seq)
+    ).scalar()
+    if last_seq is None:
+        return
+    first_seq = last_seq - len(entity_ids) + 1
+    now = datetime.utcnow()
+    connection.execute(insert(ChangeLogEntry.__table__), [
+        {
+            "user_id": user_id,
+            "seq": first_seq + offset,
+            "entity": entity,
+            "entity_id": entity_id,
+            "operation": operation.value,
+            "created_at": now
+        }
+        for offset, entity_id in enumerate(entity_ids)
+    ])
+
+def _has_column_changes(target) -> bool:
+    return any(attr.history.has_changes() for attr in inspect(target).attrs)
+
+def _track(entity: str, operation: ChangeOperation, changed_only: bool = False):
+    def listener(mapper, connection, target):
+        # Flushes of rows marked dirty without a net change are not changes
+        if changed_only and not _has_column_changes(target):
+            return
+        record_changes(connection, target.user_id, entity, [target.id], operation)
+    return listener
+
+for _entity, _model in SYNCED_MODELS.items():
+    event.listen(_model, "after_insert", _track(_entity, ChangeOperation.UPSERT))
+    event.listen(_model, "after_update", _track(_entity, ChangeOperation.UPSERT, changed_only=True))
+    event.listen(_model, "after_delete", _track(_entity, ChangeOperation.DELETE))
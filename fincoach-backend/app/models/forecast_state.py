@@ -0,0 +1,41 @@
+"""Forecast state database model"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+
+class ForecastState(Base):
+    """Holt-Winters state of a user's monthly expense series.
+
+    Months are stored as indices (year * 12 + month - 1). ``open_month`` is the
+    month being accumulated into ``open_month_total`` and is always
+    ``last_closed_month + 1``; the smoothing components cover months up to
+    ``last_closed_month``.
+    """
+    __tablename__ = "forecast_states"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    level = Column(Float, nullable=False)
+    trend = Column(Float, nullable=False)
+    seasonal = Column(JSON, nullable=False)
+    alpha = Column(Float, nullable=False)
+    beta = Column(Float, nullable=False)
+    gamma = Column(Float, nullable=False)
+    sigma = Column(Float, nullable=False)
+    seasonal_mode = Column(String(20), nullable=False)
+    is_seasonal = Column(Boolean, default=False)
+    n_periods = Column(Integer, nullable=False)
+    history_total = Column(Float, default=0.0)
+    last_closed_month = Column(Integer, nullable=False)
+    open_month = Column(Integer, nullable=False)
+    open_month_total = Column(Float, default=0.0)
+    is_stale = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="forecast_state")
+    
+    def __repr__(self):
+        return f"<ForecastState(user_id={self.user_id}, last_closed_month={self.last_closed_month}, is_stale={self.is_stale})>"
@@ -1,9 +1,10 @@
 """Goal database model"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
 from app.core.database import Base
+from app.core.money import Money
 
 class GoalStatus(str, PyEnum):
     """Goal status enum"""
@@ -19,8 +20,8 @@ class Goal(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     description = Column(String(500), nullable=True)
-    target_amount = Column(Float, nullable=False)
-    current_amount = Column(Float, default=0.0)
+    target_amount = Column(Money, nullable=False)
+    current_amount = Column(Money, default=0.0)
     deadline = Column(DateTime, nullable=False)
     status = Column(Enum(GoalStatus), default=GoalStatus.ACTIVE)
     category = Column(String(50), nullable=True)
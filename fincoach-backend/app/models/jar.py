@@ -1,9 +1,10 @@
 """Jar database model"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
 from app.core.database import Base
+from app.core.money import Money
 
 class JarPriority(str, PyEnum):
     """Jar priority enum"""
@@ -19,8 +20,8 @@ class Jar(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
-    target_amount = Column(Float, nullable=False)
-    current_amount = Column(Float, default=0.0)
+    target_amount = Column(Money, nullable=False)
+    current_amount = Column(Money, default=0.0)
     priority = Column(Enum(JarPriority), default=JarPriority.MEDIUM)
     color = Column(String(7), default="#3B82F6")
     is_active = Column(Integer, default=1)
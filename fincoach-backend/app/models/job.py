@@ -0,0 +1,45 @@
+"""Background job database model"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Text, Index
+from datetime import datetime
+from enum import Enum as PyEnum
+from app.core.database import Base
+
+class JobStatus(str, PyEnum):
+    """Job status enum"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(Base):
+    """A unit of heavy work run by the job runner (``app.services.jobs``).
+
+    The table is the queue: workers claim ``queued`` rows whose ``run_after``
+    has passed, and refresh ``heartbeat_at`` while running so rows of a
+    crashed worker can be requeued.
+    """
+    __tablename__ = "jobs"
+    
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    type = Column(String(50), nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.type}, user_id={self.user_id}, status={self.status})>"
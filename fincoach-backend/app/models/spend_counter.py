@@ -0,0 +1,22 @@
+"""Spend counter database model"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+from app.core.database import Base
+from app.core.money import Money
+
+class SpendCounter(Base):
+    """Running expense total of a user for one month and category.
+
+    Months are stored as indices (year * 12 + month - 1). The row with category
+    ``"total"`` holds the month's spending across all categories.
+    """
+    __tablename__ = "spend_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Integer, primary_key=True, autoincrement=False)
+    category = Column(String(20), primary_key=True)
+    amount = Column(Money, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SpendCounter(user_id={self.user_id}, month={self.month}, category={self.category}, amount={self.amount})>"
@@ -1,9 +1,10 @@
 """Transaction database model"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
-from app.core.database import Base
+from app.core.database import Base, TRANSACTIONS_PARTITIONED
+from app.core.money import Money
 
 class TransactionType(str, PyEnum):
     """Transaction type enum"""
@@ -24,22 +25,36 @@ class TransactionCategory(str, PyEnum):
     SAVINGS = "savings"
     OTHER = "other"
 
+# Unique indexes of a partitioned table must contain the partition key; a
+# fingerprint hashes the transaction date, so the wider key dedupes the same
+FINGERPRINT_KEY = ["user_id", "fingerprint"] + (["transaction_date"] if TRANSACTIONS_PARTITIONED else [])
+
 class Transaction(Base):
     """Transaction model"""
     __tablename__ = "transactions"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    amount = Column(Float, nullable=False)
+    # Rupees in Python, exact paise (BIGINT) in the database
+    amount = Column(Money, nullable=False)
     type = Column(Enum(TransactionType), nullable=False)
     category = Column(Enum(TransactionCategory), nullable=False)
     description = Column(String(500), nullable=True)
-    transaction_date = Column(DateTime, nullable=False)
+    transaction_date = Column(DateTime, nullable=False, primary_key=TRANSACTIONS_PARTITIONED)
+    # Hash of the parsed SMS (date, amount, direction, UPI reference) for imported rows
+    fingerprint = Column(String(32), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="transactions")
     
+    __table_args__ = (
+        Index("ix_transactions_user_fingerprint", *FINGERPRINT_KEY, unique=True),
+        {"postgresql_partition_by": "RANGE (transaction_date)"} if TRANSACTIONS_PARTITIONED else {}
+    )
+    # Rows are still identified by id alone when transaction_date is part of the table's key
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<Transaction(id={self.id}, user_id={self.user_id}, amount={self.amount}, type={self.type})>"
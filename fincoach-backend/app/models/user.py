@@ -1,8 +1,9 @@
 """User database model"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
+from app.core.money import Money
 
 class User(Base):
     """User model"""
@@ -14,10 +15,13 @@ class User(Base):
     full_name = Column(String(255), nullable=True)
     hashed_password = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=True)
-    monthly_income = Column(Float, default=0.0)
-    monthly_budget = Column(Float, default=0.0)
+    monthly_income = Column(Money, default=0.0)
+    monthly_budget = Column(Money, default=0.0)
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
+    category_rules_version = Column(Integer, default=0, nullable=False)
+    # Last sequence number of this user's change log (delta sync)
+    change_seq = Column(BigInteger, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -26,6 +30,8 @@ class User(Base):
     jars = relationship("Jar", back_populates="user", cascade="all, delete-orphan")
     goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="user", cascade="all, delete-orphan")
+    category_rules = relationship("CategoryRule", back_populates="user", cascade="all, delete-orphan")
+    forecast_state = relationship("ForecastState", back_populates="user", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, username={self.username})>"
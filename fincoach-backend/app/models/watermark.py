@@ -0,0 +1,15 @@
+"""Watermark database model"""
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+class Watermark(Base):
+    """How far a periodic scan has got, e.g. the alert engine's last evaluation time"""
+    __tablename__ = "watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    value = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Watermark(name={self.name}, value={self.value})>"
@@ -0,0 +1,28 @@
+"""Background job Pydantic schemas"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Type
+
+class JobCreate(BaseModel):
+    type: str = Field(..., description="spending_analysis, transaction_export, cohort_comparison or recategorize")
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class SpendingAnalysisParams(BaseModel):
+    pass
+
+class TransactionExportParams(BaseModel):
+    pass
+
+class CohortComparisonParams(BaseModel):
+    days: int = Field(90, ge=1, le=3650)
+
+class RecategorizeParams(BaseModel):
+    only_other: bool = False
+
+# Job types clients may queue through POST /api/v1/jobs, with their params;
+# others (e.g. sms_import) are queued by their own validated endpoints
+CLIENT_JOB_PARAMS: Dict[str, Type[BaseModel]] = {
+    "spending_analysis": SpendingAnalysisParams,
+    "transaction_export": TransactionExportParams,
+    "cohort_comparison": CohortComparisonParams,
+    "recategorize": RecategorizeParams
+}
@@ -1,6 +1,6 @@
 """Transaction Pydantic schemas"""
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -46,3 +46,10 @@ class TransactionResponse(TransactionBase):
     
     class Config:
         from_attributes = True
+
+class SMSMessage(BaseModel):
+    body: str
+    received_at: Optional[datetime] = None
+
+class SMSImportRequest(BaseModel):
+    messages: List[SMSMessage] = Field(..., min_length=1)
@@ -0,0 +1,218 @@
+"""Alert engine - scheduled alerts from users' recent activity
+
+A run evaluates the alert rules only for users active since the previous run.
+These are users with change-log entries newer than the watermark, less an
+overlap for writes still committing when it was taken, plus users with a goal
+whose deadline just came within ALERT_GOAL_DEADLINE_DAYS. Users are evaluated
+in chunks of ALERT_BATCH_SIZE with a few grouped queries per chunk, and the
+alerts are bulk inserted. Every generated alert carries a dedupe key, so
+overlapping or concurrent runs never alert twice for one condition.
+
+Rules:
+- monthly budget: the month's spend counter crossed one of ALERT_BUDGET_THRESHOLDS (% of monthly_budget)
+- goal deadline: an active, unfinished goal is due within ALERT_GOAL_DEADLINE_DAYS
+- low jar: an active jar holds less than ALERT_JAR_LOW_RATIO of its target
+- spending spike: ``AnomalyDetector.detect_spending_spikes`` flags this month
+
+Usage (cron every few minutes, or as a long-running loop):
+    python -m app.services.alert_engine
+    python -m app.services.alert_engine --loop --interval 300
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import insert, select, union
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.alert import Alert, AlertSeverity
+from app.models.change_log import ChangeLogEntry, ChangeOperation, record_changes
+from app.models.goal import Goal, GoalStatus
+from app.models.jar import Jar
+from app.models.user import User
+from app.models.watermark import Watermark
+from app.ml_modules.anomaly_detector import AnomalyDetector
+from app.services.spend_counters import month_index, month_totals
+
+WATERMARK = "alert_engine"
+# How far back the very first run looks for activity
+FIRST_RUN_LOOKBACK = timedelta(days=1)
+
+def _alert(user_id: int, title: str, message: str, severity: AlertSeverity, dedupe_key: str,
+           now: datetime) -> Dict:
+    return {
+        "user_id": user_id,
+        "title": title,
+        "message": message,
+        "severity": severity,
+        "is_read": False,
+        "dedupe_key": dedupe_key,
+        "created_at": now,
+        "updated_at": now
+    }
+
+def budget_alert(user_id: int, spent: float, budget: float, thresholds: Sequence[int],
+                 now: datetime) -> Optional[Dict]:
+    """Alert for the highest budget threshold month-to-date spending has crossed, if any"""
+    if budget <= 0:
+        return None
+    crossed = [threshold for threshold in thresholds if spent >= budget * threshold / 100]
+    if not crossed:
+        return None
+    threshold = max(crossed)
+    if threshold >= 100:
+        title, severity = "Monthly budget exceeded", AlertSeverity.CRITICAL
+    else:
+        title, severity = f"{threshold}% of monthly budget used", AlertSeverity.WARNING
+    message = f"You've spent ${spent:.2f} of your ${budget:.2f} budget for {now:%B}."
+    return _alert(user_id, title, message, severity, f"budget:{now:%Y-%m}:{threshold}", now)
+
+def active_user_ids(db: Session, since: datetime, now: datetime, deadline_days: int) -> List[int]:
+    """Users with changes after ``since`` or a goal deadline that entered the window since then"""
+    window = timedelta(days=deadline_days)
+    # Alert writes (ours included) change nothing the rules look at
+    changed = select(ChangeLogEntry.user_id).where(ChangeLogEntry.created_at > since, ChangeLogEntry.entity != "alerts")
+    goals_due = select(Goal.user_id).where(
+        Goal.status == GoalStatus.ACTIVE,
+        Goal.deadline > since + window,
+        Goal.deadline <= now + window
+    )
+    return sorted(db.execute(union(changed, goals_due)).scalars())
+
+def evaluate_users(db: Session, user_ids: List[int], now: datetime) -> List[Dict]:
+    """Alert rows due for a chunk of users; duplicates of earlier runs are dropped on insert"""
+    budgets = dict(db.query(User.id, User.monthly_budget).filter(
+        User.id.in_(user_ids), User.is_active.is_(True)
+    ).all())
+    user_ids = list(budgets)
+    if not user_ids:
+        return []
+    alerts = []
+
+    spending = month_totals(db, user_ids, month_index(now))
+    for user_id, budget in budgets.items():
+        alert = budget_alert(user_id, spending.get(user_id, 0.0), budget or 0.0,
+                             settings.ALERT_BUDGET_THRESHOLDS, now)
+        if alert:
+            alerts.append(alert)
+
+    goals = db.query(Goal.id, Goal.user_id, Goal.title, Goal.deadline, Goal.target_amount, Goal.current_amount).filter(
+        Goal.user_id.in_(user_ids),
+        Goal.status == GoalStatus.ACTIVE,
+        Goal.deadline > now,
+        Goal.deadline <= now + timedelta(days=settings.ALERT_GOAL_DEADLINE_DAYS),
+        Goal.current_amount < Goal.target_amount
+    ).all()
+    for goal in goals:
+        remaining = goal.target_amount - (goal.current_amount or 0.0)
+        alerts.append(_alert(
+            goal.user_id, "Goal deadline approaching",
+            f"'{goal.title}' is due on {goal.deadline:%d %b}; ${remaining:.2f} still to go.",
+            AlertSeverity.WARNING, f"goal-deadline:{goal.id}", now
+        ))
+
+    jars = db.query(Jar.id, Jar.user_id, Jar.name, Jar.target_amount, Jar.current_amount).filter(
+        Jar.user_id.in_(user_ids),
+        Jar.is_active == 1,
+        Jar.target_amount > 0,
+        Jar.current_amount < Jar.target_amount * settings.ALERT_JAR_LOW_RATIO
+    ).all()
+    for jar in jars:
+        # At most one reminder per jar a week while it stays low
+        alerts.append(_alert(
+            jar.user_id, "Low jar balance",
+            f"'{jar.name}' holds ${jar.current_amount or 0.0:.2f} of its ${jar.target_amount:.2f} target.",
+            AlertSeverity.INFO, f"jar-low:{jar.id}:{now:%G-W%V}", now
+        ))
+
+    for user_id, spike in AnomalyDetector(db).detect_spending_spikes(user_ids).items():
+        if spike["is_spike"]:
+            alerts.append(_alert(user_id, "Spending spike this month", spike["recommendation"],
+                                 AlertSeverity.WARNING, f"spike:{now:%Y-%m}", now))
+    return alerts
+
+def insert_alerts(db: Session, rows: List[Dict]) -> List[Dict]:
+    """Bulk insert alerts, skipping dedupe keys the user already has; returns the rows written, with ids"""
+    if not rows:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+    returning = (Alert.id, Alert.user_id, Alert.dedupe_key)
+    if dialect_insert is not None:
+        statement = dialect_insert(Alert).on_conflict_do_nothing(
+            index_elements=["user_id", "dedupe_key"]
+        ).returning(*returning)
+        inserted = db.execute(statement, rows).all()
+    else:
+        existing = set(db.execute(select(Alert.user_id, Alert.dedupe_key).where(
+            Alert.user_id.in_({row["user_id"] for row in rows}), Alert.dedupe_key.isnot(None)
+        )).all())
+        fresh = [row for row in rows if (row["user_id"], row["dedupe_key"]) not in existing]
+        inserted = db.execute(insert(Alert).returning(*returning), fresh).all() if fresh else []
+
+    # Core inserts skip ORM events, so log the new alerts for delta sync here
+    by_user = defaultdict(list)
+    for alert_id, user_id, _ in inserted:
+        by_user[user_id].append(alert_id)
+    for user_id, alert_ids in by_user.items():
+        record_changes(db.connection(), user_id, "alerts", alert_ids, ChangeOperation.UPSERT)
+    ids = {(user_id, dedupe_key): alert_id for alert_id, user_id, dedupe_key in inserted}
+    return [
+        {"id": ids[(row["user_id"], row["dedupe_key"])], **row}
+        for row in rows if (row["user_id"], row["dedupe_key"]) in ids
+    ]
+
+def _chunks(values: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def run_alert_engine(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> Dict:
+    """Evaluate users active since the watermark and move it to ``now``"""
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.ALERT_BATCH_SIZE
+    mark = db.get(Watermark, WATERMARK)
+    since = (mark.value if mark else now - FIRST_RUN_LOOKBACK) - timedelta(seconds=settings.ALERT_WATERMARK_OVERLAP_SECONDS)
+    user_ids = active_user_ids(db, since, now, settings.ALERT_GOAL_DEADLINE_DAYS)
+
+    created = 0
+    for chunk in _chunks(user_ids, batch_size):
+        created += len(insert_alerts(db, evaluate_users(db, chunk, now)))
+        db.commit()
+
+    if mark is None:
+        db.add(Watermark(name=WATERMARK, value=now))
+    elif mark.value < now:
+        mark.value = now
+    db.commit()
+    return {"since": since.isoformat(), "users_evaluated": len(user_ids), "alerts_created": created}
+
+def main():
+    from app.core.database import BackgroundSessionLocal
+
+    parser = argparse.ArgumentParser(description="Generate alerts for users with recent activity")
+    parser.add_argument("--loop", action="store_true", help="Keep running, one evaluation per interval")
+    parser.add_argument("--interval", type=float, default=settings.ALERT_ENGINE_INTERVAL_SECONDS,
+                        help="Seconds between evaluations with --loop")
+    args = parser.parse_args()
+
+    while True:
+        started = time.perf_counter()
+        db = BackgroundSessionLocal()
+        try:
+            result = run_alert_engine(db)
+        finally:
+            db.close()
+        print(f"🔔 Evaluated {result['users_evaluated']:,} active users, created {result['alerts_created']:,} "
+              f"alerts in {time.perf_counter() - started:.1f}s")
+        if not args.loop:
+            break
+        time.sleep(max(args.interval - (time.perf_counter() - started), 0))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Delta sync - what changed for a user since their last sync token
+
+A token is the user's change sequence number at the end of the previous
+sync. Without one the client gets a full snapshot and the token to continue
+from; afterwards it only receives rows upserted since, plus tombstones (ids)
+for deleted rows. Transactions moved to the archive are neither: the client
+keeps the copy it has.
+"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.projection import FieldSet
+from app.models.change_log import ChangeLogEntry, ChangeOperation, SYNCED_MODELS
+from app.models.user import User
+from app.schemas.alert import AlertResponse
+from app.schemas.goal import GoalResponse
+from app.schemas.jar import JarResponse
+from app.schemas.transaction import TransactionResponse
+from app.services.transaction_archive import transaction_archive
+
+# Rows are sent with the same fields as the REST resources
+SYNC_FIELDS = {
+    "transactions": FieldSet.from_schema(TransactionResponse, SYNCED_MODELS["transactions"]),
+    "jars": FieldSet.from_schema(JarResponse, SYNCED_MODELS["jars"]),
+    "goals": FieldSet.from_schema(GoalResponse, SYNCED_MODELS["goals"]),
+    "alerts": FieldSet.from_schema(AlertResponse, SYNCED_MODELS["alerts"])
+}
+
+def parse_sync_token(token: str) -> int:
+    """Sequence number of a sync token; ValueError when malformed"""
+    seq = int(token)
+    if seq < 0:
+        raise ValueError(f"Invalid sync token: {token}")
+    return seq
+
+def _fetch_rows(db: Session, user_id: int, entity: str, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Current rows of one entity, all of them or only ``ids``"""
+    fields = SYNC_FIELDS[entity]
+    model = SYNCED_MODELS[entity]
+    names = fields.parse(None)
+    query = select(*fields.columns(names)).where(model.user_id == user_id)
+    if ids is not None:
+        query = query.where(model.id.in_(ids))
+    return fields.project(db.execute(query.order_by(model.id)), names)
+
+def snapshot(db: Session, user_id: int) -> Dict[str, Any]:
+    """Every synced row of the user, with the token to continue from"""
+    # Read the sequence first: changes racing the snapshot are re-sent, never lost
+    seq = db.execute(select(User.change_seq).where(User.id == user_id)).scalar() or 0
+    return {
+        "full": True,
+        "changes": {
+            entity: {"upserted": _fetch_rows(db, user_id, entity), "deleted": []}
+            for entity in SYNCED_MODELS
+        },
+        "next_token": str(seq),
+        "has_more": False
+    }
+
+def changes_since(db: Session, user_id: int, since: int, limit: int = 500) -> Dict[str, Any]:
+    """Net changes after sequence ``since``, reading at most ``limit`` log entries"""
+    entries = db.execute(
+        select(ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.operation).where(
+            ChangeLogEntry.user_id == user_id,
+            ChangeLogEntry.seq > since
+        ).order_by(ChangeLogEntry.seq).limit(limit)
+    ).all()
+
+    # The last entry per row wins
+    latest = {}
+    for _, entity, entity_id, operation in entries:
+        latest[(entity, entity_id)] = operation
+
+    changes = {}
+    for entity in SYNCED_MODELS:
+        upsert_ids = [entity_id for (name, entity_id), op in latest.items()
+                      if name == entity and op == ChangeOperation.UPSERT.value]
+        deleted = [entity_id for (name, entity_id), op in latest.items()
+                   if name == entity and op == ChangeOperation.DELETE.value]
+        upserted = _fetch_rows(db, user_id, entity, upsert_ids) if upsert_ids else []
+        # Upserted rows deleted since (their tombstone is on a later page) are gone already
+        found = {row["id"] for row in upserted}
+        missing = [entity_id for entity_id in upsert_ids if entity_id not in found]
+        if missing and entity == "transactions":
+            # Archived rows left the table without being deleted
+            archived = transaction_archive.known_ids(user_id, missing)
+            missing = [entity_id for entity_id in missing if entity_id not in archived]
+        deleted.extend(missing)
+        if upserted or deleted:
+            changes[entity] = {"upserted": upserted, "deleted": sorted(deleted)}
+
+    return {
+        "full": False,
+        "changes": changes,
+        "next_token": str(entries[-1].seq if entries else since),
+        "has_more": len(entries) == limit
+    }
@@ -0,0 +1,163 @@
+"""Handlers of the background job types (see ``app.services.jobs``)
+
+Each runs in a job thread with its own background-pool session and returns
+the JSON result stored on the job. Handlers can run again after a retry or a
+crashed worker, so they only write idempotently.
+"""
+import csv
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.change_log import ChangeOperation, record_changes
+from app.models.job import Job, JobStatus
+from app.models.transaction import Transaction, TransactionCategory, TransactionType
+from app.models.user import User
+from app.services.jobs import ClaimedJob, job_type
+from app.services.spend_counters import record_spend
+from app.services.transaction_archive import EXPORT_COLUMNS, iter_history
+
+# Peers needed before a cohort comparison is shown, so no one's spending can be singled out
+MIN_COHORT_SIZE = 5
+RECATEGORIZE_BATCH_SIZE = 1000
+
+@job_type("spending_analysis", concurrency=2)
+def spending_analysis(db: Session, job: ClaimedJob) -> Dict:
+    """All-time spending analysis, archived history included"""
+    from app.agents.financial_advisor import FinancialAdvisor
+
+    return FinancialAdvisor(db).analyze_spending_patterns(job.user_id)
+
+@job_type("transaction_export", concurrency=1)
+def transaction_export(db: Session, job: ClaimedJob) -> Dict:
+    """Full transaction history as a CSV file under JOB_OUTPUT_DIR"""
+    os.makedirs(settings.JOB_OUTPUT_DIR, exist_ok=True)
+    name = f"{job.id}.csv"
+    path = os.path.join(settings.JOB_OUTPUT_DIR, name)
+    rows = 0
+    with open(f"{path}.tmp", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in iter_history(db, job.user_id):
+            writer.writerow(row)
+            rows += 1
+    os.replace(f"{path}.tmp", path)
+    return {"status": "success", "file": name, "rows": rows}
+
+@job_type("cohort_comparison", concurrency=1)
+def cohort_comparison(db: Session, job: ClaimedJob) -> Dict:
+    """Spending mix over the last ``days`` (default 90) next to that of users with a similar income"""
+    days = int(job.params.get("days", 90))
+    income = db.query(User.monthly_income).filter(User.id == job.user_id).scalar() or 0.0
+    low, high = income * 0.75, income * 1.25
+    peers = select(User.id).where(User.monthly_income.between(low, high), User.is_active.is_(True),
+                                  User.id != job.user_id)
+    cohort_size = db.execute(select(func.count()).select_from(peers.subquery())).scalar()
+    if cohort_size < MIN_COHORT_SIZE:
+        return {"status": "insufficient_data", "message": "Not enough users with a similar income yet"}
+
+    is_user = case((Transaction.user_id == job.user_id, 1), else_=0)
+    rows = db.query(is_user, Transaction.category, func.sum(Transaction.amount)).filter(
+        Transaction.user_id.in_(peers) | (Transaction.user_id == job.user_id),
+        Transaction.type == TransactionType.EXPENSE,
+        Transaction.transaction_date >= datetime.utcnow() - timedelta(days=days)
+    ).group_by(is_user, Transaction.category).all()
+
+    spending = {0: defaultdict(float), 1: defaultdict(float)}
+    for mine, category, total in rows:
+        spending[mine][category.value] += float(total or 0)
+    user_total, cohort_total = sum(spending[1].values()), sum(spending[0].values())
+    categories = []
+    for category in sorted(set(spending[0]) | set(spending[1])):
+        user_share = spending[1][category] / user_total * 100 if user_total else 0.0
+        cohort_share = spending[0][category] / cohort_total * 100 if cohort_total else 0.0
+        categories.append({
+            "category": category,
+            "your_spending": round(spending[1][category], 2),
+            "your_share": round(user_share, 1),
+            "cohort_share": round(cohort_share, 1),
+            "difference": round(user_share - cohort_share, 1)
+        })
+    return {
+        "status": "success",
+        "days": days,
+        "cohort_size": cohort_size,
+        "income_band": {"min": round(low, 2), "max": round(high, 2)},
+        "your_total": round(user_total, 2),
+        "cohort_average_total": round(cohort_total / cohort_size, 2),
+        "categories": sorted(categories, key=lambda item: abs(item["difference"]), reverse=True)
+    }
+
+@job_type("sms_import", concurrency=2)
+def sms_import(db: Session, job: ClaimedJob) -> Dict:
+    """Bulk SMS upload from ``POST /transactions/sms-import``; a retry skips the SMS already imported"""
+    from app.services.sms_ingestion import SMSIngestionPipeline, message_from_json
+
+    def save_progress(progress: Dict) -> None:
+        db.execute(update(Job).where(Job.id == job.id, Job.status == JobStatus.RUNNING).values(result=progress))
+        db.commit()
+
+    pipeline = SMSIngestionPipeline(job.user_id, job_id=job.id, on_progress=save_progress)
+    result = pipeline.run(message_from_json(message) for message in job.params.get("messages", []))
+    if result["error"]:
+        raise RuntimeError(f"{result['failed_stage']} stage failed: {result['error']}")
+    return result
+
+@job_type("recategorize", concurrency=1)
+def recategorize(db: Session, job: ClaimedJob) -> Dict:
+    """Re-run categorization over the user's described expenses, e.g. after rule changes.
+
+    ``only_other`` limits the backfill to expenses still in "other". Archived
+    rows keep their category.
+    """
+    from app.ml_modules.categorizer import TransactionCategorizer
+
+    query = select(Transaction.id, Transaction.description, Transaction.amount, Transaction.category,
+                   Transaction.transaction_date).where(
+        Transaction.user_id == job.user_id,
+        Transaction.type == TransactionType.EXPENSE,
+        Transaction.description.isnot(None),
+        Transaction.description != ""
+    )
+    if job.params.get("only_other"):
+        query = query.where(Transaction.category == TransactionCategory.OTHER)
+    rows = db.execute(query.order_by(Transaction.id)).all()
+
+    categorizer = TransactionCategorizer(db, job.user_id)
+    changed = defaultdict(list)
+    for start in range(0, len(rows), RECATEGORIZE_BATCH_SIZE):
+        batch = rows[start:start + RECATEGORIZE_BATCH_SIZE]
+        results = categorizer.batch_categorize(
+            [{"id": row.id, "description": row.description, "amount": row.amount} for row in batch]
+        )
+        for row, result in zip(batch, results):
+            # No rule or model opinion: keep what the user has
+            if not result["confidence"] or result["category"] not in TransactionCategory._value2member_map_:
+                continue
+            category = TransactionCategory(result["category"])
+            if category != row.category:
+                changed[category].append(row)
+
+    now = datetime.utcnow()
+    for category, moved in changed.items():
+        for start in range(0, len(moved), RECATEGORIZE_BATCH_SIZE):
+            batch = moved[start:start + RECATEGORIZE_BATCH_SIZE]
+            ids = [row.id for row in batch]
+            db.execute(update(Transaction).where(Transaction.id.in_(ids)).values(category=category, updated_at=now))
+            # Core updates skip ORM events, so log the rows for delta sync here
+            record_changes(db.connection(), job.user_id, "transactions", ids, ChangeOperation.UPSERT)
+            # Monthly totals stay the same, only the per-category counters move
+            record_spend(db, job.user_id, [
+                change for row in batch
+                for change in ((row.transaction_date, row.category, -row.amount), (row.transaction_date, category, row.amount))
+            ])
+            db.commit()
+    return {
+        "status": "success",
+        "examined": len(rows),
+        "updated": sum(len(moved) for moved in changed.values()),
+        "by_category": {category.value: len(moved) for category, moved in changed.items()}
+    }
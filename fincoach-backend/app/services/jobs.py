@@ -0,0 +1,347 @@
+"""Background jobs - heavy reports and backfills run off the request path
+
+A handler queues a row in the ``jobs`` table and answers ``202`` with its id.
+Clients poll ``GET /api/v1/jobs/{job_id}``, or get a WebSocket message on
+completion when the realtime router runs in the same process.
+
+Job runners claim queued rows and run them in threads on the background
+connection pool, at most ``concurrency`` jobs of a type at once per worker.
+Failures are retried with exponential backoff. Running rows are heartbeated,
+and any runner requeues rows whose worker stopped heartbeating (or fails them
+once out of attempts). Handlers may therefore run more than once and must be
+idempotent.
+
+Usage (a dedicated worker; API workers serving the core routers run one too
+unless JOB_WORKER_ENABLED=False):
+    python -m app.services.jobs
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import BackgroundSessionLocal
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+class ClaimedJob(NamedTuple):
+    """What a handler knows about the job it runs"""
+    id: str
+    type: str
+    user_id: int
+    params: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+class JobType(NamedTuple):
+    name: str
+    handler: Callable[[Session, ClaimedJob], Dict]
+    concurrency: int
+    max_attempts: int
+
+# Job type name -> definition, filled by @job_type in app.services.job_handlers
+JOB_TYPES: Dict[str, JobType] = {}
+
+def job_type(name: str, concurrency: int = 2, max_attempts: int = 3):
+    """Register a handler ``(db, job) -> result dict`` for jobs of type ``name``"""
+    def register(handler):
+        JOB_TYPES[name] = JobType(name, handler, settings.JOB_CONCURRENCY.get(name, concurrency), max_attempts)
+        return handler
+    return register
+
+def load_job_types() -> Dict[str, JobType]:
+    import app.services.job_handlers  # noqa: F401 - registers the handlers
+    return JOB_TYPES
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def job_to_dict(job: Job) -> Dict:
+    result = {
+        "job_id": job.id,
+        "user_id": job.user_id,
+        "type": job.type,
+        "status": job.status.value,
+        # Uploads (e.g. SMS imports) stay on the row for the worker; clients get their size
+        "params": {key: len(value) if key == "messages" else value for key, value in (job.params or {}).items()},
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at)
+    }
+    if job.status == JobStatus.SUCCEEDED and (job.result or {}).get("file"):
+        result["download_url"] = f"/api/v1/jobs/{job.id}/download"
+    return result
+
+def submit_job(db: Session, user_id: int, name: str, params: Optional[Dict] = None) -> Job:
+    """Queue a job, or return the user's queued or running job with the same type and params"""
+    definition = load_job_types().get(name)
+    if definition is None:
+        raise ValueError(f"Unknown job type {name!r}; expected one of {sorted(JOB_TYPES)}")
+    params = params or {}
+    for job in db.query(Job).filter(Job.user_id == user_id, Job.type == name, Job.status.in_(ACTIVE_STATUSES)):
+        if job.params == params:
+            return job
+    job = Job(id=uuid.uuid4().hex, user_id=user_id, type=name, params=params, status=JobStatus.QUEUED,
+              max_attempts=definition.max_attempts, run_after=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def recover_stale_jobs(db: Session, stale_after: float) -> int:
+    """Requeue running jobs whose worker stopped heartbeating, or fail them once out of attempts"""
+    now = datetime.utcnow()
+    stale = (Job.status == JobStatus.RUNNING) & (Job.heartbeat_at < now - timedelta(seconds=stale_after))
+    failed = db.execute(update(Job).where(stale, Job.attempts >= Job.max_attempts).values(
+        status=JobStatus.FAILED, error="Worker stopped while running the job", finished_at=now, worker_id=None
+    )).rowcount
+    requeued = db.execute(update(Job).where(stale, Job.attempts < Job.max_attempts).values(
+        status=JobStatus.QUEUED, run_after=now, worker_id=None
+    )).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning("Recovered %d stale job(s): %d requeued, %d failed", failed + requeued, requeued, failed)
+    return failed + requeued
+
+class JobRunner:
+    """Claims and runs queued jobs from this process's event loop"""
+
+    def __init__(self, session_factory: Callable[[], Session] = BackgroundSessionLocal,
+                 poll_interval: float = settings.JOB_POLL_INTERVAL,
+                 heartbeat_interval: float = settings.JOB_HEARTBEAT_INTERVAL,
+                 stale_after: float = settings.JOB_STALE_AFTER,
+                 retry_backoff: float = settings.JOB_RETRY_BACKOFF_SECONDS):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.retry_backoff = retry_backoff
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+        self._running: Dict[str, ClaimedJob] = {}
+        self._tasks = set()
+        self._listeners: List[Callable[[Dict], Awaitable[None]]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add_listener(self, listener: Callable[[Dict], Awaitable[None]]) -> None:
+        """Await ``listener(job dict)`` whenever a job of this worker succeeds or finally fails"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def wake(self) -> None:
+        """Look for queued jobs now instead of at the next poll"""
+        if self._wake is not None:
+            self._wake.set()
+
+    def stats(self) -> Dict:
+        return {
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered
+        }
+
+    async def start(self) -> None:
+        types = load_job_types()
+        # One thread per job slot, plus spares for claiming, heartbeats and status updates
+        self._executor = ThreadPoolExecutor(max_workers=sum(t.concurrency for t in types.values()) + 2,
+                                            thread_name_prefix="job")
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run_loop())
+
+    async def stop(self, grace_seconds: float = 5.0) -> None:
+        """Stop claiming, give running jobs a moment, then hand the rest back to the queue"""
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        await asyncio.gather(self._loop_task, return_exceptions=True)
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=grace_seconds)
+        if self._running:
+            try:
+                await self._in_thread(self._release, list(self._running))
+            except SQLAlchemyError as exc:
+                logger.warning("Could not release running jobs; they will be recovered as stale: %s", exc)
+            for task in self._tasks:
+                task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop_task = None
+        self._wake = None
+
+    def _in_thread(self, function: Callable, *args) -> Awaitable:
+        return asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+
+    async def _run_loop(self) -> None:
+        last_heartbeat = float("-inf")
+        while True:
+            self._wake.clear()
+            try:
+                if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                    self.recovered += await self._in_thread(self._heartbeat, list(self._running))
+                    last_heartbeat = time.monotonic()
+                busy = Counter(job.type for job in self._running.values())
+                for job in await self._in_thread(self._claim, busy):
+                    self._running[job.id] = job
+                    task = asyncio.create_task(self._execute(job))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            except SQLAlchemyError as exc:
+                logger.warning("Job runner could not reach the database: %s", exc)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _heartbeat(self, running_ids: List[str]) -> int:
+        with self.session_factory() as db:
+            if running_ids:
+                db.execute(update(Job).where(Job.id.in_(running_ids), Job.worker_id == self.worker_id).values(
+                    heartbeat_at=datetime.utcnow()
+                ))
+                db.commit()
+            return recover_stale_jobs(db, self.stale_after)
+
+    def _claim(self, busy: Counter) -> List[ClaimedJob]:
+        free = {name: definition.concurrency - busy[name] for name, definition in JOB_TYPES.items()}
+        free = {name: slots for name, slots in free.items() if slots > 0}
+        if not free:
+            return []
+        now = datetime.utcnow()
+        claimed = []
+        with self.session_factory() as db:
+            candidates = db.execute(
+                select(Job.id, Job.type)
+                .where(Job.status == JobStatus.QUEUED, Job.run_after <= now, Job.type.in_(list(free)))
+                .order_by(Job.run_after)
+                .limit(sum(free.values()) * 4)
+            ).all()
+            for job_id, name in candidates:
+                if free[name] <= 0:
+                    continue
+                # Conditional update: of several workers eyeing the same row, exactly one wins it
+                won = db.execute(update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED).values(
+                    status=JobStatus.RUNNING, worker_id=self.worker_id, attempts=Job.attempts + 1,
+                    started_at=now, heartbeat_at=now
+                )).rowcount
+                db.commit()
+                if not won:
+                    continue
+                free[name] -= 1
+                row = db.execute(select(Job.user_id, Job.params, Job.attempts, Job.max_attempts)
+                                 .where(Job.id == job_id)).one()
+                claimed.append(ClaimedJob(job_id, name, row.user_id, row.params or {}, row.attempts, row.max_attempts))
+        return claimed
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        outcome = None
+        try:
+            try:
+                result = await self._in_thread(self._call, job)
+            except Exception as exc:
+                logger.warning("Job %s (%s) attempt %d/%d failed: %s", job.id, job.type, job.attempts,
+                               job.max_attempts, exc)
+                outcome = await self._in_thread(self._finish, job, None, exc)
+            else:
+                outcome = await self._in_thread(self._finish, job, result, None)
+        except SQLAlchemyError as exc:
+            # No more heartbeats: recovery requeues the job
+            logger.warning("Could not record the outcome of job %s: %s", job.id, exc)
+        finally:
+            self._running.pop(job.id, None)
+            self.wake()
+        if outcome is not None:
+            for listener in self._listeners:
+                try:
+                    await listener(outcome)
+                except Exception:
+                    logger.exception("Job listener failed")
+
+    def _call(self, job: ClaimedJob) -> Dict:
+        with self.session_factory() as db:
+            return JOB_TYPES[job.type].handler(db, job)
+
+    def _finish(self, job: ClaimedJob, result: Optional[Dict], exc: Optional[Exception]) -> Optional[Dict]:
+        """Record the outcome; returns the job dict when it reached a final status"""
+        now = datetime.utcnow()
+        retry = exc is not None and job.attempts < job.max_attempts
+        if exc is None:
+            values = {"status": JobStatus.SUCCEEDED, "result": result, "error": None, "finished_at": now}
+        elif retry:
+            backoff = self.retry_backoff * 2 ** (job.attempts - 1)
+            values = {"status": JobStatus.QUEUED, "run_after": now + timedelta(seconds=backoff),
+                      "error": f"{type(exc).__name__}: {exc}"[:2000]}
+        else:
+            values = {"status": JobStatus.FAILED, "error": f"{type(exc).__name__}: {exc}"[:2000], "finished_at": now}
+        with self.session_factory() as db:
+            # A job released or recovered meanwhile belongs to someone else now
+            updated = db.execute(update(Job).where(
+                Job.id == job.id, Job.worker_id == self.worker_id, Job.status == JobStatus.RUNNING
+            ).values(worker_id=None, **values)).rowcount
+            db.commit()
+            if not updated:
+                return None
+            if retry:
+                self.retried += 1
+                return None
+            if exc is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            return job_to_dict(db.get(Job, job.id))
+
+    def _release(self, job_ids: List[str]) -> None:
+        """Hand jobs back to the queue without counting the interrupted attempt"""
+        with self.session_factory() as db:
+            db.execute(update(Job).where(
+                Job.id.in_(job_ids), Job.worker_id == self.worker_id, Job.status == JobStatus.RUNNING
+            ).values(status=JobStatus.QUEUED, worker_id=None, attempts=Job.attempts - 1,
+                     run_after=datetime.utcnow()))
+            db.commit()
+
+# Shared by all requests in this worker
+job_runner = JobRunner()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs until interrupted")
+    parser.parse_args()
+
+    async def run():
+        await job_runner.start()
+        print(f"⚙️  Job worker {job_runner.worker_id} running: "
+              f"{', '.join(f'{name} x{t.concurrency}' for name, t in sorted(JOB_TYPES.items()))}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await job_runner.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("🛑 Job worker stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""SMS Ingestion - staged pipeline turning bulk bank SMS into transactions
+
+Stages run in their own threads and pass chunks through bounded queues, so
+a multi-year SMS export is processed with flat memory:
+
+    parse -> categorize -> dedupe -> insert
+
+Uploads to ``POST /api/v1/transactions/sms-import`` run as ``sms_import``
+background jobs (see ``app.services.jobs``), which save the pipeline counters
+on the job row after every inserted chunk, so any worker can report progress.
+
+SMS whose date is neither in the text nor given as ``received_at`` are
+counted as unparsed: stored under the import date they would land in the
+wrong month and escape deduplication on a later re-upload.
+
+Usage (worker for exported SMS files, one JSON object per line with ``body``
+and optional ``received_at``):
+    python -m app.services.sms_ingestion --user-id 1 --input sms.jsonl
+"""
+import argparse
+import hashlib
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import BackgroundSessionLocal
+from app.core.money import format_minor, to_minor
+from app.models.change_log import ChangeOperation, record_changes
+from app.models.job import Job, JobStatus
+from app.models.transaction import FINGERPRINT_KEY, Transaction, TransactionCategory, TransactionType
+from app.ml_modules.categorizer import TransactionCategorizer
+from app.ml_modules.prediction_engine import PredictionEngine
+from app.services.spend_counters import record_spend
+from app.services.transaction_archive import transaction_archive
+from app.utils.sms_parser import SMSParser
+
+STAGES = ("parse", "categorize", "dedupe", "insert")
+VALID_CATEGORIES = {category.value for category in TransactionCategory}
+
+# Marks the end of a stage's input
+_DONE = object()
+
+def sms_fingerprint(user_id: int, parsed: Dict) -> str:
+    """Stable hash of a parsed SMS used to skip transactions that were already imported"""
+    key = "|".join((
+        str(user_id),
+        parsed["type"],
+        # Exact paise, rendered like the former f"{amount:.2f}" so stored fingerprints still match
+        format_minor(to_minor(parsed["amount"])),
+        parsed["transaction_date"].strftime("%Y-%m-%d"),
+        parsed.get("reference") or parsed["description"].lower()
+    ))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+class StageStats:
+    """Item counts and busy time of one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+
+    def record(self, items_in: int, items_out: int, seconds: float) -> None:
+        self.items_in += items_in
+        self.items_out += items_out
+        self.busy_seconds += seconds
+
+    def as_dict(self) -> Dict:
+        return {
+            "stage": self.name,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "items_per_second": round(self.items_in / self.busy_seconds, 1) if self.busy_seconds else None
+        }
+
+class SMSIngestionPipeline:
+    """Parse, categorize, dedupe and bulk insert one user's SMS upload"""
+
+    def __init__(
+        self,
+        user_id: int,
+        session_factory: Callable[[], Session] = BackgroundSessionLocal,
+        chunk_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        job_id: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        # Called with ``to_dict()`` after each inserted chunk
+        self.on_progress = on_progress
+        self.user_id = user_id
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.SMS_INGEST_CHUNK_SIZE
+        self.queue_size = queue_size or settings.SMS_INGEST_QUEUE_SIZE
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.status = "pending"
+        self.error = None
+        self.failed_stage = None
+        self.unparsed = 0
+        self.duplicates = 0
+        self.conflicts = 0
+        self.expenses_inserted = 0
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._seen = set()
+        self._sessions: Dict[str, Session] = {}
+        self._categorizer = None
+
+    def run(self, messages: Iterable[Union[str, Dict]]) -> Dict:
+        """Stream ``messages`` (SMS bodies or dicts with ``body``/``received_at``) through all stages"""
+        self.status = "running"
+        self.started_at = datetime.utcnow()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in STAGES[1:]]
+        workers = [
+            threading.Thread(target=self._produce, args=(messages, queues[0]), daemon=True),
+            threading.Thread(target=self._consume, args=("categorize", self._categorize, queues[0], queues[1]), daemon=True),
+            threading.Thread(target=self._consume, args=("dedupe", self._dedupe, queues[1], queues[2]), daemon=True)
+        ]
+        self._sessions = {name: self.session_factory() for name in ("categorize", "dedupe", "insert")}
+        try:
+            for worker in workers:
+                worker.start()
+            # The last stage runs here so ``run`` returns once everything is written
+            self._consume("insert", self._insert, queues[2], None)
+            for worker in workers:
+                worker.join()
+            if self.expenses_inserted and self.error is None:
+                # Imported history is backdated, so the incremental forecast state cannot absorb it
+                db = self._sessions["insert"]
+                PredictionEngine(db).invalidate_forecast_state(self.user_id)
+                db.commit()
+        finally:
+            for db in self._sessions.values():
+                db.close()
+            self._sessions = {}
+        self.status = "failed" if self.error else "completed"
+        self.finished_at = datetime.utcnow()
+        return self.to_dict()
+
+    def to_dict(self) -> Dict:
+        """Job status with per-stage throughput counters"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "received": self.stats["parse"].items_in,
+            "parsed": self.stats["parse"].items_out,
+            "unparsed": self.unparsed,
+            "duplicates": self.duplicates + self.conflicts,
+            "inserted": self.stats["insert"].items_out,
+            "stages": [self.stats[name].as_dict() for name in STAGES],
+            "error": self.error,
+            "failed_stage": self.failed_stage,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def _fail(self, stage: str, exc: Exception) -> None:
+        if self.error is None:
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.failed_stage = stage
+
+    def _produce(self, messages: Iterable[Union[str, Dict]], outbox: queue.Queue) -> None:
+        """Parse stage: read the upload lazily and emit chunks of parsed SMS"""
+        stats = self.stats["parse"]
+        try:
+            for chunk in self._chunks(messages):
+                if self.error is not None:
+                    break
+                started = time.perf_counter()
+                parsed = self._parse(chunk)
+                stats.record(len(chunk), len(parsed), time.perf_counter() - started)
+                if parsed:
+                    outbox.put(parsed)
+        except Exception as exc:
+            # A broken upload (e.g. a malformed line in an export file) fails the job instead of hanging it
+            self._fail("parse", exc)
+        finally:
+            outbox.put(_DONE)
+
+    def _consume(self, name: str, work: Callable[[List], List], inbox: queue.Queue, outbox: Optional[queue.Queue]) -> None:
+        """Run ``work`` on every chunk of ``inbox``; after a failure keep draining so upstream never blocks"""
+        stats = self.stats[name]
+        while True:
+            chunk = inbox.get()
+            if chunk is _DONE:
+                break
+            if self.error is not None:
+                continue
+            started = time.perf_counter()
+            try:
+                result = work(chunk)
+            except Exception as exc:
+                self._fail(name, exc)
+                continue
+            stats.record(len(chunk), len(result), time.perf_counter() - started)
+            if outbox is not None and result:
+                outbox.put(result)
+            elif outbox is None and self.on_progress is not None:
+                # Last stage: the chunk is stored, so its counters can be published
+                try:
+                    self.on_progress(self.to_dict())
+                except Exception as exc:
+                    self._fail(name, exc)
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    def _chunks(self, messages: Iterable[Union[str, Dict]]) -> Iterator[List]:
+        chunk = []
+        for message in messages:
+            chunk.append(message)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _parse(self, chunk: List[Union[str, Dict]]) -> List[Dict]:
+        parsed = []
+        for message in chunk:
+            if isinstance(message, str):
+                result = SMSParser.parse_upi_sms(message)
+            else:
+                result = SMSParser.parse_upi_sms(message.get("body"), message.get("received_at"))
+            if result is None or result["transaction_date"] is None:
+                self.unparsed += 1
+            else:
+                parsed.append(result)
+        return parsed
+
+    def _categorize(self, chunk: List[Dict]) -> List[Dict]:
+        if self._categorizer is None:
+            self._categorizer = TransactionCategorizer(self._sessions["categorize"], self.user_id)
+        results = self._categorizer.batch_categorize(chunk)
+        for parsed, result in zip(chunk, results):
+            category = result["category"]
+            if category not in VALID_CATEGORIES:
+                # Model and keyword categories outside the Transaction enum map back to SMS categories
+                category = SMSParser.categorize_transaction(parsed["description"], parsed["amount"])
+            parsed["category"] = category
+        return chunk
+
+    def _dedupe(self, chunk: List[Dict]) -> List[Dict]:
+        fresh = {}
+        for parsed in chunk:
+            fingerprint = sms_fingerprint(self.user_id, parsed)
+            if fingerprint not in self._seen and fingerprint not in fresh:
+                fresh[fingerprint] = parsed
+        if fresh:
+            existing = self._sessions["dedupe"].query(Transaction.fingerprint).filter(
+                Transaction.user_id == self.user_id,
+                Transaction.fingerprint.in_(list(fresh))
+            ).all()
+            for (fingerprint,) in existing:
+                del fresh[fingerprint]
+            # Old SMS may match rows already moved to the archive
+            for fingerprint in transaction_archive.known_fingerprints(self.user_id, fresh):
+                del fresh[fingerprint]
+        self._seen.update(fresh)
+        self.duplicates += len(chunk) - len(fresh)
+        for fingerprint, parsed in fresh.items():
+            parsed["fingerprint"] = fingerprint
+        return list(fresh.values())
+
+    def _insert(self, chunk: List[Dict]) -> List[Dict]:
+        db = self._sessions["insert"]
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": self.user_id,
+                "amount": parsed["amount"],
+                "type": TransactionType(parsed["type"]),
+                "category": TransactionCategory(parsed["category"]),
+                "description": parsed["description"][:500],
+                "transaction_date": parsed["transaction_date"],
+                "fingerprint": parsed["fingerprint"],
+                "created_at": now,
+                "updated_at": now
+            }
+            for parsed in chunk
+        ]
+        inserted = dict(_insert_ignoring_duplicates(db, rows))
+        inserted_ids = list(inserted)
+        # Core inserts skip ORM events, so log the new rows for delta sync here
+        record_changes(db.connection(), self.user_id, "transactions", inserted_ids, ChangeOperation.UPSERT)
+        expenses = []
+        if inserted_ids:
+            expenses = db.execute(select(Transaction.transaction_date, Transaction.category, Transaction.amount).where(
+                Transaction.id.in_(inserted_ids), Transaction.type == TransactionType.EXPENSE
+            )).all()
+            record_spend(db, self.user_id, expenses)
+        db.commit()
+        # Rows lost to a concurrent import of the same SMS count as duplicates
+        self.conflicts += len(rows) - len(inserted)
+        self.expenses_inserted += len(expenses)
+        fingerprints = set(inserted.values())
+        return [parsed for parsed in chunk if parsed["fingerprint"] in fingerprints]
+
+def _insert_ignoring_duplicates(db: Session, rows: List[Dict]) -> List[Tuple[int, str]]:
+    """Bulk insert that skips fingerprints already stored; returns ``(id, fingerprint)`` of the rows written.
+
+    Executed as an executemany so SQLAlchemy batches the rows into multi-row
+    INSERTs without compiling a new statement per chunk; RETURNING yields the
+    rows that were not skipped.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return db.execute(insert(Transaction).returning(Transaction.id, Transaction.fingerprint), rows).all()
+    statement = dialect_insert(Transaction).on_conflict_do_nothing(
+        index_elements=FINGERPRINT_KEY
+    ).returning(Transaction.id, Transaction.fingerprint)
+    return db.execute(statement, rows).all()
+
+# Pipeline statuses of the job statuses, for import progress responses
+IMPORT_STATUSES = {
+    JobStatus.QUEUED: "pending",
+    JobStatus.RUNNING: "running",
+    JobStatus.SUCCEEDED: "completed",
+    JobStatus.FAILED: "failed"
+}
+
+def message_from_json(message: Dict) -> Dict:
+    """An SMS as stored in JSON (``received_at`` as ISO text) with ``received_at`` parsed"""
+    if message.get("received_at"):
+        message = {**message, "received_at": datetime.fromisoformat(message["received_at"])}
+    return message
+
+def import_to_dict(job: Job) -> Dict:
+    """Progress of an ``sms_import`` job: the counters last saved by its pipeline, under the job's status"""
+    progress = dict(job.result or SMSIngestionPipeline(job.user_id, job_id=job.id).to_dict())
+    progress.update(
+        job_id=job.id,
+        status=IMPORT_STATUSES[job.status],
+        attempts=job.attempts,
+        created_at=job.created_at.isoformat() if job.created_at else None
+    )
+    if job.error:
+        progress["error"] = job.error
+    return progress
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield message_from_json(json.loads(line))
+
+def main():
+    parser = argparse.ArgumentParser(description="Import exported bank SMS for a user")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--input", required=True, help="JSONL file with a body (and received_at, "
+                        "needed unless the text is dated) per line")
+    parser.add_argument("--chunk-size", type=int, default=settings.SMS_INGEST_CHUNK_SIZE)
+    parser.add_argument("--queue-size", type=int, default=settings.SMS_INGEST_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    pipeline = SMSIngestionPipeline(args.user_id, chunk_size=args.chunk_size, queue_size=args.queue_size)
+    started = time.perf_counter()
+    result = pipeline.run(_read_jsonl(args.input))
+    elapsed = time.perf_counter() - started
+
+    print(f"📥 {result['received']:,} SMS read, {result['parsed']:,} parsed, "
+          f"{result['duplicates']:,} duplicates, {result['inserted']:,} inserted in {elapsed:.1f}s")
+    for stage in result["stages"]:
+        print(f"   {stage['stage']:<10} {stage['items_in']:>9,} in  {stage['items_out']:>9,} out  "
+              f"{stage['items_per_second'] or 0:>12,.0f}/s")
+    if result["error"]:
+        print(f"❌ Failed in {result['failed_stage']}: {result['error']}")
+
+if __name__ == "__main__":
+    main()
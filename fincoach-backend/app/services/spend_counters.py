@@ -0,0 +1,181 @@
+"""Month-to-date spend counters
+
+Every expense write adds its amount to two counters of its month: its category
+and "total". The add is one upsert (INSERT ... ON CONFLICT DO UPDATE ...
+RETURNING), so concurrent writes never lose an update and each sees the total
+just after its own addition. A write that takes the current month's total
+across one of ALERT_BUDGET_THRESHOLDS (% of monthly_budget) inserts the budget
+alert in the same transaction, under the alert engine's dedupe key.
+
+Counters start empty. Fill them from the transactions table once when
+deploying, and after bulk loads that bypass the write paths:
+    python -m app.services.spend_counters
+    python -m app.services.spend_counters --months 3
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.money import from_minor, minor_units, to_minor
+from app.models.spend_counter import SpendCounter
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+
+TOTAL = "total"
+COUNTER_KEY = ["user_id", "month", "category"]
+
+def month_index(value: datetime) -> int:
+    """Months since year 0, so consecutive months differ by one"""
+    return value.year * 12 + value.month - 1
+
+def month_start(month: int) -> datetime:
+    return datetime(month // 12, month % 12 + 1, 1)
+
+def record_spend(db: Session, user_id: int, changes: Iterable[Tuple[datetime, Any, float]]) -> List[Dict]:
+    """Add signed expense amounts, as ``(transaction_date, category, amount)``, to the user's counters.
+
+    Returns the budget alerts the change triggered. Does not commit, so the
+    counters and alerts land with the caller's transaction.
+    """
+    # Summed in paise, so changes that cancel out leave no update behind
+    deltas = defaultdict(int)
+    for transaction_date, category, amount in changes:
+        month = month_index(transaction_date)
+        deltas[(month, getattr(category, "value", category))] += to_minor(amount)
+        deltas[(month, TOTAL)] += to_minor(amount)
+    now = datetime.utcnow()
+    # A fixed row order keeps concurrent writers of one user from deadlocking
+    rows = [
+        {"user_id": user_id, "month": month, "category": category, "amount": from_minor(amount), "updated_at": now}
+        for (month, category), amount in sorted(deltas.items()) if amount
+    ]
+    if not rows:
+        return []
+    totals = _add(db, rows)
+
+    current = month_index(now)
+    increase = deltas.get((current, TOTAL), 0)
+    if increase <= 0:
+        return []
+    after = totals[(current, TOTAL)]
+    return _budget_alerts(db, user_id, from_minor(to_minor(after) - increase), after, now)
+
+def _add(db: Session, rows: List[Dict]) -> Dict[Tuple[int, str], float]:
+    """Atomically add each row's amount to its counter; returns the new amounts"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+    if dialect_insert is not None:
+        statement = dialect_insert(SpendCounter)
+        statement = statement.on_conflict_do_update(
+            index_elements=COUNTER_KEY,
+            set_={"amount": SpendCounter.amount + statement.excluded.amount,
+                  "updated_at": statement.excluded.updated_at}
+        ).returning(SpendCounter.month, SpendCounter.category, SpendCounter.amount)
+        return {(month, category): amount for month, category, amount in db.execute(statement, rows)}
+
+    totals = {}
+    for row in rows:
+        key = (SpendCounter.user_id == row["user_id"], SpendCounter.month == row["month"],
+               SpendCounter.category == row["category"])
+        updated = db.execute(update(SpendCounter).where(*key).values(
+            amount=SpendCounter.amount + row["amount"], updated_at=row["updated_at"]
+        )).rowcount
+        if not updated:
+            db.execute(insert(SpendCounter).values(**row))
+        totals[(row["month"], row["category"])] = db.execute(select(SpendCounter.amount).where(*key)).scalar()
+    return totals
+
+def _budget_alerts(db: Session, user_id: int, before: float, after: float, now: datetime) -> List[Dict]:
+    """Insert the budget alert of a threshold crossed between ``before`` and ``after``"""
+    from app.services.alert_engine import budget_alert, insert_alerts
+
+    budget = db.query(User.monthly_budget).filter(User.id == user_id).scalar() or 0.0
+    thresholds = settings.ALERT_BUDGET_THRESHOLDS
+    alert = budget_alert(user_id, after, budget, thresholds, now)
+    previous = budget_alert(user_id, before, budget, thresholds, now)
+    if alert is None or (previous is not None and previous["dedupe_key"] == alert["dedupe_key"]):
+        return []
+    # The key dedupes against the alert engine and against concurrent writes
+    return insert_alerts(db, [alert])
+
+def month_totals(db: Session, user_ids: List[int], month: int) -> Dict[int, float]:
+    """Total spending of each user in ``month``"""
+    rows = db.query(SpendCounter.user_id, SpendCounter.amount).filter(
+        SpendCounter.user_id.in_(user_ids),
+        SpendCounter.month == month,
+        SpendCounter.category == TOTAL
+    ).all()
+    return {user_id: amount for user_id, amount in rows}
+
+def type_totals(db: Session, user_id: int, since: Optional[datetime] = None,
+                category: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+    """``(paise, count)`` of the user's transactions by type, summed in SQL"""
+    query = db.query(Transaction.type, func.sum(minor_units(Transaction.amount)), func.count(Transaction.id)).filter(
+        Transaction.user_id == user_id
+    )
+    if since is not None:
+        query = query.filter(Transaction.transaction_date >= since)
+    if category is not None:
+        query = query.filter(Transaction.category == category)
+    return {kind.value: (int(total), count) for kind, total, count in query.group_by(Transaction.type)}
+
+def rebuild_spend_counters(db: Session, months: int = 2, user_ids: Optional[List[int]] = None) -> int:
+    """Recompute the counters of the last ``months`` months (the current one included) from
+    transactions; returns the counters written. Does not commit."""
+    current = month_index(datetime.utcnow())
+    first = current - months + 1
+    removal = delete(SpendCounter).where(SpendCounter.month >= first)
+    if user_ids is not None:
+        removal = removal.where(SpendCounter.user_id.in_(user_ids))
+    db.execute(removal)
+
+    written = 0
+    for month in range(first, current + 1):
+        query = db.query(Transaction.user_id, Transaction.category, func.sum(minor_units(Transaction.amount))).filter(
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.transaction_date >= month_start(month),
+            Transaction.transaction_date < month_start(month + 1)
+        )
+        if user_ids is not None:
+            query = query.filter(Transaction.user_id.in_(user_ids))
+        totals = defaultdict(int)
+        rows = []
+        now = datetime.utcnow()
+        for user_id, category, amount in query.group_by(Transaction.user_id, Transaction.category).all():
+            rows.append({"user_id": user_id, "month": month, "category": category.value,
+                         "amount": from_minor(amount or 0), "updated_at": now})
+            totals[user_id] += amount or 0
+        rows.extend(
+            {"user_id": user_id, "month": month, "category": TOTAL, "amount": from_minor(amount), "updated_at": now}
+            for user_id, amount in totals.items()
+        )
+        if rows:
+            db.execute(insert(SpendCounter), rows)
+        written += len(rows)
+    return written
+
+def main():
+    from app.core.database import BackgroundSessionLocal
+
+    parser = argparse.ArgumentParser(description="Recompute month-to-date spend counters from transactions")
+    parser.add_argument("--months", type=int, default=2, help="Months to recompute, the current one included")
+    args = parser.parse_args()
+
+    db = BackgroundSessionLocal()
+    try:
+        written = rebuild_spend_counters(db, args.months)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Rebuilt {written:,} spend counters for the last {args.months} month(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Transaction archive - cold history in memory-mapped columnar files
+
+``python -m app.services.transaction_archive`` moves transactions older than
+ARCHIVE_HORIZON_DAYS out of the database into segments under ARCHIVE_DIR. A
+segment holds the rows of one user-id range from one run, sorted by user and
+date, with one ``.npy`` file per column that readers memory-map; descriptions
+are dictionary encoded, the dictionary kept in a compressed ``.npz``.
+``manifest.json`` lists the segments.
+
+Archived rows still exist, only in colder storage, so clients must keep them.
+The deletes write no change-log entries, and delta sync checks ``known_ids``
+before turning a logged row that left the table into a tombstone.
+
+Usage:
+    python -m app.services.transaction_archive
+    python -m app.services.transaction_archive --horizon-days 730
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.core.money import MINOR_UNITS, from_minor, minor_units
+from app.models.transaction import Transaction, TransactionCategory, TransactionType
+
+np = lazy_import("numpy")
+
+MANIFEST = "manifest.json"
+DESCRIPTIONS = "descriptions.npz"
+
+# Column -> dtype of its .npy file; amounts are paise, type and category codes into the manifest's labels
+COLUMN_DTYPES = {
+    "id": "int64",
+    "user_id": "int64",
+    "transaction_date": "datetime64[us]",
+    "amount": "int64",
+    "type": "uint8",
+    "category": "uint8",
+    "description": "int32",
+    "fingerprint": "S32",
+    "created_at": "datetime64[us]"
+}
+
+ARCHIVED_COLUMNS = [
+    Transaction.id, Transaction.user_id, Transaction.transaction_date, minor_units(Transaction.amount).label("amount"),
+    Transaction.type,
+    Transaction.category, Transaction.description, Transaction.fingerprint, Transaction.created_at
+]
+
+DELETE_CHUNK = 5000
+
+class TransactionArchive:
+    """Segments of archived transactions under one directory
+
+    Readers memory-map only the columns they ask for, so an all-time
+    aggregate over a heavy user touches a few megabytes of page cache.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._manifest: Optional[Dict] = None
+        self._manifest_mtime = None
+        self._columns: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def manifest(self) -> Dict:
+        """Current manifest, re-read when the archive job has published segments since"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {
+                "types": [member.value for member in TransactionType],
+                "categories": [member.value for member in TransactionCategory],
+                "segments": []
+            }
+        with self._lock:
+            if self._manifest is None or mtime != self._manifest_mtime:
+                with open(self.manifest_path) as file:
+                    self._manifest = json.load(file)
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def segments(self, user_min: int, user_max: Optional[int] = None) -> List[Dict]:
+        """Segments that may hold rows of users ``user_min`` through ``user_max``"""
+        user_max = user_min if user_max is None else user_max
+        return [segment for segment in self.manifest()["segments"]
+                if segment["user_min"] <= user_max and segment["user_max"] >= user_min]
+
+    def _open(self, segment: Dict, column: str):
+        path = os.path.join(self.directory, segment["path"])
+        with self._lock:
+            columns = self._columns.setdefault(path, {})
+            if column not in columns:
+                values = np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+                if column == "amount" and values.dtype.kind == "f":
+                    # Segments written before amounts moved to paise hold rupee floats
+                    values = np.rint(values * MINOR_UNITS).astype(np.int64)
+                columns[column] = values
+            return columns[column]
+
+    def user_columns(self, user_id: int, columns: Sequence[str], since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> Dict[str, "np.ndarray"]:
+        """Archived values of ``columns`` for one user, optionally limited to ``since <= date < until``"""
+        parts = {column: [] for column in columns}
+        for segment in self.segments(user_id):
+            users = self._open(segment, "user_id")
+            start, stop = np.searchsorted(users, user_id, "left"), np.searchsorted(users, user_id, "right")
+            if start == stop:
+                continue
+            mask = slice(start, stop)
+            if since is not None or until is not None:
+                dates = self._open(segment, "transaction_date")[start:stop]
+                keep = np.ones(stop - start, dtype=bool)
+                if since is not None:
+                    keep &= dates >= np.datetime64(since, "us")
+                if until is not None:
+                    keep &= dates < np.datetime64(until, "us")
+                mask = np.arange(start, stop)[keep]
+            for column in columns:
+                parts[column].append(self._open(segment, column)[mask])
+        return {
+            column: np.concatenate(values) if values else np.empty(0, dtype=COLUMN_DTYPES[column])
+            for column, values in parts.items()
+        }
+
+    def spending_by_category(self, user_id: int) -> Dict[str, Dict]:
+        """All-time archived expense total (in paise) and count per category"""
+        if not self.segments(user_id):
+            return {}
+        values = self.user_columns(user_id, ("amount", "type", "category"))
+        labels = self.manifest()
+        expenses = values["type"] == labels["types"].index(TransactionType.EXPENSE.value)
+        codes = values["category"][expenses]
+        # np.bincount would sum the weights as float64; np.add.at keeps them exact int64
+        totals = np.zeros(len(labels["categories"]), dtype=np.int64)
+        np.add.at(totals, codes, values["amount"][expenses])
+        counts = np.bincount(codes, minlength=len(labels["categories"]))
+        return {
+            label: {"minor_total": int(totals[code]), "count": int(counts[code])}
+            for code, label in enumerate(labels["categories"]) if counts[code]
+        }
+
+    def archived_ids(self, user_min: int, user_max: int) -> Set[int]:
+        ids = set()
+        for segment in self.segments(user_min, user_max):
+            ids.update(self._open(segment, "id").tolist())
+        return ids
+
+    def known_ids(self, user_id: int, ids: Iterable[int]) -> Set[int]:
+        """Ids of ``ids`` archived for the user"""
+        if not self.segments(user_id):
+            return set()
+        wanted = np.array(list(ids), dtype=np.int64)
+        stored = self.user_columns(user_id, ("id",))["id"]
+        return set(wanted[np.isin(wanted, stored)].tolist())
+
+    def known_fingerprints(self, user_id: int, fingerprints: Iterable[str]) -> Set[str]:
+        """Fingerprints of ``fingerprints`` already archived for the user"""
+        if not self.segments(user_id):
+            return set()
+        wanted = np.array([fingerprint.encode() for fingerprint in fingerprints], dtype="S32")
+        stored = self.user_columns(user_id, ("fingerprint",))["fingerprint"]
+        return {fingerprint.decode() for fingerprint in wanted[np.isin(wanted, stored)]}
+
+    def iter_rows(self, user_id: int) -> Iterator[Dict]:
+        """Every archived row of the user, descriptions decoded, oldest segments first"""
+        labels = self.manifest()
+        for segment in self.segments(user_id):
+            users = self._open(segment, "user_id")
+            start, stop = np.searchsorted(users, user_id, "left"), np.searchsorted(users, user_id, "right")
+            if start == stop:
+                continue
+            with np.load(os.path.join(self.directory, segment["path"], DESCRIPTIONS)) as dictionary:
+                descriptions = dictionary["values"]
+            columns = {column: self._open(segment, column)[start:stop] for column in
+                       ("id", "transaction_date", "amount", "type", "category", "description")}
+            for row_id, date, amount, type_code, category_code, description in zip(
+                    columns["id"].tolist(), columns["transaction_date"].tolist(), columns["amount"].tolist(),
+                    columns["type"].tolist(), columns["category"].tolist(), columns["description"].tolist()):
+                yield {
+                    "id": row_id,
+                    "transaction_date": date,
+                    "type": labels["types"][type_code],
+                    "category": labels["categories"][category_code],
+                    "amount": from_minor(amount),
+                    "description": str(descriptions[description]) or None
+                }
+
+    def write_segment(self, rows: Sequence, user_min: int, user_max: int, archived_before: datetime) -> Dict:
+        """Write ``rows`` (sorted by user and date) as a new, unpublished segment; returns its manifest entry"""
+        manifest = self.manifest()
+        types, categories = list(manifest["types"]), list(manifest["categories"])
+        # New enum members get new codes; existing codes never change
+        for label in (member.value for member in TransactionType):
+            if label not in types:
+                types.append(label)
+        for label in (member.value for member in TransactionCategory):
+            if label not in categories:
+                categories.append(label)
+
+        dictionary: Dict[str, int] = {}
+        values = {
+            "id": [row.id for row in rows],
+            "user_id": [row.user_id for row in rows],
+            "transaction_date": [row.transaction_date for row in rows],
+            "amount": [row.amount for row in rows],
+            "type": [types.index(TransactionType(row.type).value) for row in rows],
+            "category": [categories.index(TransactionCategory(row.category).value) for row in rows],
+            "description": [dictionary.setdefault(row.description or "", len(dictionary)) for row in rows],
+            "fingerprint": [(row.fingerprint or "").encode() for row in rows],
+            "created_at": [row.created_at or row.transaction_date for row in rows]
+        }
+        name = f"u{user_min:09d}-{user_max:09d}-{archived_before:%Y%m%d}-{uuid.uuid4().hex[:8]}"
+        staging = os.path.join(self.directory, f".staging-{name}")
+        os.makedirs(staging)
+        for column, dtype in COLUMN_DTYPES.items():
+            np.save(os.path.join(staging, f"{column}.npy"), np.array(values[column], dtype=dtype))
+        np.savez_compressed(os.path.join(staging, DESCRIPTIONS), values=np.array(list(dictionary), dtype=str))
+        os.rename(staging, os.path.join(self.directory, name))
+        return {
+            "path": name,
+            "user_min": user_min,
+            "user_max": user_max,
+            "rows": len(rows),
+            "first_date": min(values["transaction_date"]).isoformat(),
+            "last_date": max(values["transaction_date"]).isoformat(),
+            "archived_before": archived_before.isoformat(),
+            "created_at": datetime.utcnow().isoformat(),
+            "types": types,
+            "categories": categories
+        }
+
+    def publish(self, entry: Dict) -> None:
+        manifest = dict(self.manifest())
+        manifest["types"] = entry.pop("types")
+        manifest["categories"] = entry.pop("categories")
+        manifest["segments"] = manifest["segments"] + [entry]
+        self._write_manifest(manifest)
+
+    def unpublish(self, entry: Dict) -> None:
+        manifest = dict(self.manifest())
+        manifest["segments"] = [segment for segment in manifest["segments"] if segment["path"] != entry["path"]]
+        self._write_manifest(manifest)
+        shutil.rmtree(os.path.join(self.directory, entry["path"]), ignore_errors=True)
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        staging = f"{self.manifest_path}.tmp"
+        with open(staging, "w") as file:
+            json.dump(manifest, file, indent=1)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(staging, self.manifest_path)
+
+# Shared by all requests in this worker
+transaction_archive = TransactionArchive(settings.ARCHIVE_DIR)
+
+EXPORT_COLUMNS = ["id", "transaction_date", "type", "category", "amount", "description"]
+
+def iter_history(db: Session, user_id: int, archive: TransactionArchive = transaction_archive) -> Iterator[Dict]:
+    """Every transaction of the user as ``EXPORT_COLUMNS`` dicts, archived rows first"""
+    yield from archive.iter_rows(user_id)
+    hot = db.execute(
+        select(Transaction.id, Transaction.transaction_date, Transaction.type, Transaction.category,
+               Transaction.amount, Transaction.description)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.transaction_date)
+        .execution_options(yield_per=1000)
+    )
+    for row in hot:
+        yield {**row._asdict(), "type": row.type.value, "category": row.category.value}
+
+def archive_transactions(db: Session, archive: TransactionArchive, horizon_days: int,
+                         users_per_segment: int) -> Dict:
+    """Move transactions dated before ``now - horizon_days`` into archive segments.
+
+    Each user range is one database transaction: the segment is written,
+    the rows deleted, the segment published, then the delete committed.
+    Rows left behind by an interrupted run are recognised by id and only
+    deleted on the next run.
+    """
+    os.makedirs(archive.directory, exist_ok=True)
+    cutoff = (datetime.utcnow() - timedelta(days=horizon_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    is_cold = Transaction.transaction_date < cutoff
+    first, last = db.execute(select(func.min(Transaction.user_id), func.max(Transaction.user_id)).where(is_cold)).one()
+    result = {"archived_before": cutoff.isoformat(), "segments": 0, "rows_archived": 0, "rows_deleted": 0}
+    if first is None:
+        return result
+
+    for user_min in range((first - 1) // users_per_segment * users_per_segment + 1, last + 1, users_per_segment):
+        user_max = user_min + users_per_segment - 1
+        rows = db.execute(select(*ARCHIVED_COLUMNS).where(
+            is_cold, Transaction.user_id.between(user_min, user_max)
+        ).order_by(Transaction.user_id, Transaction.transaction_date, Transaction.id)).all()
+        if not rows:
+            continue
+        done = archive.archived_ids(user_min, user_max)
+        fresh = [row for row in rows if row.id not in done]
+        entry = archive.write_segment(fresh, user_min, user_max, cutoff) if fresh else None
+        ids = [row.id for row in rows]
+        for start in range(0, len(ids), DELETE_CHUNK):
+            # The date bound lets a partitioned table skip the hot partitions
+            db.execute(delete(Transaction).where(is_cold, Transaction.id.in_(ids[start:start + DELETE_CHUNK]))
+                       .execution_options(synchronize_session=False))
+        if entry is not None:
+            archive.publish(entry)
+        try:
+            db.commit()
+        except Exception:
+            if entry is not None:
+                archive.unpublish(entry)
+            raise
+        result["segments"] += entry is not None
+        result["rows_archived"] += len(fresh)
+        result["rows_deleted"] += len(ids)
+    return result
+
+def main():
+    from app.core.database import BackgroundSessionLocal
+
+    parser = argparse.ArgumentParser(description="Archive cold transactions to columnar files")
+    parser.add_argument("--horizon-days", type=int, default=settings.ARCHIVE_HORIZON_DAYS,
+                        help="Keep transactions of the last N days in the database")
+    parser.add_argument("--users-per-segment", type=int, default=settings.ARCHIVE_USERS_PER_SEGMENT)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = BackgroundSessionLocal()
+    try:
+        result = archive_transactions(db, transaction_archive, args.horizon_days, args.users_per_segment)
+    finally:
+        db.close()
+    print(f"🗄️  Archived {result['rows_archived']:,} transactions dated before {result['archived_before']} "
+          f"into {result['segments']} segment(s), deleted {result['rows_deleted']:,} rows "
+          f"in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
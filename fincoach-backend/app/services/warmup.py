@@ -0,0 +1,186 @@
+"""Startup warm-up so a freshly deployed worker serves its first requests at full speed"""
+import time
+from typing import Dict, List, Optional
+from fastapi import FastAPI
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.database import POOLS, SessionLocal, engines, replica_engines
+from app.core.metrics import WARMUP_SCOPE_KEY
+
+# One GET per heavy route, by router group; each pays its imports, SQL
+# compilation and serializer construction here instead of on a user request
+WARMUP_ROUTES = {
+    "core": [
+        "/api/v1/transactions",
+        "/api/v1/transactions/stats/summary"
+    ],
+    "ai": [
+        "/api/v1/agents/financial-advisor/health-score",
+        "/api/v1/agents/risk-assessor/spending-volatility",
+        "/api/v1/agents/prediction/monthly-expenses",
+        "/api/v1/agents/coaching/daily-tip",
+        "/api/v1/ml/prediction/next-month-spending",
+        "/api/v1/ml/anomaly/unusual-patterns"
+    ],
+    "features": [
+        "/api/v1/analytics/dashboard",
+        "/api/v1/analytics/financial-health",
+        "/api/v1/mobile/quick-summary"
+    ]
+}
+
+# Users whose custom-rule matchers are compiled ahead of their first request
+WARMUP_MATCHERS = 256
+
+# Never stored; warm-up requests run as a user without data
+WARMUP_USER_ID = 0
+
+def prewarm_pool(engine: Engine, connections: int) -> int:
+    """Open ``connections`` pooled connections at once and return them to the pool"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+def prewarm_pools() -> Dict[str, int]:
+    """Pre-open each workload pool, primary and replica, up to its own configured size"""
+    opened = {}
+    for name, pool_engine in engines.items():
+        opened[name] = prewarm_pool(pool_engine, POOLS[name].size)
+    for name, pool_engine in replica_engines.items():
+        try:
+            opened[f"{name}-replica"] = prewarm_pool(pool_engine, POOLS[name].size)
+        except SQLAlchemyError:
+            # Reads fall back to the primary while the replica is unreachable
+            opened[f"{name}-replica"] = 0
+    return opened
+
+def compile_matchers(limit: int = WARMUP_MATCHERS) -> int:
+    """Compile the global matcher and those of the users who most recently edited their rules"""
+    from app.ml_modules.categorizer import TransactionCategorizer
+    from app.models.category_rule import CategoryRule
+
+    TransactionCategorizer().get_matcher()
+    db = SessionLocal()
+    try:
+        user_ids = [
+            user_id for (user_id,) in db.query(CategoryRule.user_id).group_by(CategoryRule.user_id).order_by(
+                func.max(CategoryRule.updated_at).desc()
+            ).limit(limit).all()
+        ]
+        for user_id in user_ids:
+            TransactionCategorizer(db, user_id).get_matcher()
+    finally:
+        db.close()
+    return len(user_ids) + 1
+
+def warm_model() -> Optional[str]:
+    """Run one prediction so the model's first real request skips lazy imports and cache fills"""
+    from app.ml_modules.text_classifier import get_active_model
+
+    model = get_active_model()
+    if model is None:
+        return None
+    model.predict(["UPI payment to swiggy order"])
+    return model.version
+
+async def _asgi_get(app: FastAPI, path: str) -> int:
+    """Send one GET straight through the ASGI app (middleware included); returns the status code
+
+    The scope is tagged as warm-up, so metrics and query budgets skip it.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        WARMUP_SCOPE_KEY: True
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return response.get("status", 0)
+
+async def warm_routes(app: FastAPI, router_groups: List[str]) -> Dict[str, object]:
+    """GET each heavy route of the mounted groups as a data-less user"""
+    from app.api.users import get_current_principal, get_current_user
+    from app.core.auth_cache import Principal
+    from app.models.user import User
+
+    warmup_user = User(id=WARMUP_USER_ID, email="warmup@localhost", username="warmup",
+                       monthly_income=0.0, monthly_budget=0.0, is_active=True)
+    overrides = {
+        get_current_principal: lambda: Principal.from_user(warmup_user),
+        get_current_user: lambda: warmup_user
+    }
+    previous = {dependency: app.dependency_overrides.get(dependency) for dependency in overrides}
+    app.dependency_overrides.update(overrides)
+    results = {}
+    try:
+        for group in router_groups:
+            for path in WARMUP_ROUTES.get(group, []):
+                try:
+                    results[path] = await _asgi_get(app, path)
+                except Exception as exc:
+                    # Handlers may fail without data; the code paths are warm either way
+                    results[path] = type(exc).__name__
+    finally:
+        for dependency, override in previous.items():
+            if override is None:
+                app.dependency_overrides.pop(dependency, None)
+            else:
+                app.dependency_overrides[dependency] = override
+    return results
+
+async def warm_up(app: FastAPI, router_groups: List[str]) -> Dict:
+    """Pre-open pool connections, compile matchers, exercise the model and heavy routes; returns timings"""
+    report = {"steps": {}}
+
+    def timed(step: str, started: float) -> None:
+        report["steps"][step] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    try:
+        report["pools"] = prewarm_pools()
+    except SQLAlchemyError as exc:
+        # A worker whose database is unreachable still starts; its requests report the outage
+        report["error"] = f"{type(exc).__name__}: {exc}"
+        return report
+    report["pool_connections"] = sum(report["pools"].values())
+    timed("pool", started)
+
+    if {"core", "ai"}.intersection(router_groups):
+        started = time.perf_counter()
+        try:
+            report["matchers"] = compile_matchers()
+        except SQLAlchemyError as exc:
+            report["error"] = f"{type(exc).__name__}: {exc}"
+        report["model_version"] = warm_model()
+        timed("categorizer", started)
+
+    started = time.perf_counter()
+    report["routes"] = await warm_routes(app, router_groups)
+    timed("routes", started)
+    return report
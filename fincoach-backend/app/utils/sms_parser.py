@@ -1,11 +1,25 @@
 """UPI SMS Parser for Indian Banks"""
 import re
-from typing import Optional, Dict
+import logging
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, Iterator
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+_AMOUNT = r"(?P<amount>[0-9][0-9,]*(?:\.[0-9]{1,2})?)"
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str, date_format: str) -> Optional[datetime]:
+    """Parse an SMS date; archives repeat the same few dates, so results are cached"""
+    try:
+        return datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
 class SMSParser:
     """Parse UPI transaction SMS from Indian banks"""
-    
+
     # Bank patterns
     BANK_PATTERNS = {
         'HDFC': r'HDFC Bank|HDFC',
@@ -14,55 +28,161 @@ class SMSParser:
         'Axis': r'Axis Bank|Axis',
         'Kotak': r'Kotak Bank|Kotak'
     }
-    
+
+    # One pattern per bank capturing amount, direction, account, date,
+    # counterparty (merchant name or VPA) and UPI reference in a single search.
+    # Entries are (pattern, date format, marker); the marker is a literal every
+    # SMS of that format contains, checked (case-insensitively, like the
+    # pattern) before running the regex.
+    BANK_TEMPLATES = {
+        'HDFC': (
+            r'Rs\.?\s*' + _AMOUNT + r'\s+(?P<direction>debited|credited)\s+(?:from|to)\s+a/c\s+\**(?P<account>\w+)'
+            r'\s+on\s+(?P<date>\d{2}-\d{2}-\d{2})\s+(?:to|by)\s+VPA\s+(?P<party>\S+?)\s*\(UPI Ref No\.?\s*(?P<reference>\d+)\)',
+            '%d-%m-%y',
+            'VPA'
+        ),
+        'ICICI': (
+            r'Acct\s+(?P<account>\w+)\s+(?:is\s+)?(?P<direction>debited|credited)\s+(?:for|with)\s+(?:Rs\.?|INR)\s*' + _AMOUNT +
+            r'\s+on\s+(?P<date>\d{2}-[A-Za-z]{3}-\d{2})(?:;\s*|\s+from\s+)(?P<party>.+?)(?:\s+credited)?'
+            r'\.\s*UPI:\s*(?P<reference>\d+)',
+            '%d-%b-%y',
+            'UPI:'
+        ),
+        'SBI': (
+            r'A/C\s*(?P<account>\w+)\s+(?P<direction>debited|credited)\s+by\s+(?:Rs\.?\s*)?' + _AMOUNT +
+            r'\s+on\s+date\s+(?P<date>\d{2}[A-Za-z]{3}\d{2})\s+(?:trf\s+to|by)\s+(?P<party>.+?)\s+Ref\s*no\s*(?P<reference>\d+)',
+            '%d%b%y',
+            'on date'
+        ),
+        'Axis': (
+            r'INR\s*' + _AMOUNT + r'\s+(?P<direction>debited|credited)\s+A/c no\.\s*(?P<account>\w+)\s+'
+            r'(?P<date>\d{2}-\d{2}-\d{2}),?\s*[\d:]*\s+UPI/P2[AM]/(?P<reference>\d+)/(?P<party>[^\n]+?)\s*(?:\n|$)',
+            '%d-%m-%y',
+            'UPI/P2'
+        ),
+        'Kotak': (
+            r'(?P<direction>Sent|Received)\s+Rs\.?\s*' + _AMOUNT + r'\s+(?:from|in)\s+(?:your\s+)?Kotak Bank AC\s+(?P<account>\w+)'
+            r'\s+(?:to|from)\s+(?P<party>\S+?)\s+on\s+(?P<date>\d{2}-\d{2}-\d{2})\.\s*UPI Ref:?\s*(?P<reference>\d+)',
+            '%d-%m-%y',
+            'Kotak Bank AC'
+        )
+    }
+
+    INCOME_DIRECTIONS = {'credited', 'received'}
+    _TEMPLATE_FIELDS = ('amount', 'direction', 'date', 'party', 'reference', 'account')
+
+    # Compiled once at import; parse calls only run searches
+    # The bank patterns are literal alternatives; lowercase substring checks
+    # beat one case-insensitive regex alternation
+    _BANK_NAMES = [(name.lower(), bank) for bank, pattern in BANK_PATTERNS.items() for name in pattern.split('|')]
+    _COMPILED_TEMPLATES = [
+        (bank, marker.lower(), re.compile(pattern, re.IGNORECASE), date_format)
+        for bank, (pattern, date_format, marker) in BANK_TEMPLATES.items()
+    ]
+    _GENERIC_AMOUNT = re.compile(r'Rs\.?\s*([0-9,]+(?:\.[0-9]{2})?)')
+
     @staticmethod
-    def parse_upi_sms(sms_text: str) -> Optional[Dict]:
+    def parse_upi_sms(sms_text: str, received_at: Optional[datetime] = None) -> Optional[Dict]:
         """
         Parse UPI transaction SMS
-        
+
+        Args:
+            sms_text: Raw SMS body
+            received_at: When the SMS arrived; used when the text carries no date
+
         Returns:
-            Dict with transaction details or None if parsing fails
+            Dict with transaction details or None if parsing fails. Its
+            transaction_date is None when neither the text nor received_at
+            dates the SMS; the parse time says nothing about when it was spent.
         """
+        if not sms_text:
+            return None
+        lowered = sms_text.lower()
+
+        # The matching template identifies the bank; bank names usually sit at
+        # the end of the SMS and VPAs mention other banks, so they are not scanned first
+        for bank, marker, pattern, date_format in SMSParser._COMPILED_TEMPLATES:
+            if marker in lowered:
+                match = pattern.search(sms_text)
+                if match is not None:
+                    break
+        else:
+            return SMSParser._parse_generic(sms_text, lowered, received_at)
+
+        # Every template has the same groups; one group() call beats building groupdict()
+        amount, direction, date, party, reference, account = match.group(*SMSParser._TEMPLATE_FIELDS)
+        party = party.strip()
+        is_vpa = '@' in party
+        transaction_date = _parse_date(date, date_format) or received_at
+
+        return {
+            'amount': float(amount.replace(',', '')),
+            'type': 'income' if direction.lower() in SMSParser.INCOME_DIRECTIONS else 'expense',
+            'description': party or sms_text[:100],
+            'merchant': None if is_vpa else party or None,
+            'vpa': party if is_vpa else None,
+            'reference': reference,
+            'account': account,
+            'bank': bank,
+            'transaction_date': transaction_date,
+            'category': 'other'
+        }
+
+    @staticmethod
+    def _parse_generic(sms_text: str, lowered: str, received_at: Optional[datetime]) -> Optional[Dict]:
+        """Fallback for formats without a template: amount and direction keywords only"""
+        # Cheap early exit for texts that are not transactions (OTPs, offers, ...)
+        if 'Rs' not in sms_text:
+            return None
+        amount_match = SMSParser._GENERIC_AMOUNT.search(sms_text)
+        if not amount_match:
+            return None
+
+        # Identify bank
+        bank = 'Unknown'
+        for name, bank_name in SMSParser._BANK_NAMES:
+            if name in lowered:
+                bank = bank_name
+                break
+
         try:
-            # Extract amount
-            amount_match = re.search(r'Rs\.?\s*([0-9,]+(?:\.[0-9]{2})?)', sms_text)
-            if not amount_match:
-                return None
-            
             amount = float(amount_match.group(1).replace(',', ''))
-            
-            # Determine transaction type
-            transaction_type = 'expense'
-            if any(word in sms_text.lower() for word in ['credited', 'received', 'deposited']):
-                transaction_type = 'income'
-            
-            # Extract description/merchant
-            description = sms_text[:100]  # First 100 chars as description
-            
-            # Identify bank
-            bank = 'Unknown'
-            for bank_name, pattern in SMSParser.BANK_PATTERNS.items():
-                if re.search(pattern, sms_text, re.IGNORECASE):
-                    bank = bank_name
-                    break
-            
-            return {
-                'amount': amount,
-                'type': transaction_type,
-                'description': description,
-                'bank': bank,
-                'transaction_date': datetime.utcnow(),
-                'category': 'other'
-            }
-        except Exception as e:
-            print(f"Error parsing SMS: {e}")
+        except ValueError:
+            logger.debug("Unparseable amount %r in SMS", amount_match.group(1))
             return None
-    
+
+        return {
+            'amount': amount,
+            'type': 'income' if 'credited' in lowered or 'received' in lowered or 'deposited' in lowered else 'expense',
+            'description': sms_text[:100],  # First 100 chars as description
+            'merchant': None,
+            'vpa': None,
+            'reference': None,
+            'account': None,
+            'bank': bank,
+            'transaction_date': received_at,
+            'category': 'other'
+        }
+
+    @staticmethod
+    def parse_many(sms_texts: Iterable[str], skip_invalid: bool = False) -> Iterator[Optional[Dict]]:
+        """
+        Lazily parse an iterable of SMS texts, e.g. lines streamed from a device export
+
+        Yields one result per input (None for unparseable SMS) so results can be
+        zipped with their source; pass skip_invalid=True to yield parsed SMS only.
+        """
+        parse = SMSParser.parse_upi_sms
+        for sms_text in sms_texts:
+            parsed = parse(sms_text)
+            if parsed is not None or not skip_invalid:
+                yield parsed
+
     @staticmethod
     def categorize_transaction(description: str, amount: float) -> str:
         """Categorize transaction based on description"""
         description_lower = description.lower()
-        
+
         categories = {
             'food': ['restaurant', 'cafe', 'food', 'pizza', 'burger', 'swiggy', 'zomato'],
             'transport': ['uber', 'ola', 'taxi', 'fuel', 'petrol', 'gas', 'parking'],
@@ -75,9 +195,9 @@ class SMSParser:
             'investment': ['investment', 'mutual', 'stock', 'crypto'],
             'savings': ['savings', 'deposit', 'transfer']
         }
-        
+
         for category, keywords in categories.items():
             if any(keyword in description_lower for keyword in keywords):
                 return category
-        
+
         return 'other'
@@ -0,0 +1,85 @@
+"""Delta sync across an archive run
+
+Seeds a throwaway database with one user's transactions over ``--days`` days
+through the API, takes a sync token, archives everything older than
+``--horizon-days`` and deletes one recent transaction, then syncs from the
+token. Fails (exit code 1) unless the sync tombstones only the deleted
+transaction: archived rows still exist and clients must keep them.
+
+Usage:
+    python -m benchmarks.archive_sync_check
+    python -m benchmarks.archive_sync_check --days 120 --horizon-days 30
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import List
+
+from benchmarks.query_budgets import configure_environment
+
+async def check(days: int, horizon_days: int) -> List[str]:
+    import httpx
+    from app.core.database import BackgroundSessionLocal, create_tables
+    from app.main import app, lifespan
+    from app.services.transaction_archive import archive_transactions, transaction_archive
+
+    create_tables()
+    problems = []
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://sync") as client:
+            credentials = {"email": "sync@example.com", "password": "sync-check-1"}
+            await client.post("/api/v1/auth/register", json={**credentials, "username": "sync"})
+            token = (await client.post("/api/v1/auth/login", json=credentials)).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            now = datetime.now()
+            for day in range(days):
+                await client.post("/api/v1/transactions", headers=headers, json={
+                    "amount": 100.0 + day, "type": "expense", "category": "food",
+                    "description": f"UPI payment {day}", "transaction_date": (now - timedelta(days=day)).isoformat()
+                })
+            before = (await client.get("/api/v1/mobile/changes", headers=headers)).json()
+
+            db = BackgroundSessionLocal()
+            try:
+                archived = archive_transactions(db, transaction_archive, horizon_days, 1000)
+            finally:
+                db.close()
+            recent = (await client.get("/api/v1/transactions", headers=headers)).json()[0]["id"]
+            await client.delete(f"/api/v1/transactions/{recent}", headers=headers)
+
+            after = (await client.get("/api/v1/mobile/changes", headers=headers,
+                                      params={"since": before["next_token"]})).json()
+            synced = (await client.get("/api/v1/mobile/changes", headers=headers, params={"since": "0"})).json()
+
+    print(f"🗄️  Archived {archived['rows_archived']:,} of {days:,} transactions, deleted transaction {recent}")
+    for label, result in (("since the token", after), ("since 0", synced)):
+        deleted = result["changes"].get("transactions", {}).get("deleted", [])
+        upserted = result["changes"].get("transactions", {}).get("upserted", [])
+        print(f"🔄 Sync {label}: {len(upserted):,} upserted, {len(deleted):,} deleted")
+        if deleted != [recent]:
+            problems.append(f"sync {label} tombstoned {deleted}, expected only [{recent}]")
+    if not archived["rows_archived"]:
+        problems.append("nothing was archived; raise --days or lower --horizon-days")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that delta sync keeps archived transactions")
+    parser.add_argument("--days", type=int, default=60, help="Days of daily transactions to seed")
+    parser.add_argument("--horizon-days", type=int, default=30, help="Archive transactions older than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(f"sqlite:///{os.path.join(directory, 'archive_sync.db')}")
+        os.environ["ARCHIVE_DIR"] = os.path.join(directory, "archive")
+        problems = asyncio.run(check(args.days, args.horizon_days))
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print("✅ Archived transactions are not tombstoned")
+
+if __name__ == "__main__":
+    main()
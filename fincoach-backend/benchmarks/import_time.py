@@ -0,0 +1,77 @@
+"""Import-time budget check for app.main
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+fails (exit code 1) when the median cumulative import time exceeds the
+budget, or when a heavy dependency is imported at startup.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --role gateway --budget-ms 1500 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Only ever needed by ML routes on first use, never at startup
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "joblib", "pandas", "tensorflow")
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_import(module: str, role: str) -> List[Tuple[str, int, int]]:
+    """Import ``module`` in a fresh interpreter; returns (name, self_us, cumulative_us) per imported module"""
+    env = dict(os.environ, APP_ROLE=role)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT, env=env, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time budget of app.main")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--role", default="all", help="APP_ROLE to import the app with")
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Maximum median cumulative import time")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    totals = []
+    timings: List[Tuple[str, int, int]] = []
+    for _ in range(args.runs):
+        timings = measure_import(args.module, args.role)
+        totals.append(next(cumulative for name, _, cumulative in timings if name == args.module) / 1000)
+    median_ms = statistics.median(totals)
+
+    print(f"⏱️  import {args.module} (APP_ROLE={args.role}): median {median_ms:.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    self_times: Dict[str, int] = {name: self_us for name, self_us, _ in timings}
+    for name, self_us in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"   {self_us / 1000:>8.1f} ms  {name}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    heavy = sorted(name for name in self_times if name.split(".")[0] in HEAVY_MODULES and "." not in name)
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Response serialization benchmark: ORM + response_model vs Core rows + FastJSONResponse
+
+Builds a 100-row transactions page in an in-memory SQLite database and times
+the old path (ORM objects, FastAPI response_model validation, jsonable_encoder,
+JSONResponse) against the fast path (Core row tuples rendered by orjson).
+
+Usage:
+    python -m benchmarks.serialization_bench
+    python -m benchmarks.serialization_bench --rows 100 --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.api.transactions import TRANSACTION_FIELDS
+from app.core.database import Base
+from app.core.responses import FastJSONResponse, rows_as_dicts
+from app.models.transaction import Transaction, TransactionCategory, TransactionType
+from app.schemas.transaction import TransactionResponse
+
+USER_ID = 1
+
+def build_session(rows: int) -> Session:
+    """In-memory database holding ``rows`` transactions for one user"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    categories = list(TransactionCategory)
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    session = Session(engine)
+    session.add_all([
+        Transaction(
+            user_id=USER_ID,
+            amount=round(rng.uniform(10, 5000), 2),
+            type=TransactionType.EXPENSE if rng.random() < 0.8 else TransactionType.INCOME,
+            category=rng.choice(categories),
+            description=f"UPI payment to merchant {rng.randrange(1000)}",
+            transaction_date=now - timedelta(hours=i),
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(rows)
+    ])
+    session.commit()
+    return session
+
+def time_it(func: Callable[[], bytes], iterations: int) -> float:
+    """Mean milliseconds per call"""
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list-page serialization paths")
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    session = build_session(args.rows)
+    field = create_response_field(name="response", type_=list[TransactionResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+    orm_query = select(Transaction).where(Transaction.user_id == USER_ID).order_by(
+        Transaction.transaction_date.desc()).limit(args.rows)
+    columns = TRANSACTION_FIELDS.columns(TRANSACTION_FIELDS.parse(None))
+    core_query = select(*columns).where(Transaction.user_id == USER_ID).order_by(
+        Transaction.transaction_date.desc()).limit(args.rows)
+
+    def old_serialize(objects) -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=objects))
+        return JSONResponse(content).body
+
+    def old_path() -> bytes:
+        session.expunge_all()
+        return old_serialize(session.scalars(orm_query).all())
+
+    def fast_path() -> bytes:
+        return FastJSONResponse(rows_as_dicts(session.execute(core_query))).body
+
+    objects = session.scalars(orm_query).all()
+    dicts = rows_as_dicts(session.execute(core_query))
+    if json.loads(old_path()) != json.loads(fast_path()):
+        raise SystemExit("❌ Fast path output differs from the response_model output")
+
+    results = {
+        "query + serialize, response_model": time_it(old_path, args.iterations),
+        "query + serialize, Core rows + orjson": time_it(fast_path, args.iterations),
+        "serialize only, response_model": time_it(lambda: old_serialize(objects), args.iterations),
+        "serialize only, jsonable_encoder": time_it(lambda: JSONResponse(jsonable_encoder(dicts)).body, args.iterations),
+        "serialize only, orjson": time_it(lambda: FastJSONResponse(dicts).body, args.iterations)
+    }
+    print(f"📦 {args.rows}-row page, {args.iterations} iterations, identical JSON ✓")
+    for name, ms in results.items():
+        print(f"  {name:<40} {ms:8.3f} ms")
+    old, new = results["query + serialize, response_model"], results["query + serialize, Core rows + orjson"]
+    print(f"⚡ End to end {old / new:.1f}x faster, "
+          f"serialization {results['serialize only, response_model'] / results['serialize only, orjson']:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
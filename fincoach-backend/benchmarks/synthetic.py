@@ -0,0 +1,250 @@
+"""Realistic synthetic users for benchmarks and capacity planning
+
+Each profile describes a kind of user: how much history they have and how
+many transactions a month. Rows are generated as plain tuples, deterministic
+for a given seed and end date, and bulk loaded with COPY on Postgres or a
+prepared executemany on SQLite, bypassing the ORM (and its change-log
+listeners).
+"""
+import csv
+import io
+import random
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain, islice, repeat
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import numpy as np
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.money import MINOR_UNITS, to_minor
+from app.models.alert import Alert, AlertSeverity
+from app.models.goal import Goal, GoalStatus
+from app.models.jar import Jar, JarPriority
+from app.models.transaction import Transaction, TransactionCategory, TransactionType
+from app.models.user import User
+from app.services.spend_counters import rebuild_spend_counters
+
+@dataclass(frozen=True)
+class Profile:
+    """Shape of one kind of user"""
+    name: str
+    years: int
+    transactions: int
+    monthly_income: float
+    jars: int
+    goals: int
+    alerts: int
+
+PROFILES = {
+    "light": Profile("light", years=1, transactions=300, monthly_income=35000, jars=1, goals=1, alerts=3),
+    "median": Profile("median", years=2, transactions=3000, monthly_income=80000, jars=4, goals=3, alerts=20),
+    "heavy": Profile("heavy", years=5, transactions=50000, monthly_income=250000, jars=10, goals=8, alerts=200)
+}
+
+# Expense category -> (share of expense rows, typical amount in rupees)
+EXPENSE_MIX = {
+    TransactionCategory.FOOD: (0.32, 350),
+    TransactionCategory.TRANSPORT: (0.18, 220),
+    TransactionCategory.SHOPPING: (0.14, 1800),
+    TransactionCategory.UTILITIES: (0.08, 1500),
+    TransactionCategory.ENTERTAINMENT: (0.10, 600),
+    TransactionCategory.HEALTH: (0.05, 1200),
+    TransactionCategory.EDUCATION: (0.03, 4000),
+    TransactionCategory.OTHER: (0.10, 500)
+}
+
+# Spending multiplier by month (festival season and year-end sales)
+SEASONALITY = {1: 0.95, 2: 0.9, 3: 1.0, 4: 1.0, 5: 1.05, 6: 0.95, 7: 0.95, 8: 1.0, 9: 1.05, 10: 1.3, 11: 1.25, 12: 1.2}
+
+MERCHANTS = ["Swiggy", "Zomato", "Amazon", "Flipkart", "Uber", "Ola", "BigBasket", "Netflix", "Apollo Pharmacy",
+             "Airtel", "BESCOM", "BookMyShow", "Myntra", "Zepto", "IRCTC"]
+
+USER_COLUMNS = ("id", "email", "username", "full_name", "hashed_password", "monthly_income", "monthly_budget",
+                "is_active", "is_verified", "category_rules_version", "change_seq", "created_at", "updated_at")
+TRANSACTION_COLUMNS = ("user_id", "amount", "type", "category", "description", "transaction_date",
+                       "created_at", "updated_at")
+JAR_COLUMNS = ("user_id", "name", "target_amount", "current_amount", "priority", "color", "is_active",
+               "created_at", "updated_at")
+GOAL_COLUMNS = ("user_id", "title", "target_amount", "current_amount", "deadline", "status",
+                "created_at", "updated_at")
+ALERT_COLUMNS = ("user_id", "title", "message", "severity", "is_read", "created_at", "updated_at")
+
+BATCH_SIZE = 50000
+
+def _timestamp(value: datetime) -> str:
+    # The format SQLAlchemy's SQLite DateTime type stores and compares against; Postgres parses it too
+    return value.isoformat(" ", "microseconds")
+
+class BulkWriter:
+    """Fastest bulk load the connection's database offers, inside the caller's transaction
+
+    Postgres gets ``COPY ... FROM STDIN``; SQLite a prepared executemany on the
+    raw driver connection; anything else Core executemany. Enum columns take
+    member names, which is how SQLAlchemy's ``Enum`` type stores them.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.dialect = connection.dialect.name
+
+    def write(self, table: str, columns: Sequence[str], rows: Iterable[Tuple]) -> int:
+        count = 0
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                return count
+            if self.dialect == "postgresql":
+                self._copy(table, columns, batch)
+            elif self.dialect == "sqlite":
+                cursor = self.connection.connection.dbapi_connection.cursor()
+                cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", batch
+                )
+                cursor.close()
+            else:
+                placeholders = ", ".join(f":{column}" for column in columns)
+                self.connection.execute(
+                    text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"),
+                    [dict(zip(columns, row)) for row in batch]
+                )
+            count += len(batch)
+
+    def _copy(self, table: str, columns: Sequence[str], batch: List[Tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.close()
+
+    def reset_sequences(self, tables: Iterable[str]) -> None:
+        """Move Postgres id sequences past ids written explicitly"""
+        if self.dialect != "postgresql":
+            return
+        for table in tables:
+            self.connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+
+def _month_starts(start: datetime, end: datetime) -> Iterator[datetime]:
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+@lru_cache(maxsize=1)
+def _times_of_day() -> List[str]:
+    return [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}.000000" for second in range(86400)]
+
+@lru_cache(maxsize=8)
+def _calendar(start: datetime, days: int) -> Tuple[List[str], np.ndarray]:
+    """Date prefix and seasonal spending factor of each day from ``start``; shared by users with the same span"""
+    dates = [start.date() + timedelta(days=day) for day in range(days)]
+    return [f"{day.isoformat()} " for day in dates], np.array([SEASONALITY[day.month] for day in dates])
+
+def generate_transactions(rng: np.random.Generator, user_id: int, profile: Profile,
+                          now: datetime) -> Iterator[Tuple]:
+    """Salary on the 1st of each month plus ``profile.transactions`` expenses, in date order
+
+    Drawn in bulk with NumPy; timestamps are assembled from per-day and
+    time-of-day string tables rather than formatted row by row.
+    """
+    start = (now - timedelta(days=365 * profile.years)).replace(hour=0, minute=0, second=0, microsecond=0)
+    salary = [_timestamp(month + timedelta(hours=9)) for month in _month_starts(start, now) if start <= month]
+    income = (user_id, to_minor(profile.monthly_income), TransactionType.INCOME.name, TransactionCategory.SALARY.name,
+              "Salary credit")
+
+    count = profile.transactions
+    span = int((now - start).total_seconds())
+    day_prefix, day_factor = _calendar(start, span // 86400 + 1)
+
+    categories = list(EXPENSE_MIX)
+    shares = np.array([EXPENSE_MIX[category][0] for category in categories])
+    typical = np.array([EXPENSE_MIX[category][1] for category in categories], dtype=float)
+    picks = rng.choice(len(categories), size=count, p=shares / shares.sum())
+    offsets = np.sort(rng.integers(0, span, size=count))
+    # Paise, as the amount columns store them
+    amounts = np.rint(np.minimum(rng.lognormal(0, 0.6, size=count) * typical[picks] * day_factor[offsets // 86400],
+                                 profile.monthly_income) * MINOR_UNITS).astype(np.int64)
+    descriptions = np.array([f"UPI payment to {merchant}" for merchant in MERCHANTS], dtype=object)
+    names = np.array([category.name for category in categories], dtype=object)
+
+    times = _times_of_day()
+    stamps = [day_prefix[offset // 86400] + times[offset % 86400] for offset in offsets.tolist()]
+    expense = TransactionType.EXPENSE.name
+    expenses = zip(repeat(user_id), amounts.tolist(), repeat(expense), names[picks].tolist(),
+                   descriptions[rng.integers(0, len(MERCHANTS), size=count)].tolist(), stamps, stamps, stamps)
+    return chain((income + (when, when, when) for when in salary), expenses)
+
+def seed_user(writer: BulkWriter, profile: Profile, index: int, user_id: int, hashed_password: str,
+              seed: int = 42, now: datetime = None) -> int:
+    """Write one user of ``profile`` with their history; returns the rows written"""
+    rng = random.Random(f"{seed}-{profile.name}-{index}")
+    bulk_rng = np.random.default_rng([seed, zlib.crc32(profile.name.encode()), index])
+    now = now or datetime.now()
+    stamp = _timestamp(now)
+    username = f"{profile.name}{user_id}"
+    rows = writer.write(User.__tablename__, USER_COLUMNS, [(
+        user_id, f"{username}@bench.example.com", username, f"Bench {username}", hashed_password,
+        to_minor(profile.monthly_income), to_minor(profile.monthly_income * 0.7), True, True, 0, 0, stamp, stamp
+    )])
+    rows += writer.write(Transaction.__tablename__, TRANSACTION_COLUMNS,
+                         generate_transactions(bulk_rng, user_id, profile, now))
+
+    priorities = [priority.name for priority in JarPriority]
+    rows += writer.write(Jar.__tablename__, JAR_COLUMNS, [
+        (user_id, f"Jar {number}", to_minor(10000.0 * (number + 1)), to_minor(rng.uniform(0, 10000.0 * (number + 1))),
+         rng.choice(priorities), "#3B82F6", 1, stamp, stamp)
+        for number in range(profile.jars)
+    ])
+    rows += writer.write(Goal.__tablename__, GOAL_COLUMNS, [
+        (user_id, f"Goal {number}", to_minor(50000.0 * (number + 1)), to_minor(rng.uniform(0, 50000.0 * (number + 1))),
+         _timestamp(now + timedelta(days=rng.randrange(30, 900))), GoalStatus.ACTIVE.name, stamp, stamp)
+        for number in range(profile.goals)
+    ])
+    severities = [severity.name for severity in AlertSeverity]
+    rows += writer.write(Alert.__tablename__, ALERT_COLUMNS, [
+        (user_id, f"Alert {number}", "Spending check-in", rng.choice(severities), rng.random() < 0.7,
+         _timestamp(now - timedelta(hours=number)), stamp)
+        for number in range(profile.alerts)
+    ])
+    return rows
+
+@contextmanager
+def deferred_indexes(connection: Connection, tables: Iterable[Table]) -> Iterator[None]:
+    """Drop the secondary indexes of ``tables`` for a bulk load and build them once afterwards"""
+    indexes = [index for table in tables for index in table.indexes]
+    for index in indexes:
+        index.drop(connection)
+    yield
+    for index in indexes:
+        index.create(connection)
+
+def seed_profiles(connection: Connection, counts: Dict[Profile, int], hashed_password: str,
+                  seed: int = 42, now: datetime = None) -> Tuple[Dict[str, List[int]], int]:
+    """Seed ``counts[profile]`` users of each profile; returns (user ids by profile name, rows written)"""
+    with deferred_indexes(connection, [Transaction.__table__]):
+        seeded = _seed_profiles(connection, counts, hashed_password, seed, now or datetime.now())
+    # The bulk load bypasses the write paths that keep the month counters
+    rebuild_spend_counters(Session(bind=connection))
+    return seeded
+
+def _seed_profiles(connection: Connection, counts: Dict[Profile, int], hashed_password: str,
+                   seed: int, now: datetime) -> Tuple[Dict[str, List[int]], int]:
+    writer = BulkWriter(connection)
+    next_id = (connection.execute(select(func.max(User.id))).scalar() or 0) + 1
+    users = {}
+    rows = 0
+    for profile, count in counts.items():
+        users[profile.name] = []
+        for index in range(count):
+            rows += seed_user(writer, profile, index, next_id, hashed_password, seed, now)
+            users[profile.name].append(next_id)
+            next_id += 1
+    writer.reset_sequences([User.__tablename__])
+    return users, rows
@@ -33,9 +33,9 @@ fi
 echo "🗄️  Creating database..."
 createdb -h localhost fincoach_db 2>/dev/null || echo "Database might already exist"
 
-# Run migrations
-echo "🔄 Running database migrations..."
-alembic upgrade head
+# Create tables
+echo "🔄 Creating database tables..."
+python -m app.core.init_db
 
 # Create initial admin user (optional)
 echo "✅ Setup complete!"